@@ -0,0 +1,173 @@
+"""
+Versão assíncrona (asyncio) da API do repository.py, para interfaces assíncronas.
+
+Cada função tem o mesmo nome, os mesmos argumentos e o mesmo retorno da versão síncrona,
+mas deve ser aguardada:
+    product = await async_repository.get_product_by_id(1)
+
+O sqlite3 é bloqueante, então as chamadas rodam em threads fora do event loop:
+    - leituras vão para um pool limitado de workers e rodam em paralelo (o modo WAL permite
+      vários leitores ao mesmo tempo, e o sqlite3 libera o GIL enquanto executa a consulta);
+    - escritas vão para um único worker, uma de cada vez, então nunca disputam o lock de
+      escrita do SQLite entre si.
+Cada worker usa uma conexão própria do pool do database.py durante a chamada, e há sempre
+menos leitores que conexões no pool, então leitores e escritor nunca esperam por conexão.
+
+O ganho está em não travar o event loop: montar os objetos do resultado é trabalho Python
+(preso ao GIL), então mais leitores só ajudam em consultas pesadas no SQLite. Para consultas
+curtas, 1 ou 2 leitores rendem mais que 4 (veja 'python3 benchmark.py async').
+
+As funções iter_* (geradores) não têm versão assíncrona: use as versões paginadas ou get_all_*.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import database as db
+import repository
+
+# Workers de leitura (limitados ao tamanho do pool menos uma conexão, que fica para o escritor)
+ASYNC_READ_WORKERS = int(os.getenv('ASYNC_READ_WORKERS', '2'))
+
+_read_executor = None
+_write_executor = None
+_executors_lock = threading.Lock()
+
+
+def _get_executors():
+    global _read_executor, _write_executor
+    with _executors_lock:
+        if _read_executor is None:
+            read_workers = min(ASYNC_READ_WORKERS, max(1, db.get_pool().size - 1))
+            _read_executor = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='sqlite-leitura')
+            _write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-escrita')
+        return _read_executor, _write_executor
+
+
+def configure_executors(read_workers=None):
+    """
+    Recria os executores com outra quantidade de workers de leitura.
+    As tarefas já enviadas aos executores antigos terminam normalmente.
+
+    Args:
+        read_workers (int, optional): Quantas leituras podem rodar ao mesmo tempo.
+            Defaults to ASYNC_READ_WORKERS.
+    """
+    global ASYNC_READ_WORKERS
+    shutdown_executors(wait=False)
+    if read_workers is not None:
+        ASYNC_READ_WORKERS = read_workers
+
+
+def shutdown_executors(wait=True):
+    """
+    Encerra os executores de leitura e escrita (eles são recriados na próxima chamada).
+
+    Args:
+        wait (bool, optional): Espera as tarefas pendentes terminarem. Defaults to True.
+    """
+    global _read_executor, _write_executor
+    with _executors_lock:
+        executors = (_read_executor, _write_executor)
+        _read_executor = _write_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def _read(function):
+    # Versão assíncrona de uma leitura: roda no pool de workers de leitura
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        read_executor, _ = _get_executors()
+        return await asyncio.get_running_loop().run_in_executor(
+            read_executor, functools.partial(function, *args, **kwargs))
+    return wrapper
+
+
+def _write(function):
+    # Versão assíncrona de uma escrita: roda no worker único de escrita, em ordem de chegada
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        _, write_executor = _get_executors()
+        return await asyncio.get_running_loop().run_in_executor(
+            write_executor, functools.partial(function, *args, **kwargs))
+    return wrapper
+
+
+# --- Categorias ---
+add_category = _write(repository.add_category)
+ensure_categories = _write(repository.ensure_categories)
+get_all_categories = _read(repository.get_all_categories)
+get_category_by_id = _read(repository.get_category_by_id)
+update_category_name = _write(repository.update_category_name)
+delete_category = _write(repository.delete_category)
+
+# --- Produtos ---
+get_all_products = _read(repository.get_all_products)
+get_catalog_snapshot = _read(repository.get_catalog_snapshot)
+search_products = _read(repository.search_products)
+get_products_by_category = _read(repository.get_products_by_category)
+add_product = _write(repository.add_product)
+get_product_by_id = _read(repository.get_product_by_id)
+add_multiples_products = _write(repository.add_multiples_products)
+upsert_products = _write(repository.upsert_products)
+update_product_stock = _write(repository.update_product_stock)
+receive_goods = _write(repository.receive_goods)
+update_product = _write(repository.update_product)
+reprice_products = _write(repository.reprice_products)
+delete_product = _write(repository.delete_product)
+
+# --- Vendas ---
+register_sale = _write(repository.register_sale)
+register_sales = _write(repository.register_sales)
+get_all_sales = _read(repository.get_all_sales)
+get_sales_by_date = _read(repository.get_sales_by_date)
+get_sales_between = _read(repository.get_sales_between)
+get_sales_page = _read(repository.get_sales_page)
+get_sales_by_id = _read(repository.get_sales_by_id)
+get_sales_by_ids = _read(repository.get_sales_by_ids)
+delete_sale = _write(repository.delete_sale)
+
+# --- Relatórios ---
+rebuild_sales_summary = _write(repository.rebuild_sales_summary)
+get_sales_report = _read(repository.get_sales_report)
+get_daily_report = _read(repository.get_daily_report)
+get_weekly_report = _read(repository.get_weekly_report)
+get_monthly_report = _read(repository.get_monthly_report)
+
+# --- Caixas ---
+open_register = _write(repository.open_register)
+close_register = _write(repository.close_register)
+get_register_by_id = _read(repository.get_register_by_id)
+get_open_registers = _read(repository.get_open_registers)
+
+
+if __name__ == '__main__':
+    from models import Sale
+
+    async def main():
+        # Usa o banco montado pelo repository.py (rode-o antes para ter dados de exemplo)
+        db.create_tables()
+        print('\nTestando leituras em paralelo...')
+        product_ids = [1, 2, 3, 999]
+        products = await asyncio.gather(*(get_product_by_id(product_id) for product_id in product_ids))
+        for product_id, product in zip(product_ids, products):
+            print(f'    Produto {product_id}: {product}')
+
+        print('\nTestando escritas em série (duas vendas disputando o mesmo produto)...')
+        product = products[0]
+        if product is not None:
+            sales = []
+            for _ in range(2):
+                sale = Sale()
+                sale.add_item(product, product.stock_quantity)
+                sales.append(sale)
+            results = await asyncio.gather(*(register_sale(sale) for sale in sales))
+            print(f'--> Resultados: {results} (Esperado: uma venda aprovada e uma recusada)')
+        print(f"--> Relatório de hoje: {(await get_daily_report())['totais']}")
+        shutdown_executors()
+
+    asyncio.run(main())
@@ -0,0 +1,319 @@
+"""
+Autocompletar de nomes de produtos em memória, para o caixa não ir ao banco a cada tecla.
+
+O índice guarda o vocabulário das palavras dos nomes em uma lista ordenada, já sem acentos
+e em minúsculas ('Pérola' vira 'perola'), e, para cada palavra, os produtos que a usam, do
+maior para o menor placar (estoque ou unidades vendidas). Cada palavra digitada é o início
+de uma palavra do nome, em qualquer ordem: 'brin pra' encontra 'Brinco de Prata'.
+
+    index = ProductAutocomplete.from_repository(ranking='sales')
+    index.complete('tiara fe')   # [Product('Tiara de Festa'), ...]
+
+Produtos adicionados, renomeados ou removidos pelo repository.py, um a um ou em lote
+(upsert_products, add_multiples_products, importer.import_catalog), entram no índice na hora
+(o índice se registra com repository.add_product_listener). O placar é uma fotografia
+tirada na montagem: vendas e entradas de mercadoria não o mudam; use refresh(id_produto)
+ou monte o índice de novo para atualizá-lo.
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from datetime import date, timedelta
+
+import reports
+import repository
+
+# Quantos produtos complete retorna por padrão
+AUTOCOMPLETE_LIMIT = 10
+
+# Janela de vendas usada no placar 'sales' (unidades vendidas nos últimos N dias)
+AUTOCOMPLETE_SALES_DAYS = 30
+
+# Placares aceitos para ordenar as sugestões
+RANKINGS = ('stock', 'sales')
+
+# Prefixos de até este tamanho têm a lista de produtos já pronta (não juntam palavras na hora)
+_SHORT_PREFIX_LENGTH = 2
+
+
+def fold(text):
+    """
+    Remove acentos e diferenças de maiúsculas/minúsculas ('Pérola' -> 'perola').
+
+    Args:
+        text (str): O texto original.
+
+    Returns:
+        str: O texto normalizado, usado como chave do índice.
+    """
+    if text.isascii():
+        return text.casefold()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def _words(text):
+    return re.findall(r'\w+', fold(text))
+
+
+class ProductAutocomplete:
+    """
+    Índice de prefixos dos nomes de produtos, em memória, com as sugestões ordenadas por placar.
+    Pode ser consultado e atualizado de várias threads ao mesmo tempo.
+    """
+    def __init__(self, products=(), ranking='stock', sales=None):
+        """
+        Construtor do índice.
+
+        Args:
+            products (iterable[Product]): Os produtos iniciais.
+            ranking (str): 'stock' (maior estoque primeiro) ou 'sales' (mais vendidos primeiro).
+            sales (dict, optional): Unidades vendidas por ID de produto, para o placar 'sales'.
+        """
+        if ranking not in RANKINGS:
+            raise ValueError(f'Placar desconhecido: {ranking}')
+        self.ranking = ranking
+        self._sales = dict(sales or {})
+        # Vocabulário ordenado e, para cada palavra, as entradas (-placar, nome, id) ordenadas
+        # (o empate no placar é decidido pelo nome)
+        self._vocabulary = []
+        self._postings = {}
+        # Listas já juntadas para os prefixos curtos (1 e 2 letras), que casam com muitas palavras
+        self._short_postings = {}
+        # Por produto: (entrada, ' palavras do nome', objeto Product)
+        self._products = {}
+        self._lock = threading.RLock()
+        self._listening = False
+        # Montagem em lote: ordena as entradas uma única vez, e cada lista já nasce ordenada
+        stored = sorted(self._entry(product) + (product,) for product in products)
+        for entry, text, product in stored:
+            self._products[product.id] = (entry, text, product)
+            words = set(text.split())
+            for word in words:
+                self._postings.setdefault(word, []).append(entry)
+            for prefix in self._short_prefixes(words):
+                self._short_postings.setdefault(prefix, []).append(entry)
+        self._vocabulary = sorted(self._postings)
+
+    @classmethod
+    def from_repository(cls, ranking='stock', listen=True):
+        """
+        Monta o índice com todos os produtos do repositório.
+
+        Args:
+            ranking (str, optional): 'stock' ou 'sales'. Defaults to 'stock'.
+            listen (bool, optional): Registra o índice para receber as alterações de produtos
+                feitas pelo repositório. Defaults to True.
+
+        Returns:
+            ProductAutocomplete: O índice pronto para consulta.
+        """
+        sales = None
+        if ranking == 'sales':
+            today = date.today()
+            start = today - timedelta(days=AUTOCOMPLETE_SALES_DAYS - 1)
+            rows = reports.sales_by_product(start, today + timedelta(days=1))
+            sales = {row.key: row.units for row in rows}
+        index = cls(repository.get_all_products(), ranking=ranking, sales=sales)
+        if listen:
+            index.listen()
+        return index
+
+    def __len__(self):
+        return len(self._products)
+
+    def _score(self, product):
+        if self.ranking == 'sales':
+            return self._sales.get(product.id, 0)
+        return product.stock_quantity
+
+    @staticmethod
+    def _short_prefixes(words):
+        return {word[:length] for word in words for length in range(1, _SHORT_PREFIX_LENGTH + 1)}
+
+    def _entry(self, product):
+        # ' brinco de prata': um prefixo casa com alguma palavra se ' prefixo' estiver no texto
+        text = ' ' + ' '.join(_words(product.name))
+        return (-self._score(product), product.name, product.id), text
+
+    def _add(self, product):
+        entry, text = self._entry(product)
+        self._products[product.id] = (entry, text, product)
+        words = set(text.split())
+        for word in words:
+            posting = self._postings.get(word)
+            if posting is None:
+                bisect.insort(self._vocabulary, word)
+                posting = self._postings[word] = []
+            bisect.insort(posting, entry)
+        for prefix in self._short_prefixes(words):
+            bisect.insort(self._short_postings.setdefault(prefix, []), entry)
+
+    def _remove(self, product_id):
+        stored = self._products.pop(product_id, None)
+        if stored is None:
+            return
+        entry, text, _ = stored
+        words = set(text.split())
+        for word in words:
+            posting = self._postings[word]
+            del posting[bisect.bisect_left(posting, entry)]
+            if not posting:
+                del self._postings[word]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, word)]
+        for prefix in self._short_prefixes(words):
+            posting = self._short_postings[prefix]
+            del posting[bisect.bisect_left(posting, entry)]
+            if not posting:
+                del self._short_postings[prefix]
+
+    def add(self, product):
+        """
+        Adiciona (ou substitui) um produto no índice.
+
+        Args:
+            product (Product): O produto, com id.
+        """
+        with self._lock:
+            self._remove(product.id)
+            self._add(product)
+
+    def remove(self, product_id):
+        """
+        Remove um produto do índice (não faz nada se ele não estiver no índice).
+
+        Args:
+            product_id (int): O ID do produto.
+        """
+        with self._lock:
+            self._remove(product_id)
+
+    def refresh(self, product_id):
+        """
+        Relê um produto do repositório e atualiza o índice: o produto entra, muda de nome ou
+        de estoque, ou sai (se não existir mais). É a função registrada como listener.
+
+        Args:
+            product_id (int): O ID do produto.
+        """
+        product = repository.get_product_by_id(product_id)
+        with self._lock:
+            self._remove(product_id)
+            if product is not None:
+                self._add(product)
+
+    def set_sales(self, product_id, units):
+        """
+        Atualiza as unidades vendidas de um produto (placar 'sales').
+
+        Args:
+            product_id (int): O ID do produto.
+            units (int): As unidades vendidas na janela do placar.
+        """
+        with self._lock:
+            self._sales[product_id] = units
+            stored = self._products.get(product_id)
+            if stored is not None:
+                self._remove(product_id)
+                self._add(stored[2])
+
+    def listen(self):
+        """
+        Registra o índice no repositório para receber os produtos adicionados, alterados e removidos.
+        """
+        if not self._listening:
+            repository.add_product_listener(self.refresh)
+            self._listening = True
+
+    def close(self):
+        """
+        Cancela o registro feito por listen (o índice continua consultável, mas para de se atualizar).
+        """
+        if self._listening:
+            repository.remove_product_listener(self.refresh)
+            self._listening = False
+
+    def _postings_for(self, prefix):
+        # As listas de entradas dos produtos com alguma palavra começando com o prefixo
+        if len(prefix) <= _SHORT_PREFIX_LENGTH:
+            posting = self._short_postings.get(prefix)
+            return [posting] if posting else []
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + '\U0010ffff', start)
+        return [self._postings[word] for word in self._vocabulary[start:end]]
+
+    def complete(self, query, limit=AUTOCOMPLETE_LIMIT):
+        """
+        Sugere produtos para o texto digitado até agora.
+
+        Args:
+            query (str): O texto digitado; cada palavra é o início de uma palavra do nome.
+            limit (int, optional): Quantos produtos retornar. Defaults to AUTOCOMPLETE_LIMIT.
+
+        Returns:
+            list[Product]: Até 'limit' produtos, do maior para o menor placar (empates pelo
+                nome), ou uma lista vazia se nada for digitado.
+        """
+        prefixes = sorted(set(_words(query)), key=len, reverse=True)
+        if not prefixes or limit <= 0:
+            return []
+        # Um prefixo que é o começo de outro mais longo ('pr' e 'prata') não restringe nada a mais
+        prefixes = [prefix for i, prefix in enumerate(prefixes)
+                    if not any(other.startswith(prefix) for other in prefixes[:i])]
+        with self._lock:
+            matches = []
+            for prefix in prefixes:
+                postings = self._postings_for(prefix)
+                if not postings:
+                    return []
+                matches.append((sum(len(posting) for posting in postings), prefix, postings))
+            # Percorre o prefixo com menos produtos, do maior placar para o menor, e confere os outros
+            _, driver_prefix, driver_postings = min(matches, key=lambda match: match[0])
+            others = [' ' + prefix for _, prefix, _ in matches if prefix != driver_prefix]
+            if len(driver_postings) == 1:
+                candidates = iter(driver_postings[0])
+            else:
+                candidates = heapq.merge(*driver_postings)
+            results = []
+            seen = set()
+            for entry in candidates:
+                product_id = entry[2]
+                if product_id in seen:
+                    continue
+                seen.add(product_id)
+                _, text, product = self._products[product_id]
+                if all(prefix in text for prefix in others):
+                    results.append(product)
+                    if len(results) == limit:
+                        break
+            return results
+
+
+if __name__ == '__main__':
+    from models import Product
+
+    # Usa o banco montado pelo repository.py (rode-o antes para ter dados de exemplo)
+    repository.db.create_tables()
+    index = ProductAutocomplete.from_repository(ranking='stock')
+    print(f'\nÍndice montado com {len(index)} produtos')
+    for typed in ('b', 'brin', 'BRINCO pérola', 'tiara fe', 'xyz'):
+        print(f"--> {typed!r}: {[product.name for product in index.complete(typed)]}")
+
+    print('\nTestando a atualização incremental...')
+    new_product_id = repository.add_product(Product(name='Tiara de Pérola', price=4500, stock_quantity=500,
+                                                    category=repository.get_category_by_id(1)))
+    print(f"--> 'tiara' depois de adicionar: {[product.name for product in index.complete('tiara')]}")
+    repository.update_product(new_product_id, repository.ADMIN_PASSWORD, new_name='Coroa de Pérola')
+    print(f"--> 'tiara' depois de renomear: {[product.name for product in index.complete('tiara')]}")
+    repository.delete_product(new_product_id, repository.ADMIN_PASSWORD)
+    print(f"--> 'coroa' depois de remover: {[product.name for product in index.complete('coroa')]} (Esperado: [])")
+    category = repository.get_category_by_id(2)
+    repository.upsert_products([Product(name='Colar Dourado', price=9000, stock_quantity=3, category=category)])
+    repository.add_multiples_products([Product(name='Colar Rubi', price=9900, stock_quantity=2, category=category)])
+    bulk_products = index.complete('colar dou') + index.complete('colar ru')
+    print(f"--> Depois das gravações em lote: {[product.name for product in bulk_products]} (Esperado: ['Colar Dourado', 'Colar Rubi'])")
+    for product in bulk_products:
+        repository.delete_product(product.id, repository.ADMIN_PASSWORD)
+    index.close()
@@ -0,0 +1,869 @@
+"""
+Benchmarks de desempenho do backend do quiosque.
+
+Cada cenário roda em um banco de dados temporário (o quiosque.db real nunca é tocado).
+Uso:
+    python3 benchmark.py                 # roda todos os cenários
+    python3 benchmark.py storage         # roda apenas o cenário escolhido
+"""
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import async_repository
+import autocomplete
+import checkout
+import database as db
+import importer
+import reports
+import repository
+from models import Category, Product, Sale
+
+
+@contextlib.contextmanager
+def temporary_database(profile=None):
+    """
+    Aponta o módulo database para um arquivo temporário durante o bloco 'with'.
+
+    Args:
+        profile (str, optional): O perfil de armazenamento usado na criação das tabelas.
+    """
+    original_file = db.DB_FILE
+    original_profile = db.DB_STORAGE_PROFILE
+    with tempfile.TemporaryDirectory() as directory:
+        db.DB_FILE = os.path.join(directory, 'benchmark.db')
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.create_tables(profile)
+            yield db.DB_FILE
+        finally:
+            db.close_pool()
+            db.DB_FILE = original_file
+            db.DB_STORAGE_PROFILE = original_profile
+
+
+def seed_catalog(product_count, stock=1_000_000):
+    """
+    Cria uma categoria e 'product_count' produtos com estoque alto para os cenários de venda.
+    """
+    db.add_category('Benchmark')
+    db.add_multiple_products([
+        {'nome_produto': f'Produto {i}', 'preco': 1000 + i % 50 * 100, 'quantidade_estoque': stock, 'id_categoria': 1}
+        for i in range(product_count)
+    ])
+
+
+def bench_storage_profiles(duration=3.0, cart_size=3, readers=2):
+    """
+    Mede quantas vendas por segundo register_sale consegue gravar enquanto outras
+    threads executam list_sales sem parar, para cada perfil de armazenamento.
+    """
+    print('\n=== register_sale com list_sales concorrente, por perfil de armazenamento ===')
+    print(f'{"perfil":<10} {"journal":<8} {"vendas/s":>10} {"leituras/s":>11}')
+
+    # Referência: o modo antigo (rollback journal) com os demais PRAGMAs do perfil 'durable'
+    db.STORAGE_PROFILES['rollback'] = dict(db.STORAGE_PROFILES['durable'], journal_mode='DELETE')
+    try:
+        for profile in ('rollback', 'durable', 'balanced', 'fast'):
+            with temporary_database(profile):
+                seed_catalog(50)
+                stop = threading.Event()
+                reads = [0] * readers
+
+                def reader(index):
+                    while not stop.is_set():
+                        db.list_sales()
+                        reads[index] += 1
+
+                threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+                for thread in threads:
+                    thread.start()
+
+                sales = 0
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    while time.perf_counter() - started < duration:
+                        first = sales % 50 + 1
+                        cart = [(first + i, 1) for i in range(cart_size) if first + i <= 50]
+                        if db.register_sale(cart):
+                            sales += 1
+                elapsed = time.perf_counter() - started
+                stop.set()
+                for thread in threads:
+                    thread.join()
+
+                journal = db.STORAGE_PROFILES[profile]['journal_mode']
+                print(f'{profile:<10} {journal:<8} {sales / elapsed:>10.0f} {sum(reads) / elapsed:>11.0f}')
+    finally:
+        del db.STORAGE_PROFILES['rollback']
+
+
+def _checkout_worker(db_file, profile, sale_count, sku_count, seed):
+    # Roda em outro processo: simula um caixa vendendo sempre os mesmos poucos produtos
+    db.DB_FILE = db_file
+    db.DB_STORAGE_PROFILE = profile
+    generator = random.Random(seed)
+    approved = rejected = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(sale_count):
+            cart = [(generator.randint(1, sku_count), generator.randint(1, 3)) for _ in range(2)]
+            if db.register_sale(cart):
+                approved += 1
+            else:
+                rejected += 1
+    return approved, rejected
+
+
+def bench_concurrent_checkout(processes=4, sales_per_process=400, sku_count=5, stock=1000):
+    """
+    Teste de estresse: vários processos vendem os mesmos produtos ao mesmo tempo, com
+    demanda maior que o estoque. Verifica que o estoque nunca fica negativo e que tudo o
+    que saiu do estoque corresponde exatamente aos itens vendidos.
+    """
+    print('\n=== Checkout concorrente (multiprocesso) nos mesmos produtos ===')
+    with temporary_database('balanced') as db_file:
+        seed_catalog(sku_count, stock=stock)
+        db.close_pool()
+
+        started = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(_checkout_worker, [
+                (db_file, 'balanced', sales_per_process, sku_count, seed) for seed in range(processes)
+            ])
+        elapsed = time.perf_counter() - started
+
+        approved = sum(result[0] for result in results)
+        rejected = sum(result[1] for result in results)
+        with db.get_connection() as connection:
+            lowest_stock = connection.execute('SELECT MIN(quantidade_estoque) FROM produtos').fetchone()[0]
+            remaining = connection.execute('SELECT SUM(quantidade_estoque) FROM produtos').fetchone()[0]
+            sold = connection.execute('SELECT COALESCE(SUM(quantidade), 0) FROM itens_da_venda').fetchone()[0]
+            sales_in_db = connection.execute('SELECT COUNT(*) FROM vendas').fetchone()[0]
+
+        print(f'{processes} processos, {approved + rejected} tentativas em {elapsed:.2f}s')
+        print(f'aprovadas: {approved} ({approved / elapsed:.0f} vendas/s), recusadas: {rejected}')
+        print(f'menor estoque final: {lowest_stock}')
+        assert lowest_stock >= 0, 'estoque negativo!'
+        assert sales_in_db == approved, 'vendas aprovadas e gravadas não conferem'
+        assert sku_count * stock - remaining == sold, 'baixa de estoque e itens vendidos não conferem'
+        print('OK: estoque nunca ficou negativo e a baixa confere com os itens vendidos')
+
+
+def _timed(function, repeat=5):
+    # Melhor tempo (ms) entre 'repeat' execuções
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _print_plan(connection, sql, params):
+    for row in connection.execute(f'EXPLAIN QUERY PLAN {sql}', params):
+        print(f'    {row["detail"]}')
+
+
+def seed_sales(sale_count, product_count=1000, days=365):
+    """
+    Insere 'sale_count' vendas (com um item cada) espalhadas pelos últimos 'days' dias,
+    direto em lote, sem passar pela regra de negócio de register_sale (os resumos de
+    vendas não são atualizados; use db.rebuild_sales_summary se precisar deles).
+    """
+    first_day = datetime(2025, 1, 1)
+    generator = random.Random(42)
+    with db.get_connection() as connection:
+        connection.executemany(
+            'INSERT INTO vendas (id_venda, data_hora, valor_total) VALUES (?, ?, ?)',
+            ((sale_id, (first_day + timedelta(seconds=generator.randrange(days * 86400))).strftime('%Y-%m-%d %H:%M:%S'), 1000)
+             for sale_id in range(1, sale_count + 1))
+        )
+        connection.executemany(
+            'INSERT INTO itens_da_venda (id_venda, id_produto, quantidade, preco_unitario) VALUES (?, ?, 1, 1000)',
+            ((sale_id, generator.randint(1, product_count)) for sale_id in range(1, sale_count + 1))
+        )
+        connection.commit()
+
+
+def bench_indexes(sale_count=1_000_000, product_count=100_000):
+    """
+    Compara planos de execução e tempos das buscas por data, por categoria e por produto
+    antes e depois da migração de índices, com 'sale_count' vendas no banco.
+    """
+    print(f'\n=== Índices secundários com {sale_count:,} vendas e {product_count:,} produtos ===')
+    with temporary_database('fast'):
+        with db.get_connection() as connection:
+            connection.execute('DROP INDEX idx_vendas_data_hora')
+            connection.execute('DROP INDEX idx_produtos_id_categoria')
+            connection.execute('DROP INDEX idx_itens_da_venda_id_produto')
+            connection.executemany('INSERT INTO categorias (nome_categoria) VALUES (?)',
+                                   ((f'Categoria {i}',) for i in range(50)))
+            connection.executemany(
+                'INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (?, 1000, 100, ?)',
+                ((f'Produto {i}', i % 50 + 1) for i in range(product_count))
+            )
+            connection.commit()
+        seed_sales(sale_count, product_count)
+
+        queries = [
+            ('vendas de um dia (antes: DATE(data_hora) = ?)',
+             'SELECT * FROM vendas WHERE DATE(data_hora) = ?', ('2025-06-15',),
+             'SELECT * FROM vendas WHERE data_hora >= ? AND data_hora < ?', ('2025-06-15', '2025-06-16')),
+            ('produtos de uma categoria',
+             'SELECT id_produto, nome_produto, preco, quantidade_estoque FROM produtos WHERE id_categoria = ?', (7,),
+             None, None),
+            ('itens vendidos de um produto',
+             'SELECT id_venda, quantidade FROM itens_da_venda WHERE id_produto = ?', (123,),
+             None, None),
+        ]
+
+        timings = {}
+        with db.get_connection() as connection:
+            print('\n--- ANTES (sem índices) ---')
+            for label, sql, params, _, _ in queries:
+                print(f'  {label}:')
+                _print_plan(connection, sql, params)
+                timings[label] = _timed(lambda: connection.execute(sql, params).fetchall())
+
+        with db.get_connection() as connection:
+            # Reaplica só os passos da migração 1 (as outras já estão no banco)
+            for step in db.MIGRATIONS[0][2]:
+                connection.execute(step)
+            connection.commit()
+            print('\n--- DEPOIS (migração 1 + intervalo semiaberto) ---')
+            rows = []
+            for label, sql, params, new_sql, new_params in queries:
+                new_sql, new_params = new_sql or sql, new_params or params
+                print(f'  {label}:')
+                _print_plan(connection, new_sql, new_params)
+                after = _timed(lambda: connection.execute(new_sql, new_params).fetchall())
+                rows.append((label, timings[label], after))
+
+        print(f'\n{"consulta":<48} {"antes (ms)":>11} {"depois (ms)":>12}')
+        for label, before, after in rows:
+            print(f'{label:<48} {before:>11.2f} {after:>12.2f}')
+
+
+def bench_cart(sizes=(1_000, 10_000)):
+    """
+    Microbenchmark de montagem de carrinho: total mantido a cada item (atual) versus a
+    soma de todos os itens a cada adição (comportamento antigo, O(n²)), e o tempo para
+    remover todas as linhas, da primeira à última, de um carrinho montado.
+    """
+    print('\n=== Montagem de carrinho: total incremental vs. recalcular a cada item ===')
+    print(f'{"linhas":>8} {"recalculando (ms)":>18} {"incremental (ms)":>17} {"montar + remover tudo (ms)":>27}')
+    category = Category('Benchmark', id=1)
+    for size in sizes:
+        products = [Product(f'Produto {i}', 1000 + i % 7 * 100, category, 100, id=i) for i in range(1, size + 1)]
+
+        def full_resum():
+            sale = Sale()
+            for product in products:
+                sale.add_item(product, 2)
+                sale.update_total_value()
+            return sale
+
+        def incremental():
+            sale = Sale()
+            for product in products:
+                sale.add_item(product, 2)
+            return sale
+
+        def remove_all():
+            sale = incremental()
+            for product in products:
+                sale.remove_item(product)
+            return sale
+
+        assert full_resum().total_value == incremental().total_value
+        assert remove_all().total_value == 0 and not remove_all().items
+        print(f'{size:>8} {_timed(full_resum, repeat=3):>18.1f} {_timed(incremental, repeat=3):>17.1f} '
+              f'{_timed(remove_all, repeat=3):>27.1f}')
+
+
+def _peak_memory_mb(function):
+    # Pico de memória alocada (MB) durante a chamada, medido com tracemalloc
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+class _DictCategory:
+    # Equivalentes com __dict__ por instância, só para comparação com os modelos com __slots__
+    def __init__(self, name, id=None):
+        self.name = name
+        self.id = id
+
+
+class _DictProduct:
+    def __init__(self, name, price, category, stock_quantity, id=None):
+        self.name = name
+        self._price = price
+        self._stock_quantity = stock_quantity
+        self.category = category
+        self.id = id
+
+
+class _DictSale:
+    def __init__(self, id=None, date_hour=None, total_value=0):
+        self.id = id
+        self.date_hour = date_hour
+        self._items_by_product = {}
+        self.total_value = total_value
+
+
+def bench_memory(product_count=500_000, sale_count=1_000_000, category_count=20):
+    """
+    Mede com tracemalloc o pico de memória para carregar 'product_count' produtos e
+    'sale_count' vendas pelo repository.py, comparando os modelos atuais (__slots__ e
+    categorias compartilhadas) com objetos equivalentes baseados em __dict__.
+    """
+    print(f'\n=== Memória para carregar {product_count:,} produtos e {sale_count:,} vendas ===')
+    with temporary_database('fast'):
+        with db.get_connection() as connection:
+            connection.executemany('INSERT INTO categorias (nome_categoria) VALUES (?)',
+                                   ((f'Categoria {i}',) for i in range(category_count)))
+            connection.executemany(
+                'INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (?, 1000, 100, ?)',
+                ((f'Produto {i}', i % category_count + 1) for i in range(product_count))
+            )
+            connection.commit()
+        seed_sales(sale_count, product_count)
+
+        def dict_products():
+            return [
+                _DictProduct(row['nome_produto'], row['preco'],
+                             _DictCategory(row['nome_categoria'], row['id_categoria']),
+                             row['quantidade_estoque'], row['id_produto'])
+                for row in db.list_products()
+            ]
+
+        def dict_sales():
+            return [_DictSale(row['id_venda'], row['data_hora'], row['valor_total']) for row in db.list_sales()]
+
+        def stream_products():
+            return sum(1 for _ in repository.iter_products())
+
+        print(f'{"carga":<44} {"pico (MB)":>10}')
+        for label, function in [
+            ('produtos com __dict__ e Category por linha', dict_products),
+            ('repository.get_all_products (__slots__)', repository.get_all_products),
+            ('repository.iter_products (streaming)', stream_products),
+            ('vendas com __dict__', dict_sales),
+            ('repository.get_all_sales (__slots__)', repository.get_all_sales),
+        ]:
+            result, peak = _peak_memory_mb(function)
+            print(f'{label:<44} {peak:>10.1f}')
+            del result
+
+        products = repository.get_all_products()
+        distinct_categories = len({id(product.category) for product in products})
+        print(f'objetos Category distintos em get_all_products: {distinct_categories}')
+
+
+def bench_goods_receipt(line_count=100_000, product_count=100_000):
+    """
+    Mede o tempo de uma entrada de mercadorias com 'line_count' linhas via receive_stock,
+    comparado a chamar update_product_stock uma vez por produto.
+    """
+    print(f'\n=== Entrada de mercadorias com {line_count:,} linhas ===')
+    with temporary_database('balanced'):
+        seed_catalog(product_count, stock=10)
+        generator = random.Random(7)
+        lines = [(generator.randint(1, product_count), generator.randint(1, 50)) for _ in range(line_count)]
+
+        started = time.perf_counter()
+        result = db.receive_stock(lines)
+        elapsed = time.perf_counter() - started
+        assert result['applied']
+        print(f'receive_stock: {elapsed:.2f}s ({line_count / elapsed:,.0f} linhas/s)')
+
+        sample = lines[:2000]
+        started = time.perf_counter()
+        for product_id, delta in sample:
+            db.update_product_stock(product_id, delta)
+        per_call = (time.perf_counter() - started) / len(sample)
+        print(f'update_product_stock uma a uma: ~{per_call * line_count:.2f}s estimados para {line_count:,} linhas')
+
+
+def bench_catalog_import(line_count=1_000_000, category_count=200):
+    """
+    Gera um CSV com 'line_count' produtos e o importa com importer.import_catalog,
+    reportando linhas/s e o pico de memória do processo (RSS).
+    """
+    print(f'\n=== Importação de catálogo CSV com {line_count:,} linhas ===')
+    with temporary_database('balanced') as db_file:
+        csv_path = os.path.join(os.path.dirname(db_file), 'catalogo.csv')
+        with open(csv_path, 'w', encoding='utf-8') as file:
+            file.write('nome_produto,preco,nome_categoria,quantidade_estoque\n')
+            for i in range(line_count):
+                file.write(f'Produto Meia-Lua {i},{10 + i % 90}.90,Categoria {i % category_count},{i % 50}\n')
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        report = importer.import_catalog(csv_path)
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{report['rows']:,} linhas em {report['seconds']:.1f}s ({report['rows_per_second']:,.0f} linhas/s)")
+        print(f"inseridos: {report['inserted']:,}, recusados: {report['rejected']}, categorias criadas: {report['categories_created']}")
+        print(f'pico de memória do processo: {rss_before:.0f} MB antes, {rss_after:.0f} MB depois')
+
+
+def bench_reports(sale_count=1_000_000, product_count=1_000, category_count=50):
+    """
+    Compara os relatórios diário, semanal e mensal lidos dos resumos pré-agregados com as
+    mesmas somas calculadas percorrendo vendas e itens_da_venda, e mede o custo extra que
+    a manutenção dos resumos adiciona a register_sale.
+    """
+    print(f'\n=== Relatórios com {sale_count:,} vendas ===')
+    with temporary_database('fast'):
+        with db.get_connection() as connection:
+            connection.executemany('INSERT INTO categorias (nome_categoria) VALUES (?)',
+                                   ((f'Categoria {i}',) for i in range(category_count)))
+            connection.executemany(
+                'INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (?, 1000, 1000000, ?)',
+                ((f'Produto {i}', i % category_count + 1) for i in range(product_count))
+            )
+            connection.commit()
+        seed_sales(sale_count, product_count)
+
+        started = time.perf_counter()
+        assert db.rebuild_sales_summary()
+        print(f'rebuild_sales_summary: {time.perf_counter() - started:.2f}s')
+
+        scan_sql = """
+            SELECT p.id_categoria, COUNT(DISTINCT v.id_venda), SUM(iv.quantidade), SUM(iv.quantidade * iv.preco_unitario)
+            FROM vendas v
+            JOIN itens_da_venda iv ON iv.id_venda = v.id_venda
+            JOIN produtos p ON p.id_produto = iv.id_produto
+            WHERE v.data_hora >= ? AND v.data_hora < ?
+            GROUP BY p.id_categoria
+        """
+        reports = [
+            ('diário', ('2025-06-15', '2025-06-16'), lambda: repository.get_daily_report('2025-06-15')),
+            ('semanal', ('2025-06-09', '2025-06-16'), lambda: repository.get_weekly_report('2025-06-15')),
+            ('mensal', ('2025-06-01', '2025-07-01'), lambda: repository.get_monthly_report(2025, 6)),
+            ('anual', ('2025-01-01', '2026-01-01'), lambda: repository.get_sales_report('2025-01-01', '2026-01-01', 'month')),
+        ]
+        print(f'\n{"relatório":<12} {"varrendo vendas (ms)":>21} {"resumos (ms)":>13}')
+        with db.get_connection() as connection:
+            for label, params, report in reports:
+                scan = _timed(lambda: connection.execute(scan_sql, params).fetchall())
+                summary = _timed(report)
+                print(f'{label:<12} {scan:>21.2f} {summary:>13.2f}')
+
+        sales = 2000
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            for i in range(sales):
+                db.register_sale([(i % product_count + 1, 1), ((i * 7) % product_count + 1, 2)])
+            with_summary = (time.perf_counter() - started) / sales
+        print(f'\nregister_sale com manutenção dos resumos: {with_summary * 1000:.3f} ms por venda')
+
+
+def bench_reporting_engine(sale_count=1_000_000, items_per_sale=5, product_count=2_000, category_count=50):
+    """
+    Mede o módulo reports com sale_count x items_per_sale linhas em itens_da_venda (5M por
+    padrão): o total do dia somado em Python sobre repository.get_sales_by_date contra o
+    SQL, e cada agrupamento pelos resumos pré-agregados e pela soma direta nas tabelas.
+    """
+    print(f'\n=== Motor de relatórios com {sale_count * items_per_sale:,} itens vendidos ===')
+    with temporary_database('fast'):
+        generator = random.Random(11)
+        first_day = datetime(2025, 1, 1)
+        with db.get_connection() as connection:
+            connection.executemany('INSERT INTO categorias (nome_categoria) VALUES (?)',
+                                   ((f'Categoria {i}',) for i in range(category_count)))
+            connection.executemany(
+                'INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (?, ?, 1000000, ?)',
+                ((f'Produto {i}', (1 + i % 90) * 100, i % category_count + 1) for i in range(product_count))
+            )
+            # Vendas em ordem cronológica, como acontece no caixa
+            moments = sorted(generator.randrange(365 * 86400) for _ in range(sale_count))
+            connection.executemany(
+                'INSERT INTO vendas (id_venda, data_hora, valor_total) VALUES (?, ?, 0)',
+                ((sale_id, (first_day + timedelta(seconds=moment)).strftime('%Y-%m-%d %H:%M:%S'))
+                 for sale_id, moment in enumerate(moments, start=1))
+            )
+            connection.executemany(
+                'INSERT INTO itens_da_venda (id_venda, id_produto, quantidade, preco_unitario) VALUES (?, ?, ?, ?)',
+                ((sale_id, product_id, generator.randint(1, 3), (1 + (product_id - 1) % 90) * 100)
+                 for sale_id in range(1, sale_count + 1)
+                 for product_id in generator.sample(range(1, product_count + 1), items_per_sale))
+            )
+            connection.execute("""
+                UPDATE vendas SET valor_total = (
+                    SELECT SUM(quantidade * preco_unitario) FROM itens_da_venda WHERE id_venda = vendas.id_venda
+                )
+            """)
+            connection.commit()
+
+        started = time.perf_counter()
+        assert db.rebuild_sales_summary()
+        print(f'rebuild_sales_summary: {time.perf_counter() - started:.1f}s')
+
+        day, next_day = '2025-06-15', '2025-06-16'
+        python_loop = _timed(lambda: sum(sale.total_value for sale in repository.get_sales_by_date(day)), repeat=3)
+        sql_total = _timed(lambda: reports.sales_totals(day, next_day), repeat=3)
+        print(f'total do dia: laço em Python {python_loop:.2f} ms, reports.sales_totals {sql_total:.2f} ms')
+
+        ranges = [('mês', '2025-06-01', '2025-07-01'), ('ano', '2025-01-01', '2026-01-01')]
+        groupings = [
+            ('por dia', lambda start, end: db.summarize_sales(start, end, 'day'),
+             lambda start, end: db.aggregate_sales_by_time(start, end, 'day')),
+            ('por produto (top 20)', lambda start, end: db.summarize_sales_by_product(start, end, 20),
+             lambda start, end: db.aggregate_sales_by_product(start, end, 20)),
+            ('por categoria', db.summarize_sales_by_category, db.aggregate_sales_by_category),
+            ('por hora do dia', None, lambda start, end: db.aggregate_sales_by_time(start, end, 'hour')),
+        ]
+        print(f'\n{"agrupamento":<22} {"intervalo":<10} {"resumos (ms)":>13} {"soma direta (ms)":>17}')
+        for label, from_summary, from_tables in groupings:
+            for range_label, start, end in ranges:
+                summary = f'{_timed(lambda: from_summary(start, end), repeat=3):>13.2f}' if from_summary else f'{"-":>13}'
+                direct = _timed(lambda: from_tables(start, end), repeat=1)
+                print(f'{label:<22} {range_label:<10} {summary} {direct:>17.2f}')
+
+
+def bench_cash_registers(registers=4, sales_per_register=500, history=1_000_000):
+    """
+    Vende em 'registers' caixas abertos ao mesmo tempo (uma thread por caixa), confere os
+    totais acumulados contra as vendas gravadas e compara o fechamento (leitura da linha
+    do caixa) com somar as vendas de um caixa com 'history' vendas.
+    """
+    print(f'\n=== {registers} caixas simultâneos, {sales_per_register} vendas cada ===')
+    with temporary_database('balanced'):
+        seed_catalog(50)
+        with contextlib.redirect_stdout(io.StringIO()):
+            register_ids = [db.open_register(10000, f'Operador {i}') for i in range(registers)]
+
+            def cashier(register_id):
+                for i in range(sales_per_register):
+                    first = (register_id * 7 + i) % 48 + 1
+                    assert db.register_sale([(first, 1), (first + 1, 2)], register_id=register_id)
+
+            threads = [threading.Thread(target=cashier, args=(register_id,)) for register_id in register_ids]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        print(f'{registers * sales_per_register / elapsed:,.0f} vendas/s com {registers} caixas')
+
+        with db.get_connection() as connection:
+            for register_id in register_ids:
+                register = db.find_register_by_id(register_id)
+                count, total = connection.execute(
+                    'SELECT COUNT(*), SUM(valor_total) FROM vendas WHERE id_caixa = ?', (register_id,)).fetchone()
+                assert register['quantidade_vendas'] == count == sales_per_register
+                assert register['total_vendas'] == total
+        print('totais acumulados conferem com as vendas de cada caixa')
+
+        with db.get_connection() as connection:
+            first_new_id = connection.execute('SELECT MAX(id_venda) FROM vendas').fetchone()[0] + 1
+            connection.executemany(
+                "INSERT INTO vendas (id_venda, data_hora, valor_total, id_caixa) VALUES (?, '2025-06-15 12:00:00', 1000, ?)",
+                ((sale_id, register_ids[0]) for sale_id in range(first_new_id, first_new_id + history)))
+            connection.commit()
+            scan = _timed(lambda: connection.execute(
+                'SELECT COUNT(*), SUM(valor_total) FROM vendas WHERE id_caixa = ?', (register_ids[0],)).fetchone())
+        read = _timed(lambda: db.find_register_by_id(register_ids[0]))
+        print(f'fechamento com {history:,} vendas no caixa: somando as vendas {scan:.2f} ms, '
+              f'lendo os totais do caixa {read:.3f} ms')
+
+
+def bench_async_repository(request_count=3000, concurrency=32, product_count=2000, sale_count=200_000):
+    """
+    Teste de carga da fachada assíncrona: 'request_count' requisições (páginas de vendas,
+    relatórios do dia, produtos por id e vendas novas) com até 'concurrency' em andamento,
+    chamando o repository.py direto no event loop (síncrono) e pelo async_repository.
+    Mostra requisições/s, latência p95 e o maior atraso sofrido pelo event loop.
+    """
+    print(f'\n=== Fachada assíncrona: {request_count:,} requisições, {concurrency} simultâneas ===')
+    with temporary_database('balanced'):
+        seed_catalog(product_count)
+        seed_sales(sale_count, product_count)
+        db.rebuild_sales_summary()
+        products = [repository.get_product_by_id(product_id) for product_id in range(1, 101)]
+
+        generator = random.Random(5)
+        first_day = datetime(2025, 1, 1)
+        requests = []
+        for _ in range(request_count):
+            kind = generator.choices(('page', 'report', 'product', 'sale'), weights=(50, 20, 20, 10))[0]
+            day = first_day + timedelta(days=generator.randrange(365))
+            requests.append((kind, day, generator.choice(products)))
+
+        def call(functions, kind, day, product):
+            if kind == 'page':
+                return functions.get_sales_page(50, start=day, end=day + timedelta(days=1))
+            if kind == 'report':
+                return functions.get_daily_report(day)
+            if kind == 'product':
+                return functions.get_product_by_id(product.id)
+            sale = Sale()
+            sale.add_item(product, 1)
+            return functions.register_sale(sale)
+
+        async def load_test(use_async):
+            latencies = []
+            finished = asyncio.Event()
+
+            lags = []
+
+            async def lag_monitor():
+                while not finished.is_set():
+                    expected = time.perf_counter() + 0.001
+                    await asyncio.sleep(0.001)
+                    lags.append(time.perf_counter() - expected)
+
+            slots = asyncio.Semaphore(concurrency)
+
+            async def request(kind, day, product):
+                async with slots:
+                    started = time.perf_counter()
+                    if use_async:
+                        await call(async_repository, kind, day, product)
+                    else:
+                        call(repository, kind, day, product)
+                        await asyncio.sleep(0)
+                    latencies.append(time.perf_counter() - started)
+
+            monitor = asyncio.create_task(lag_monitor())
+            started = time.perf_counter()
+            await asyncio.gather(*(request(*arguments) for arguments in requests))
+            elapsed = time.perf_counter() - started
+            finished.set()
+            await monitor
+            latencies.sort()
+            lags.sort()
+            return (len(requests) / elapsed, latencies[int(len(latencies) * 0.95)] * 1000,
+                    lags[int(len(lags) * 0.99)] * 1000, lags[-1] * 1000)
+
+        print(f'{"caminho":<22} {"requisições/s":>14} {"p95 (ms)":>9} {"atraso do loop p99/máx. (ms)":>29}')
+        for label, read_workers in (('síncrono', None), ('assíncrono, 1 leitor', 1),
+                                    ('assíncrono, 2 leitores', 2), ('assíncrono, 4 leitores', 4)):
+            repository.clear_caches()
+            if read_workers:
+                async_repository.configure_executors(read_workers)
+            with contextlib.redirect_stdout(io.StringIO()):
+                throughput, p95, lag_p99, lag_max = asyncio.run(load_test(read_workers is not None))
+            print(f'{label:<22} {throughput:>14,.0f} {p95:>9.2f} {lag_p99:>19.2f} / {lag_max:.2f}')
+        async_repository.shutdown_executors()
+
+
+def bench_group_commit(cashier_counts=(4, 16), sales_per_cashier=300, product_count=500):
+    """
+    Compara threads de caixa chamando repository.register_sale (uma transação por venda)
+    com as mesmas threads enviando as vendas ao escritor único do checkout.py (group
+    commit), nos perfis 'durable' (fsync a cada COMMIT) e 'balanced'. O escritor é testado
+    com a configuração padrão (grava assim que a fila esvazia) e esperando 2 ms por
+    companhia. Mostra vendas/s, a latência p50/p99 de cada venda (do envio até a
+    confirmação) e, para cada perfil, se o group commit compensou.
+    """
+    configurations = (
+        ('uma transação por venda', None),
+        ('group commit (padrão)', {}),
+        ('group commit (espera 2 ms)', {'wait_ms': 2}),
+    )
+    for cashiers in cashier_counts:
+        print(f'\n=== Group commit: {cashiers} caixas, {sales_per_cashier} vendas cada ===')
+        print(f'{"perfil":<10} {"caminho":<28} {"vendas/s":>10} {"p50 (ms)":>9} {"p99 (ms)":>9} {"transações":>11}')
+        for profile in ('durable', 'balanced'):
+            throughput = {}
+            for label, writer_options in configurations:
+                with temporary_database(profile):
+                    seed_catalog(product_count)
+                    products = repository.get_all_products()
+                    writer = checkout.CheckoutWriter(**writer_options) if writer_options is not None else None
+                    latencies = []
+                    latencies_lock = threading.Lock()
+
+                    def cashier(seed):
+                        generator = random.Random(seed)
+                        own_latencies = []
+                        for _ in range(sales_per_cashier):
+                            sale = Sale()
+                            for product in generator.sample(products, 3):
+                                sale.add_item(product, generator.randint(1, 3))
+                            started = time.perf_counter()
+                            if writer:
+                                sale_id = writer.submit(sale).result()
+                            else:
+                                sale_id = repository.register_sale(sale)
+                            own_latencies.append(time.perf_counter() - started)
+                            assert sale_id
+                        with latencies_lock:
+                            latencies.extend(own_latencies)
+
+                    threads = [threading.Thread(target=cashier, args=(seed,)) for seed in range(cashiers)]
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        started = time.perf_counter()
+                        for thread in threads:
+                            thread.start()
+                        for thread in threads:
+                            thread.join()
+                        elapsed = time.perf_counter() - started
+                    if writer:
+                        writer.close()
+                    transactions = writer.batches if writer else len(latencies)
+                    assert len(db.list_sales()) == cashiers * sales_per_cashier
+                    latencies.sort()
+                    throughput[label] = len(latencies) / elapsed
+                    print(f'{profile:<10} {label:<28} {throughput[label]:>10,.0f} '
+                          f'{latencies[len(latencies) // 2] * 1000:>9.2f} '
+                          f'{latencies[int(len(latencies) * 0.99)] * 1000:>9.2f} {transactions:>11,}')
+            baseline = throughput.pop('uma transação por venda')
+            best_label, best = max(throughput.items(), key=lambda item: item[1])
+            # Abaixo de 10% de ganho, a diferença fica dentro do ruído da medição
+            if best >= baseline * 1.1:
+                print(f'{profile:<10} -> melhor: {best_label}, {best / baseline:.1f}x as vendas/s de uma transação por venda')
+            else:
+                print(f'{profile:<10} -> group commit NÃO compensou aqui ({best / baseline:.1f}x): '
+                      f'use register_sale direto com {cashiers} caixas neste perfil')
+
+
+_SEARCH_ITEMS = ('Brinco', 'Colar', 'Pulseira', 'Anel', 'Tiara', 'Tornozeleira', 'Pingente', 'Bracelete',
+                 'Presilha', 'Gargantilha', 'Broche', 'Piercing', 'Relógio', 'Óculos', 'Bolsa', 'Carteira')
+_SEARCH_DETAILS = ('de Prata', 'de Ouro', 'de Pérola', 'de Festa', 'de Couro', 'de Argola', 'Dourado',
+                   'Folheado', 'com Strass', 'de Miçanga', 'Infantil', 'de Aço', 'Rosé', 'de Madeira')
+_SEARCH_CATEGORIES = ('Brincos', 'Colares', 'Pulseiras', 'Anéis', 'Cabelo', 'Relógios', 'Bolsas e Carteiras',
+                      'Óculos', 'Infantil', 'Festa', 'Masculino', 'Promoção')
+_SEARCH_COLORS = ('Azul', 'Branco', 'Preto', 'Vermelho', 'Lilás', 'Verde', 'Coração', 'Estrela', 'Flor', 'Lua')
+
+
+def _search_catalog_name(index):
+    # Nomes parecidos com os reais, únicos graças ao código no final
+    return (f'{_SEARCH_ITEMS[index % len(_SEARCH_ITEMS)]} {_SEARCH_DETAILS[index // 16 % len(_SEARCH_DETAILS)]} '
+            f'{_SEARCH_COLORS[index // 224 % len(_SEARCH_COLORS)]} {index:06d}')
+
+
+def bench_product_search(product_count=200_000):
+    """
+    Simula um caixa digitando o nome de um produto, letra por letra, em um catálogo de
+    'product_count' produtos: compara a busca FTS5 (db.search_products) com um
+    LIKE '%texto%' que percorre a tabela de produtos a cada tecla.
+    """
+    print(f'\n=== Busca de produtos enquanto digita ({product_count:,} produtos) ===')
+    with temporary_database('balanced'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            category_ids = db.add_categories(_SEARCH_CATEGORIES)
+        started = time.perf_counter()
+        db.add_multiple_products([
+            {'nome_produto': _search_catalog_name(i), 'preco': 1000 + i % 90 * 100,
+             'quantidade_estoque': i % 50,
+             'id_categoria': category_ids[_SEARCH_CATEGORIES[i // 7 % len(_SEARCH_CATEGORIES)]]}
+            for i in range(product_count)
+        ])
+        print(f'cadastro com o índice de busca mantido pelos gatilhos: {time.perf_counter() - started:.1f}s')
+
+        def like_scan(text):
+            with db.get_connection() as connection:
+                return connection.execute("""
+                    SELECT p.id_produto, p.nome_produto, p.preco, p.quantidade_estoque, c.nome_categoria, c.id_categoria
+                    FROM produtos AS p JOIN categorias AS c ON p.id_categoria = c.id_categoria
+                    WHERE p.nome_produto LIKE ? LIMIT 20
+                """, (f'%{text}%',)).fetchall()
+
+        print(f'{"digitado":<22} {"FTS5 (ms)":>10} {"resultados":>11} {"LIKE (ms)":>10}')
+        worst = 0.0
+        for typed in ('pulseira de perola lua', 'relogio masc', 'oculos promo'):
+            for length in range(1, len(typed) + 1):
+                text = typed[:length]
+                if text.endswith(' '):
+                    continue
+                search = _timed(lambda: db.search_products(text))
+                worst = max(worst, search)
+                scan = _timed(lambda: like_scan(text), repeat=1)
+                print(f'{text!r:<22} {search:>10.2f} {len(db.search_products(text)):>11} {scan:>10.2f}')
+        print(f'pior tecla com FTS5: {worst:.2f} ms')
+
+
+def bench_autocomplete(product_count=200_000):
+    """
+    Monta o autocompletar em memória com 'product_count' produtos e compara o tempo de
+    cada tecla com a busca FTS5 no banco (db.search_products), além do custo de manter o
+    índice em dia quando um produto é adicionado, renomeado ou removido.
+    """
+    print(f'\n=== Autocompletar em memória ({product_count:,} produtos) ===')
+    with temporary_database('balanced'):
+        with contextlib.redirect_stdout(io.StringIO()):
+            category_ids = db.add_categories(_SEARCH_CATEGORIES)
+        db.add_multiple_products([
+            {'nome_produto': _search_catalog_name(i), 'preco': 1000 + i % 90 * 100,
+             'quantidade_estoque': i % 50,
+             'id_categoria': category_ids[_SEARCH_CATEGORIES[i // 7 % len(_SEARCH_CATEGORIES)]]}
+            for i in range(product_count)
+        ])
+
+        started = time.perf_counter()
+        index = autocomplete.ProductAutocomplete.from_repository(ranking='stock')
+        elapsed = time.perf_counter() - started
+        products = repository.get_all_products()
+        tracemalloc.start()
+        autocomplete.ProductAutocomplete(products)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'montagem (com a leitura dos produtos): {elapsed:.2f}s, '
+              f'memória do índice além dos objetos Product: {peak / 1024 / 1024:.0f} MB')
+
+        print(f'{"digitado":<22} {"memória (ms)":>13} {"FTS5 (ms)":>10}')
+        worst = 0.0
+        for typed in ('pulseira de perola lua', 'oculos promo', '0012'):
+            for length in range(1, len(typed) + 1):
+                text = typed[:length]
+                if text.endswith(' '):
+                    continue
+                in_memory = _timed(lambda: index.complete(text))
+                worst = max(worst, in_memory)
+                print(f'{text!r:<22} {in_memory:>13.3f} {_timed(lambda: db.search_products(text)):>10.2f}')
+        print(f'pior tecla em memória: {worst:.3f} ms')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            category = repository.get_category_by_id(1)
+            started = time.perf_counter()
+            for i in range(200):
+                new_product_id = repository.add_product(
+                    Product(name=f'Tiara Nova {i}', price=1000, stock_quantity=10, category=category))
+                repository.update_product(new_product_id, db.ADMIN_PASSWORD, new_name=f'Coroa Nova {i}')
+                repository.delete_product(new_product_id, db.ADMIN_PASSWORD)
+            elapsed = time.perf_counter() - started
+        index.close()
+        assert not index.complete('coroa nova') and not index.complete('tiara nova')
+        print(f'adicionar + renomear + remover pelo repositório, com o índice em dia: {elapsed / 200 * 1000:.2f} ms por produto')
+
+
+SCENARIOS = {
+    'storage': bench_storage_profiles,
+    'checkout': bench_concurrent_checkout,
+    'indexes': bench_indexes,
+    'cart': bench_cart,
+    'memory': bench_memory,
+    'receipt': bench_goods_receipt,
+    'import': bench_catalog_import,
+    'reports': bench_reports,
+    'reporting': bench_reporting_engine,
+    'registers': bench_cash_registers,
+    'async': bench_async_repository,
+    'groupcommit': bench_group_commit,
+    'search': bench_product_search,
+    'autocomplete': bench_autocomplete,
+}
+
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or list(SCENARIOS)
+    for name in selected:
+        SCENARIOS[name]()
@@ -0,0 +1,142 @@
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from operator import mul
+
+# NumPy é opcional: quando instalado, as operações rodam vetorizadas sobre os mesmos buffers
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class CatalogSnapshot:
+    """
+    Fotografia colunar do catálogo: ids, preços, estoques e categorias guardados em
+    arrays contíguos (um por coluna) em vez de uma lista de objetos Product.
+    Pensada para análises que percorrem o catálogo inteiro várias vezes.
+    """
+    __slots__ = ('ids', 'prices', 'stock', 'category_ids')
+
+    def __init__(self, ids=None, prices=None, stock=None, category_ids=None):
+        """
+        Construtor da fotografia do catálogo.
+
+        Args:
+            ids (array, optional): Os IDs dos produtos ('q').
+            prices (array, optional): Os preços dos produtos, em centavos ('q').
+            stock (array, optional): As quantidades em estoque ('q').
+            category_ids (array, optional): Os IDs das categorias ('q').
+        """
+        self.ids = ids if ids is not None else array('q')
+        self.prices = prices if prices is not None else array('q')
+        self.stock = stock if stock is not None else array('q')
+        self.category_ids = category_ids if category_ids is not None else array('q')
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Monta a fotografia a partir de linhas (id_produto, preco, quantidade_estoque, id_categoria),
+        consumindo-as uma a uma (funciona com o gerador de uma consulta em streaming).
+
+        Args:
+            rows (iterable): As linhas do catálogo.
+
+        Returns:
+            CatalogSnapshot: A fotografia preenchida.
+        """
+        snapshot = cls()
+        for product_id, price, stock_quantity, category_id in rows:
+            snapshot.ids.append(product_id)
+            snapshot.prices.append(price)
+            snapshot.stock.append(stock_quantity)
+            snapshot.category_ids.append(category_id)
+        return snapshot
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _columns(self):
+        # Visões NumPy sem cópia sobre os buffers dos arrays
+        return (np.frombuffer(self.ids, dtype=np.int64), np.frombuffer(self.prices, dtype=np.int64),
+                np.frombuffer(self.stock, dtype=np.int64), np.frombuffer(self.category_ids, dtype=np.int64))
+
+    def total_inventory_value(self):
+        """
+        Returns:
+            int: A soma de preço x estoque de todos os produtos, em centavos.
+        """
+        if np is not None and len(self):
+            _, prices, stock, _ = self._columns()
+            return int(np.dot(prices, stock))
+        return sum(map(mul, self.prices, self.stock))
+
+    def low_stock(self, threshold):
+        """
+        Filtra os produtos com estoque menor ou igual ao limite.
+
+        Args:
+            threshold (int): O limite de estoque.
+
+        Returns:
+            array: Os IDs dos produtos com estoque baixo, na ordem da fotografia.
+        """
+        if np is not None and len(self):
+            ids, _, stock, _ = self._columns()
+            return array('q', ids[stock <= threshold].tobytes())
+        return array('q', compress(self.ids, (quantity <= threshold for quantity in self.stock)))
+
+    def price_histogram(self, band_edges):
+        """
+        Conta os produtos por faixa de preço. As faixas são [edge[i], edge[i + 1]), e a última
+        também inclui o limite superior (mesma convenção de numpy.histogram).
+
+        Args:
+            band_edges (list[int]): Os limites das faixas em centavos, em ordem crescente.
+
+        Returns:
+            list[int]: A quantidade de produtos em cada faixa (len(band_edges) - 1 valores).
+        """
+        if np is not None and len(self):
+            _, prices, _, _ = self._columns()
+            counts, _ = np.histogram(prices, bins=band_edges)
+            return counts.tolist()
+
+        counts = [0] * (len(band_edges) - 1)
+        last_edge = band_edges[-1]
+        for price in self.prices:
+            if price == last_edge:
+                counts[-1] += 1
+                continue
+            band = bisect_right(band_edges, price) - 1
+            if 0 <= band < len(counts):
+                counts[band] += 1
+        return counts
+
+    def sum_by_category(self, column='value'):
+        """
+        Soma uma métrica por categoria.
+
+        Args:
+            column (str, optional): 'value' (preço x estoque) ou 'stock' (unidades em estoque).
+                Defaults to 'value'.
+
+        Returns:
+            dict[int, int]: A soma da métrica (valor em centavos ou unidades) para cada id_categoria.
+        """
+        if column not in ('value', 'stock'):
+            raise ValueError(f'Coluna desconhecida: {column}')
+
+        if np is not None and len(self):
+            _, prices, stock, category_ids = self._columns()
+            weights = prices * stock if column == 'value' else stock
+            categories, positions = np.unique(category_ids, return_inverse=True)
+            # bincount soma em float64, exato para inteiros abaixo de 2**53 (R$ 90 trilhões)
+            sums = np.bincount(positions, weights=weights).astype(np.int64)
+            return dict(zip(categories.tolist(), sums.tolist()))
+
+        values = map(mul, self.prices, self.stock) if column == 'value' else self.stock
+        sums = {}
+        for category_id, value in zip(self.category_ids, values):
+            sums[category_id] = sums.get(category_id, 0) + value
+        return sums
@@ -0,0 +1,205 @@
+"""
+Fila de checkout com um único escritor e group commit.
+
+Em horário de pico, cada register_sale abre a sua própria transação, faz o seu próprio
+COMMIT (e fsync) e disputa o lock de escrita do SQLite com os outros caixas. Aqui as vendas
+entram em uma fila em memória e uma única thread escritora as grava em grupos: o grupo leva
+tudo o que estiver na fila (até CHECKOUT_BATCH_SIZE vendas) e é gravado assim que a fila
+esvazia, ou, com CHECKOUT_BATCH_WAIT_MS > 0, depois de a primeira venda esperar esse
+tempo por companhia. O grupo inteiro vira uma transação só (repository.register_sales),
+e cada venda tem o seu SAVEPOINT, então uma venda recusada não derruba as outras.
+
+Quem envia a venda recebe um Future que resolve para o id_venda (ou False, se a venda foi
+recusada), exatamente o retorno de repository.register_sale:
+    future = checkout.submit_sale(sale, register_id=caixa.id)
+    sale_id = future.result()
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import repository
+
+# Tamanho máximo de um grupo e quanto a primeira venda do grupo espera por companhia.
+# Com espera 0 (o padrão), o grupo é gravado assim que a fila esvazia: enquanto um grupo
+# faz o COMMIT, as vendas que chegam se acumulam e formam o próximo grupo sozinhas.
+CHECKOUT_BATCH_SIZE = int(os.getenv('CHECKOUT_BATCH_SIZE', '64'))
+CHECKOUT_BATCH_WAIT_MS = float(os.getenv('CHECKOUT_BATCH_WAIT_MS', '0'))
+
+# Marca colocada na fila para a thread escritora terminar
+_STOP = object()
+
+
+class CheckoutWriter:
+    """
+    Thread escritora única que grava as vendas da fila em grupos, uma transação por grupo.
+    As vendas são gravadas na ordem em que foram enviadas.
+    """
+    def __init__(self, batch_size=CHECKOUT_BATCH_SIZE, wait_ms=CHECKOUT_BATCH_WAIT_MS):
+        """
+        Construtor do escritor (a thread só é iniciada no primeiro envio).
+
+        Args:
+            batch_size (int): O número máximo de vendas gravadas por transação.
+            wait_ms (float): Milissegundos que a primeira venda de um grupo espera por outras
+                antes de o grupo ser gravado. Com 0, o grupo leva só o que já estiver na fila.
+        """
+        self.batch_size = batch_size
+        self.wait_ms = wait_ms
+        self.batches = 0
+        self.sales = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, sale_object, register_id=None):
+        """
+        Coloca uma venda na fila de gravação.
+
+        Args:
+            sale_object (Sale): O objeto Sale completo a ser registrado.
+            register_id (int, optional): O caixa aberto que fez a venda. Defaults to None.
+
+        Returns:
+            Future: Resolve para o ID da nova venda, ou False se ela foi recusada.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('O escritor de checkout já foi encerrado')
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='checkout-escritor', daemon=True)
+                self._thread.start()
+            self._queue.put((sale_object, register_id, future))
+        return future
+
+    def close(self, wait=True):
+        """
+        Para de aceitar vendas; as que já estão na fila ainda são gravadas.
+
+        Args:
+            wait (bool, optional): Espera a fila esvaziar antes de retornar. Defaults to True.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if wait and thread is not None:
+            thread.join()
+
+    def _next_batch(self):
+        # Bloqueia até a primeira venda e junta outras até encher o grupo ou o prazo acabar
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.wait_ms / 1000
+        while len(batch) < self.batch_size:
+            try:
+                entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            # Vendas canceladas pelo cliente antes da gravação ficam de fora do grupo
+            batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = repository.register_sales([(sale_object, register_id)
+                                                     for sale_object, register_id, _ in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.sales += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_checkout_writer():
+    """
+    Retorna o escritor de checkout do módulo, criando-o na primeira chamada.
+
+    Returns:
+        CheckoutWriter: O escritor ativo.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = CheckoutWriter()
+        return _writer
+
+
+def submit_sale(sale_object, register_id=None):
+    """
+    Coloca uma venda na fila do escritor de checkout do módulo.
+
+    Args:
+        sale_object (Sale): O objeto Sale completo a ser registrado.
+        register_id (int, optional): O caixa aberto que fez a venda. Defaults to None.
+
+    Returns:
+        Future: Resolve para o ID da nova venda, ou False se ela foi recusada.
+    """
+    return get_checkout_writer().submit(sale_object, register_id)
+
+
+def shutdown_checkout(wait=True):
+    """
+    Encerra o escritor de checkout do módulo depois de gravar o que estiver na fila
+    (um novo escritor é criado no próximo envio). Já é registrada com atexit.
+
+    Args:
+        wait (bool, optional): Espera a fila esvaziar antes de retornar. Defaults to True.
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close(wait)
+
+
+atexit.register(shutdown_checkout)
+
+
+if __name__ == '__main__':
+    from models import Sale
+
+    # Usa o banco montado pelo repository.py (rode-o antes para ter dados de exemplo)
+    repository.db.create_tables()
+    product = repository.get_product_by_id(1)
+    if product is None:
+        print('Nenhum produto com ID 1; rode o repository.py antes.')
+    else:
+        print(f'\nEnviando 5 vendas de 1 unidade e uma com estoque insuficiente de: {product}')
+        sales = []
+        for quantity in (1, 1, product.stock_quantity + 1, 1, 1, 1):
+            sale = Sale()
+            sale.add_item(product, quantity)
+            sales.append(sale)
+        futures = [submit_sale(sale) for sale in sales]
+        print(f'--> Resultados: {[future.result() for future in futures]} (Esperado: a terceira False)')
+        writer = get_checkout_writer()
+        print(f'--> {writer.sales} vendas gravadas em {writer.batches} transação(ões)')
+        print(f'--> Estoque final: {repository.get_product_by_id(1).stock_quantity}')
+        shutdown_checkout()
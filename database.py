@@ -1,6 +1,14 @@
+import re
 import sqlite3
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import os
+import atexit
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from itertools import islice
 from dotenv import load_dotenv
 
 # Carrega variaveis do arquivo .env para o ambiente
@@ -13,15 +21,655 @@ ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD')
 # Definimos o nome do arquivo do banco de dados como uma constante
 DB_FILE = 'quiosque.db'
 
+# Configurações do pool de conexões (podem ser sobrescritas pelo .env)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+# Perfis de armazenamento: PRAGMAs de desempenho/durabilidade aplicados ao banco.
+# journal_mode é gravado no próprio arquivo (create_tables); os demais valem por conexão.
+STORAGE_PROFILES = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -8000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+
+# Perfil usado por padrão (pode ser sobrescrito pelo .env ou por create_tables)
+DB_STORAGE_PROFILE = os.getenv('DB_STORAGE_PROFILE', 'balanced')
+
+# PRAGMAs que não ficam gravados no arquivo e precisam ser aplicados em cada nova conexão
+_CONNECTION_PRAGMAS = ('synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+def _apply_connection_pragmas(connection, profile_name):
+    profile = STORAGE_PROFILES[profile_name]
+    for pragma in _CONNECTION_PRAGMAS:
+        connection.execute(f'PRAGMA {pragma} = {profile[pragma]};')
+
+
+class ConnectionPool:
+    """
+    Mantém um conjunto de conexões SQLite de longa duração, reaproveitadas entre as chamadas.
+
+    Cada thread recebe uma conexão exclusiva enquanto a estiver usando, e chamadas aninhadas
+    na mesma thread reaproveitam essa mesma conexão. Os PRAGMAs são aplicados uma única vez,
+    quando a conexão é aberta.
+    """
+    def __init__(self, db_file, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, profile=DB_STORAGE_PROFILE):
+        """
+        Construtor do pool.
+
+        Args:
+            db_file (str): O caminho do arquivo do banco de dados.
+            size (int): O número máximo de conexões abertas ao mesmo tempo.
+            timeout (float): Segundos de espera por uma conexão livre antes de desistir.
+            profile (str): O nome do perfil de armazenamento (chave de STORAGE_PROFILES).
+        """
+        self.db_file = db_file
+        self.size = size
+        self.timeout = timeout
+        self.profile = profile
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._open_connections = set()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.pid = os.getpid()
+
+    def _open(self):
+        connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        # Liga a verificação de chaves estrangeiras uma única vez, para toda a vida da conexão
+        connection.execute('PRAGMA foreign_keys = ON;')
+        _apply_connection_pragmas(connection, self.profile)
+        with self._lock:
+            self._open_connections.add(connection)
+        return connection
+
+    def _discard(self, connection):
+        with self._lock:
+            self._open_connections.discard(connection)
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            connection.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError('O pool de conexões já foi fechado')
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError('Tempo esgotado aguardando uma conexão livre no pool')
+        try:
+            while True:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._open()
+                # Health check: conexões quebradas são descartadas e substituídas
+                if self._is_healthy(connection):
+                    return connection
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, connection):
+        try:
+            # Uma conexão nunca volta ao pool com uma transação pela metade
+            if connection.in_transaction:
+                connection.rollback()
+        except sqlite3.Error:
+            self._discard(connection)
+        else:
+            if self._closed:
+                self._discard(connection)
+            else:
+                self._idle.put(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão do pool para o bloco 'with' e a devolve ao final.
+
+        Yields:
+            sqlite3.Connection: Uma conexão saudável, com row_factory = sqlite3.Row.
+        """
+        if getattr(self._local, 'depth', 0):
+            self._local.depth += 1
+            try:
+                yield self._local.connection
+            finally:
+                self._local.depth -= 1
+            return
+
+        connection = self._acquire()
+        self._local.connection = connection
+        self._local.depth = 1
+        try:
+            yield connection
+        finally:
+            self._local.depth = 0
+            self._local.connection = None
+            self._release(connection)
+
+    def close_all(self):
+        """
+        Fecha todas as conexões livres e impede novos empréstimos.
+        Conexões ainda em uso são fechadas assim que forem devolvidas.
+        """
+        self._closed = True
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Retorna o pool de conexões do módulo, criando-o na primeira chamada.
+    Se DB_FILE ou DB_STORAGE_PROFILE forem alterados, o pool antigo é fechado e
+    um novo é criado com o mesmo tamanho. Em um processo filho, um novo pool é criado.
+
+    Returns:
+        ConnectionPool: O pool de conexões ativo.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_FILE, profile=DB_STORAGE_PROFILE)
+        elif _pool.pid != os.getpid():
+            # Processo filho (fork): as conexões herdadas do pai nunca são reutilizadas
+            _pool = ConnectionPool(DB_FILE, size=_pool.size, timeout=_pool.timeout, profile=DB_STORAGE_PROFILE)
+        elif _pool.db_file != DB_FILE or _pool.profile != DB_STORAGE_PROFILE:
+            _pool.close_all()
+            _pool = ConnectionPool(DB_FILE, size=_pool.size, timeout=_pool.timeout, profile=DB_STORAGE_PROFILE)
+        return _pool
+
+
+def configure_pool(size=None, timeout=None):
+    """
+    Recria o pool de conexões com um novo tamanho e/ou tempo de espera.
+
+    Args:
+        size (int, optional): O número máximo de conexões. Defaults to DB_POOL_SIZE.
+        timeout (float, optional): Segundos de espera por uma conexão livre. Defaults to DB_POOL_TIMEOUT.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = ConnectionPool(
+            DB_FILE,
+            size=size if size is not None else DB_POOL_SIZE,
+            timeout=timeout if timeout is not None else DB_POOL_TIMEOUT,
+            profile=DB_STORAGE_PROFILE
+        )
+
+
+def close_pool():
+    """
+    Fecha todas as conexões do pool. Deve ser chamada no encerramento da aplicação
+    (já é registrada automaticamente com atexit).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+# Limite de parâmetros por consulta 'IN (...)' (abaixo do mínimo de 999 aceito pelo SQLite)
+_MAX_SQL_PARAMS = 900
+
+
+def _chunks(values, size=_MAX_SQL_PARAMS):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# Quantidade de linhas buscadas por vez (fetchmany) nas funções iter_*
+ITER_BATCH_SIZE = 1000
+
+
+def _iter_query(sql, key, batch_size=ITER_BATCH_SIZE, error_message='Erro ao percorrer consulta'):
+    # Gerador base das funções iter_*: cada lote é uma consulta própria, paginada pela chave
+    # (WHERE chave > :after ORDER BY chave LIMIT :limit). A conexão volta ao pool antes de
+    # cada yield, então nenhum snapshot fica aberto entre os lotes e a mesma thread pode
+    # ler e gravar normalmente enquanto percorre o resultado.
+    after = 0
+    while True:
+        try:
+            with get_connection() as connection:
+                rows = connection.execute(sql, {'after': after, 'limit': batch_size}).fetchall()
+        except sqlite3.Error as e:
+            print(f'{error_message}: {e}')
+            return
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after = rows[-1][key]
+
+
+def get_connection():
+    """
+    Atalho usado por todas as funções deste módulo para emprestar uma conexão do pool.
+
+    Returns:
+        contextmanager: Um gerenciador de contexto que entrega uma sqlite3.Connection.
+    """
+    return get_pool().connection()
+
+
+# Resumos de vendas pré-agregados por dia: totais do dia, por produto e por categoria.
+# São mantidos na mesma transação de register_sale/delete_sale, então os relatórios
+# leem apenas essas tabelas, sem percorrer vendas e itens_da_venda.
+_SALES_SUMMARY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS resumo_vendas_diario
+    (
+    dia TEXT PRIMARY KEY,
+    quantidade_vendas INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    receita INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resumo_vendas_produto
+    (
+    dia TEXT NOT NULL,
+    id_produto INTEGER NOT NULL,
+    id_categoria INTEGER,
+    quantidade_vendas INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    receita INTEGER NOT NULL,
+    PRIMARY KEY (dia, id_produto)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resumo_vendas_categoria
+    (
+    dia TEXT NOT NULL,
+    id_categoria INTEGER NOT NULL,
+    quantidade_vendas INTEGER NOT NULL,
+    unidades INTEGER NOT NULL,
+    receita INTEGER NOT NULL,
+    PRIMARY KEY (dia, id_categoria)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Soma (sinal 1) ou estorna (sinal -1) nos resumos as vendas com id_venda entre primeira_venda
+# e ultima_venda (uma venda só, ou o grupo inteiro de register_sales). O resumo por categoria usa a
+# categoria gravada no resumo por produto, então o estorno desfaz exatamente o que foi somado
+# mesmo que o produto tenha mudado de categoria depois da venda.
+_SALE_SUMMARY_SQL = [
+    """
+    INSERT INTO resumo_vendas_diario (dia, quantidade_vendas, unidades, receita)
+    SELECT substr(v.data_hora, 1, 10), :sinal, :sinal * COALESCE(SUM(iv.quantidade), 0), :sinal * v.valor_total
+    FROM vendas v
+    LEFT JOIN itens_da_venda iv ON iv.id_venda = v.id_venda
+    WHERE v.id_venda BETWEEN :primeira_venda AND :ultima_venda
+    GROUP BY v.id_venda
+    ON CONFLICT (dia) DO UPDATE SET
+        quantidade_vendas = quantidade_vendas + excluded.quantidade_vendas,
+        unidades = unidades + excluded.unidades,
+        receita = receita + excluded.receita
+    """,
+    """
+    INSERT INTO resumo_vendas_produto (dia, id_produto, id_categoria, quantidade_vendas, unidades, receita)
+    SELECT substr(v.data_hora, 1, 10), iv.id_produto, p.id_categoria,
+           :sinal, :sinal * iv.quantidade, :sinal * iv.quantidade * iv.preco_unitario
+    FROM itens_da_venda iv
+    JOIN vendas v ON v.id_venda = iv.id_venda
+    LEFT JOIN produtos p ON p.id_produto = iv.id_produto
+    WHERE iv.id_venda BETWEEN :primeira_venda AND :ultima_venda
+    ON CONFLICT (dia, id_produto) DO UPDATE SET
+        quantidade_vendas = quantidade_vendas + excluded.quantidade_vendas,
+        unidades = unidades + excluded.unidades,
+        receita = receita + excluded.receita
+    """,
+    """
+    INSERT INTO resumo_vendas_categoria (dia, id_categoria, quantidade_vendas, unidades, receita)
+    SELECT rp.dia, rp.id_categoria, :sinal * COUNT(DISTINCT iv.id_venda), :sinal * SUM(iv.quantidade), :sinal * SUM(iv.quantidade * iv.preco_unitario)
+    FROM itens_da_venda iv
+    JOIN vendas v ON v.id_venda = iv.id_venda
+    JOIN resumo_vendas_produto rp ON rp.dia = substr(v.data_hora, 1, 10) AND rp.id_produto = iv.id_produto
+    WHERE iv.id_venda BETWEEN :primeira_venda AND :ultima_venda AND rp.id_categoria IS NOT NULL
+    GROUP BY rp.dia, rp.id_categoria
+    ON CONFLICT (dia, id_categoria) DO UPDATE SET
+        quantidade_vendas = quantidade_vendas + excluded.quantidade_vendas,
+        unidades = unidades + excluded.unidades,
+        receita = receita + excluded.receita
+    """,
+]
+
+_SALES_SUMMARY_REBUILD_SQL = [
+    'DELETE FROM resumo_vendas_diario',
+    'DELETE FROM resumo_vendas_produto',
+    'DELETE FROM resumo_vendas_categoria',
+    """
+    INSERT INTO resumo_vendas_diario (dia, quantidade_vendas, unidades, receita)
+    SELECT substr(v.data_hora, 1, 10), COUNT(*), SUM(COALESCE(t.unidades, 0)), SUM(v.valor_total)
+    FROM vendas v
+    LEFT JOIN (
+        SELECT id_venda, SUM(quantidade) AS unidades FROM itens_da_venda GROUP BY id_venda
+    ) t ON t.id_venda = v.id_venda
+    GROUP BY substr(v.data_hora, 1, 10)
+    """,
+    """
+    INSERT INTO resumo_vendas_produto (dia, id_produto, id_categoria, quantidade_vendas, unidades, receita)
+    SELECT substr(v.data_hora, 1, 10), iv.id_produto, p.id_categoria,
+           COUNT(DISTINCT iv.id_venda), SUM(iv.quantidade), SUM(iv.quantidade * iv.preco_unitario)
+    FROM itens_da_venda iv
+    JOIN vendas v ON v.id_venda = iv.id_venda
+    LEFT JOIN produtos p ON p.id_produto = iv.id_produto
+    GROUP BY substr(v.data_hora, 1, 10), iv.id_produto
+    """,
+    """
+    INSERT INTO resumo_vendas_categoria (dia, id_categoria, quantidade_vendas, unidades, receita)
+    SELECT substr(v.data_hora, 1, 10), p.id_categoria,
+           COUNT(DISTINCT iv.id_venda), SUM(iv.quantidade), SUM(iv.quantidade * iv.preco_unitario)
+    FROM itens_da_venda iv
+    JOIN vendas v ON v.id_venda = iv.id_venda
+    JOIN produtos p ON p.id_produto = iv.id_produto
+    WHERE p.id_categoria IS NOT NULL
+    GROUP BY substr(v.data_hora, 1, 10), p.id_categoria
+    """,
+]
+
+
+def _apply_sales_to_summary(cursor, first_sale_id, last_sale_id, sign):
+    # Um único passe pelos resumos para um intervalo contíguo de vendas
+    params = {'primeira_venda': first_sale_id, 'ultima_venda': last_sale_id, 'sinal': sign}
+    for sql in _SALE_SUMMARY_SQL:
+        cursor.execute(sql, params)
+
+
+def _apply_sale_to_summary(cursor, sale_id, sign):
+    # Deve rodar com a venda e os itens ainda gravados (depois do INSERT, antes do DELETE)
+    _apply_sales_to_summary(cursor, sale_id, sale_id, sign)
+    if sign < 0:
+        # Produtos, categorias e o próprio dia que ficaram sem vendas saem do resumo
+        row = cursor.execute('SELECT substr(data_hora, 1, 10) FROM vendas WHERE id_venda = ?', (sale_id,)).fetchone()
+        if row:
+            for table in ('resumo_vendas_diario', 'resumo_vendas_produto', 'resumo_vendas_categoria'):
+                cursor.execute(f'DELETE FROM {table} WHERE dia = ? AND quantidade_vendas <= 0', (row[0],))
+
+
+def _rebuild_sales_summary(connection):
+    for sql in _SALES_SUMMARY_REBUILD_SQL:
+        connection.execute(sql)
+
+
+# Colunas de dinheiro das tabelas originais, que bancos antigos guardam em REAL (reais).
+# As tabelas criadas pelas migrações (resumos e caixas) já nascem com INTEGER em centavos.
+_MONEY_COLUMNS = {
+    'produtos': ('preco',),
+    'vendas': ('valor_total',),
+    'itens_da_venda': ('preco_unitario',),
+}
+
+
+def _convert_money_to_cents(connection):
+    # O SQLite não altera o tipo de uma coluna: cada tabela com dinheiro em REAL é recriada
+    # com INTEGER (mesmo DDL, mesmos índices) e os valores são copiados em centavos
+    for table, money_columns in _MONEY_COLUMNS.items():
+        columns = connection.execute(f'PRAGMA table_info({table})').fetchall()
+        if not any(column['name'] in money_columns and column['type'].upper() == 'REAL' for column in columns):
+            continue
+        table_sql, = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        index_sqls = [row[0] for row in connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+        sequence = connection.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (table,)).fetchone() \
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone() else None
+
+        new_table = f'{table}_centavos'
+        new_sql = re.sub(rf'\b{table}\b', new_table, table_sql, count=1)
+        for column in money_columns:
+            new_sql = re.sub(rf'\b{column}\s+REAL\b', f'{column} INTEGER', new_sql, flags=re.IGNORECASE)
+        names = [column['name'] for column in columns]
+        values = [f'CAST(ROUND({name} * 100) AS INTEGER)' if name in money_columns else name for name in names]
+
+        connection.execute(new_sql)
+        connection.execute(f'INSERT INTO {new_table} ({", ".join(names)}) SELECT {", ".join(values)} FROM {table}')
+        connection.execute(f'DROP TABLE {table}')
+        connection.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+        for index_sql in index_sqls:
+            connection.execute(index_sql)
+        if sequence:
+            # Preserva o AUTOINCREMENT: ids de registros já apagados não são reutilizados
+            connection.execute('UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?', (sequence[0], table))
+
+
+# Índice de busca textual (FTS5) dos produtos pelo nome e pelo nome da categoria. Os gatilhos
+# mantêm o índice em dia (baixas de estoque não tocam nele), e remove_diacritics faz 'colar'
+# encontrar 'Colar de Pérola' e 'pérola' encontrar 'Perola'.
+# O rowid é (tamanho do nome << 32) | id_produto: o FTS5 entrega os resultados em ordem de
+# rowid, então os N primeiros encontrados já são os N produtos de nome mais curto, sem
+# ordenar todos os que casam com o texto digitado. O id_produto ocupa os 32 bits de baixo,
+# por isso um produto com id acima de _SEARCH_MAX_PRODUCT_ID é recusado pelo gatilho de
+# limite (o SQLite aceitaria, mas a busca devolveria outro produto).
+_SEARCH_MAX_PRODUCT_ID = 4294967295
+
+_PRODUCT_SEARCH_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS produtos_busca USING fts5(
+        nome_produto, nome_categoria,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '1 2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS produtos_busca_limite_id AFTER INSERT ON produtos
+    WHEN NEW.id_produto > {_SEARCH_MAX_PRODUCT_ID} BEGIN
+        SELECT RAISE(ABORT, 'id_produto acima do limite do índice de busca');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_busca_insert AFTER INSERT ON produtos BEGIN
+        INSERT INTO produtos_busca (rowid, nome_produto, nome_categoria)
+        VALUES ((length(NEW.nome_produto) << 32) | NEW.id_produto, NEW.nome_produto,
+                (SELECT nome_categoria FROM categorias WHERE id_categoria = NEW.id_categoria));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_busca_update AFTER UPDATE OF nome_produto, id_categoria ON produtos BEGIN
+        DELETE FROM produtos_busca WHERE rowid = (length(OLD.nome_produto) << 32) | OLD.id_produto;
+        INSERT INTO produtos_busca (rowid, nome_produto, nome_categoria)
+        VALUES ((length(NEW.nome_produto) << 32) | NEW.id_produto, NEW.nome_produto,
+                (SELECT nome_categoria FROM categorias WHERE id_categoria = NEW.id_categoria));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_busca_delete AFTER DELETE ON produtos BEGIN
+        DELETE FROM produtos_busca WHERE rowid = (length(OLD.nome_produto) << 32) | OLD.id_produto;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS produtos_busca_categoria AFTER UPDATE OF nome_categoria ON categorias BEGIN
+        UPDATE produtos_busca SET nome_categoria = NEW.nome_categoria
+        WHERE rowid IN (SELECT (length(nome_produto) << 32) | id_produto
+                        FROM produtos WHERE id_categoria = NEW.id_categoria);
+    END
+    """,
+    """
+    INSERT INTO produtos_busca (rowid, nome_produto, nome_categoria)
+    SELECT (length(p.nome_produto) << 32) | p.id_produto, p.nome_produto, c.nome_categoria
+    FROM produtos p
+    LEFT JOIN categorias c ON c.id_categoria = p.id_categoria
+    """,
+]
+
+
+# Migrações de esquema versionadas: (versão, descrição, passos).
+# Cada passo é um comando SQL ou uma função que recebe a conexão.
+# A última versão aplicada fica gravada no próprio banco (PRAGMA user_version).
+MIGRATIONS = [
+    (1, 'índices para vendas por data, produtos por categoria e itens por produto', [
+        'CREATE INDEX IF NOT EXISTS idx_vendas_data_hora ON vendas (data_hora)',
+        'CREATE INDEX IF NOT EXISTS idx_produtos_id_categoria ON produtos (id_categoria)',
+        'CREATE INDEX IF NOT EXISTS idx_itens_da_venda_id_produto ON itens_da_venda (id_produto)',
+    ]),
+    (2, 'resumos de vendas pré-agregados por dia, produto e categoria',
+        _SALES_SUMMARY_TABLES + [_rebuild_sales_summary]),
+    (3, 'índice de cobertura dos itens por venda para os relatórios', [
+        'CREATE INDEX IF NOT EXISTS idx_itens_da_venda_cobertura '
+        'ON itens_da_venda (id_venda, id_produto, quantidade, preco_unitario)',
+    ]),
+    (4, 'sessões de caixa com totais acumulados e o caixa de cada venda', [
+        """
+        CREATE TABLE IF NOT EXISTS caixas
+        (
+        id_caixa INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome_operador TEXT,
+        abertura DATETIME NOT NULL,
+        fechamento DATETIME,
+        valor_abertura INTEGER NOT NULL,
+        quantidade_vendas INTEGER NOT NULL DEFAULT 0,
+        total_vendas INTEGER NOT NULL DEFAULT 0,
+        valor_contado INTEGER
+        )
+        """,
+        'ALTER TABLE vendas ADD COLUMN id_caixa INTEGER REFERENCES caixas(id_caixa)',
+        'CREATE INDEX IF NOT EXISTS idx_vendas_id_caixa ON vendas (id_caixa)',
+    ]),
+    (5, 'valores em dinheiro como centavos inteiros', [_convert_money_to_cents, _rebuild_sales_summary]),
+    (6, 'busca textual de produtos por nome e categoria (FTS5)', _PRODUCT_SEARCH_SQL),
+]
+
+
+def _apply_migrations(connection):
+    # Cada migração roda em sua própria transação, junto com a atualização de user_version.
+    # As chaves estrangeiras ficam desligadas enquanto isso (tabelas podem ser recriadas) e
+    # são conferidas com foreign_key_check antes de cada commit.
+    current_version = connection.execute('PRAGMA user_version').fetchone()[0]
+    if current_version >= MIGRATIONS[-1][0]:
+        return
+    connection.execute('PRAGMA foreign_keys = OFF')
+    try:
+        # Violações antigas não bloqueiam as migrações; só as novas são recusadas
+        violations_before = len(connection.execute('PRAGMA foreign_key_check').fetchall())
+        for version, description, steps in MIGRATIONS:
+            if version <= current_version:
+                continue
+            print(f'Aplicando migração {version}: {description}')
+            connection.execute('BEGIN')
+            try:
+                for step in steps:
+                    if callable(step):
+                        step(connection)
+                    else:
+                        connection.execute(step)
+                if len(connection.execute('PRAGMA foreign_key_check').fetchall()) > violations_before:
+                    raise sqlite3.IntegrityError(f'A migração {version} deixaria chaves estrangeiras inválidas')
+                connection.execute(f'PRAGMA user_version = {version}')
+                connection.commit()
+            except sqlite3.Error:
+                connection.rollback()
+                raise
+    finally:
+        connection.execute('PRAGMA foreign_keys = ON')
+
+
+def _day_range(date_str):
+    # Intervalo semiaberto [dia, dia seguinte): permite usar o índice de data_hora
+    day = datetime.strptime(date_str, '%Y-%m-%d').date()
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def to_db_datetime(value):
+    """
+    Converte um limite de intervalo para o formato de texto em que o banco guarda data_hora.
+
+    Args:
+        value (datetime, date or str): O valor a converter; textos são mantidos como estão.
+
+    Returns:
+        str: 'YYYY-MM-DD HH:MM:SS' para datetime, 'YYYY-MM-DD' para date.
+    """
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
 
-def create_tables():
+
+def set_storage_profile(profile_name):
+    """
+    Define o perfil de armazenamento usado pelas novas conexões do pool.
+
+    Args:
+        profile_name (str): O nome do perfil ('durable', 'balanced' ou 'fast').
+
+    Returns:
+        bool: True se o perfil existir e for ativado, False caso contrário.
+    """
+    global DB_STORAGE_PROFILE
+    if profile_name not in STORAGE_PROFILES:
+        print(f'Perfil de armazenamento desconhecido: {profile_name}')
+        return False
+    DB_STORAGE_PROFILE = profile_name
+    return True
+
+
+def create_tables(profile=None):
     """
     Função para criar as tabelas iniciais do banco de dados,
-    caso elas ainda não existam 
+    caso elas ainda não existam, e aplicar o perfil de armazenamento.
+
+    Args:
+        profile (str, optional): O perfil de armazenamento a ser ativado
+            ('durable', 'balanced' ou 'fast'). Defaults to DB_STORAGE_PROFILE.
     """
     print('Verificando e criando tabelas, se necessario...')
+    if profile is not None and not set_storage_profile(profile):
+        return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
+            # journal_mode fica gravado no arquivo: leitores e escritor deixam de se bloquear
+            journal_mode = STORAGE_PROFILES[DB_STORAGE_PROFILE]['journal_mode']
+            connection.execute(f'PRAGMA journal_mode = {journal_mode};')
             cursor = connection.cursor()
 
             cursor.execute("""
@@ -39,7 +687,7 @@ def create_tables():
                 (
                 id_produto INTEGER PRIMARY KEY AUTOINCREMENT, 
                 nome_produto TEXT UNIQUE NOT NULL, 
-                preco REAL NOT NULL,
+                preco INTEGER NOT NULL,
                 quantidade_estoque INTEGER NOT NULL, 
                 id_categoria INTEGER NOT NULL,
                 FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria)
@@ -51,7 +699,7 @@ def create_tables():
                 (
                 id_venda INTEGER PRIMARY KEY AUTOINCREMENT,
                 data_hora DATETIME,
-                valor_total REAL NOT NULL
+                valor_total INTEGER NOT NULL
                 )
             """)
 
@@ -61,13 +709,14 @@ def create_tables():
                 id_venda INTEGER NOT NULL,
                 id_produto INTEGER NOT NULL,
                 quantidade INTEGER,
-                preco_unitario REAL,
+                preco_unitario INTEGER,
                 FOREIGN KEY (id_venda) REFERENCES vendas(id_venda),
                 FOREIGN KEY (id_produto) REFERENCES produtos(id_produto),
                 PRIMARY KEY (id_venda, id_produto)
                 )
             """)
             connection.commit()
+            _apply_migrations(connection)
             return True
 
     except sqlite3.Error as e:
@@ -86,7 +735,7 @@ def add_category(category_name):
         bool: True se a inserção for bem-sucedida, False caso contrário.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 INSERT INTO categorias (nome_categoria) VALUES (?)
@@ -98,6 +747,39 @@ def add_category(category_name):
         return False
 
 
+def add_categories(category_names):
+    """
+    Garante que todas as categorias existam, criando as que faltam em uma única transação.
+
+    Args:
+        category_names (iterable[str]): Os nomes das categorias.
+
+    Returns:
+        dict or bool: Um dicionário {nome_categoria: id_categoria} com todos os nomes pedidos,
+            ou False em caso de erro.
+    """
+    category_names = list(set(category_names))
+    category_ids = {}
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.executemany("""
+                INSERT INTO categorias (nome_categoria) VALUES (?)
+                ON CONFLICT(nome_categoria) DO NOTHING
+            """, [(category_name,) for category_name in category_names])
+            for chunk in _chunks(category_names):
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT id_categoria, nome_categoria FROM categorias
+                    WHERE nome_categoria IN ({placeholders})
+                """, chunk)
+                category_ids.update((row['nome_categoria'], row['id_categoria']) for row in cursor.fetchall())
+            connection.commit()
+        return category_ids
+    except sqlite3.Error as e:
+        print(f'Erro ao inserir categorias em lote: {e}')
+        return False
+
 def list_categories():
     """
     Retorna uma lista de todas as categorias cadastradas.
@@ -107,8 +789,7 @@ def list_categories():
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT id_categoria, nome_categoria FROM categorias
@@ -119,6 +800,23 @@ def list_categories():
         print(f'Erro ao listar categorias: {e}')
         return []
 
+def iter_categories(batch_size=ITER_BATCH_SIZE):
+    """
+    Percorre todas as categorias sem carregar a tabela inteira na memória.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez. Defaults to ITER_BATCH_SIZE.
+
+    Yields:
+        sqlite3.Row: Uma categoria por vez.
+    """
+    yield from _iter_query("""
+        SELECT id_categoria, nome_categoria FROM categorias
+        WHERE id_categoria > :after
+        ORDER BY id_categoria
+        LIMIT :limit
+    """, 'id_categoria', batch_size=batch_size, error_message='Erro ao percorrer categorias')
+
 def delete_category(category_id, provided_password):
     """
     Deleta uma categoria do banco de dados após validar a senha.
@@ -134,10 +832,7 @@ def delete_category(category_id, provided_password):
     if provided_password != ADMIN_PASSWORD:
         return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-        # Liga a verificação de chaves estrangeiras para ESTA conexao
-            connection.execute('PRAGMA foreign_keys = ON;')
-
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 DELETE FROM categorias
@@ -165,7 +860,7 @@ def update_category_name(category_id, new_name, provided_password):
         return False
     
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 UPDATE categorias
@@ -189,8 +884,7 @@ def find_category_by_id(category_id):
         sqlite3.Row or None: Um objeto Row com os dados da categoria se encontrada, senão None.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             sql_query = f"""
                 SELECT * FROM categorias WHERE id_categoria = (?)
@@ -212,17 +906,21 @@ def add_product(product_data):
                             'nome_produto', 'preco', 'quantidade_estoque', 'id_categoria'.
 
     Returns:
-        bool: True se a inserção for bem-sucedida, False caso contrário.
+        int or bool: O ID do novo produto se a inserção for bem-sucedida, False caso contrário.
     """
+    price = product_data.get('preco')
+    if not _is_cents(price) or price < 0:
+        print(f'Erro ao inserir produto na tabela produtos: preço inválido {price!r} (use centavos inteiros)')
+        return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
             sql_query = ("""
                 INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (:nome_produto, :preco, :quantidade_estoque, :id_categoria)
             """)
             cursor.execute(sql_query, product_data)
             connection.commit()
-        return True
+        return cursor.lastrowid
     except sqlite3.Error as e:
         print(f'Erro ao inserir produto na tabela produtos: {e}')
         return False
@@ -230,24 +928,160 @@ def add_product(product_data):
 def add_multiple_products(product_list):
     """
     Adiciona uma lista de novos produtos ao banco de dados de uma só vez.
+    Se algum produto já existir (mesmo nome) ou for inválido, nenhum produto é gravado.
 
     Args:
-        product_list (list): Uma lista de dicionários, onde cada dicionário representa um produto.
+        product_list (iterable): Uma lista (ou gerador) de dicionários, onde cada dicionário representa um produto.
 
     Returns:
         bool: True se a inserção for bem-sucedida, False caso contrário.
     """
+    result = upsert_products(product_list, on_conflict='fail')
+    if not result:
+        return False
+    if not result['applied']:
+        for product_name, reason in result['rejected']:
+            print(f'Erro ao adicionar varios produtos: {product_name} recusado ({reason})')
+        return False
+    return True
+
+# Linhas gravadas por executemany em cada lote das importações de catálogo
+UPSERT_CHUNK_SIZE = 500
+
+# Modos de conflito aceitos por upsert_products
+_UPSERT_SQL = {
+    'update': """
+        INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria)
+        VALUES (:nome_produto, :preco, :quantidade_estoque, :id_categoria)
+        ON CONFLICT(nome_produto) DO UPDATE SET
+            preco = excluded.preco,
+            quantidade_estoque = excluded.quantidade_estoque,
+            id_categoria = excluded.id_categoria
+    """,
+    'skip': """
+        INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria)
+        VALUES (:nome_produto, :preco, :quantidade_estoque, :id_categoria)
+        ON CONFLICT(nome_produto) DO NOTHING
+    """,
+    'fail': """
+        INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria)
+        VALUES (:nome_produto, :preco, :quantidade_estoque, :id_categoria)
+    """,
+}
+
+
+def _is_cents(value):
+    # Dinheiro entra no banco sempre como centavos inteiros (bool não conta como inteiro)
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _product_row_problem(product_data, category_ids):
+    # Valida uma linha do catálogo antes de enviá-la ao banco; retorna o motivo da recusa ou None
+    if not isinstance(product_data.get('nome_produto'), str) or not product_data['nome_produto'].strip():
+        return 'nome_invalido'
+    price = product_data.get('preco')
+    if not _is_cents(price) or price < 0:
+        return 'preco_invalido'
+    stock_quantity = product_data.get('quantidade_estoque')
+    if not isinstance(stock_quantity, int) or stock_quantity < 0:
+        return 'estoque_invalido'
+    if product_data.get('id_categoria') not in category_ids:
+        return 'categoria_inexistente'
+    return None
+
+
+def upsert_products(product_rows, on_conflict='update', chunk_size=UPSERT_CHUNK_SIZE):
+    """
+    Importa um catálogo de produtos em lotes, decidindo o que fazer com nomes que já existem.
+    As linhas são consumidas lote a lote, então um gerador de qualquer tamanho pode ser
+    importado sem ficar inteiro na memória. Tudo acontece em uma única transação.
+
+    Modos de conflito (nome_produto repetido, no banco ou na própria importação):
+        - 'update': atualiza preço, estoque e categoria do produto existente (upsert);
+          se o nome se repete na importação, vale a última linha;
+        - 'skip': mantém o produto existente (ou a primeira linha com o nome) e recusa a nova;
+        - 'fail': qualquer conflito ou linha inválida cancela a importação inteira.
+    Cada nome aparece uma única vez em 'inserted' ou em 'updated': um produto novo que se
+    repete na importação continua só em 'inserted'.
+
+    Args:
+        product_rows (iterable): Dicionários com 'nome_produto', 'preco', 'quantidade_estoque' e 'id_categoria'.
+        on_conflict (str, optional): 'update', 'skip' ou 'fail'. Defaults to 'update'.
+        chunk_size (int, optional): Linhas por lote de executemany. Defaults to UPSERT_CHUNK_SIZE.
+
+    Returns:
+        dict or bool: {'applied': bool, 'inserted': [nomes], 'updated': [nomes], 'rejected': [(nome, motivo)]},
+            ou False em caso de erro no banco. No modo 'fail', 'applied' é False se algo foi recusado.
+    """
+    if on_conflict not in _UPSERT_SQL:
+        print(f'Modo de conflito desconhecido: {on_conflict}')
+        return False
+
+    result = {'applied': True, 'inserted': [], 'updated': [], 'rejected': []}
+    # Nomes já gravados nesta importação (dicionários mantêm a ordem de chegada)
+    inserted_names = {}
+    updated_names = {}
+    rows = iter(product_rows)
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
-            sql_query = ("""
-                INSERT INTO produtos (nome_produto, preco, quantidade_estoque, id_categoria) VALUES (:nome_produto, :preco, :quantidade_estoque, :id_categoria)
-            """)
-            cursor.executemany(sql_query, product_list)
+            connection.execute('BEGIN IMMEDIATE')
+            category_ids = {row['id_categoria'] for row in cursor.execute('SELECT id_categoria FROM categorias')}
+
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+
+                valid_rows = []
+                for product_data in chunk:
+                    problem = _product_row_problem(product_data, category_ids)
+                    if problem:
+                        result['rejected'].append((product_data.get('nome_produto'), problem))
+                    else:
+                        valid_rows.append(product_data)
+
+                # Nomes que já existem no banco antes deste lote
+                names = list({product_data['nome_produto'] for product_data in valid_rows})
+                existing_names = set()
+                for names_chunk in _chunks(names):
+                    placeholders = ', '.join('?' * len(names_chunk))
+                    cursor.execute(f"""
+                        SELECT nome_produto FROM produtos WHERE nome_produto IN ({placeholders})
+                    """, names_chunk)
+                    existing_names.update(row['nome_produto'] for row in cursor.fetchall())
+
+                rows_to_write = []
+                for product_data in valid_rows:
+                    product_name = product_data['nome_produto']
+                    if product_name in inserted_names or product_name in updated_names:
+                        # Repetido na própria importação: no modo 'update' a última linha vence
+                        if on_conflict == 'update':
+                            rows_to_write.append(product_data)
+                        else:
+                            result['rejected'].append((product_name, 'repetido_na_importacao'))
+                    elif product_name not in existing_names:
+                        inserted_names[product_name] = None
+                        rows_to_write.append(product_data)
+                    elif on_conflict == 'update':
+                        updated_names[product_name] = None
+                        rows_to_write.append(product_data)
+                    else:
+                        result['rejected'].append((product_name, 'ja_existe'))
+
+                if on_conflict == 'fail' and result['rejected']:
+                    connection.rollback()
+                    result['applied'] = False
+                    return result
+
+                cursor.executemany(_UPSERT_SQL[on_conflict], rows_to_write)
+
             connection.commit()
-        return True
+        result['inserted'] = list(inserted_names)
+        result['updated'] = list(updated_names)
+        return result
     except sqlite3.Error as e:
-        print(f'Erro ao adicionar varios produtos: {e}')
+        print(f'Erro ao importar produtos em lote: {e}')
         return False
 
 def list_products():
@@ -259,8 +1093,7 @@ def list_products():
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT p.id_produto, p.nome_produto, p.preco, p.quantidade_estoque, c.nome_categoria, c.id_categoria FROM produtos AS p
@@ -273,6 +1106,44 @@ def list_products():
         print(f'Erro ao listar produtos: {e}')
         return []
         
+def iter_products(batch_size=ITER_BATCH_SIZE):
+    """
+    Percorre todos os produtos (com o nome da categoria), em ordem de id, sem carregar a tabela
+    inteira na memória. Cada lote é lido em uma consulta própria, então gravações feitas durante
+    a iteração (na mesma thread ou em outras) não ficam bloqueadas nem invisíveis.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez. Defaults to ITER_BATCH_SIZE.
+
+    Yields:
+        sqlite3.Row: Um produto por vez, com as mesmas colunas de list_products.
+    """
+    yield from _iter_query("""
+        SELECT p.id_produto, p.nome_produto, p.preco, p.quantidade_estoque, c.nome_categoria, c.id_categoria FROM produtos AS p
+        JOIN categorias AS c
+        ON p.id_categoria = c.id_categoria
+        WHERE p.id_produto > :after
+        ORDER BY p.id_produto
+        LIMIT :limit
+    """, 'id_produto', batch_size=batch_size, error_message='Erro ao percorrer produtos')
+
+def iter_catalog_rows(batch_size=ITER_BATCH_SIZE):
+    """
+    Percorre apenas as colunas numéricas do catálogo, em ordem de id, para análises em lote.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez. Defaults to ITER_BATCH_SIZE.
+
+    Yields:
+        sqlite3.Row: (id_produto, preco, quantidade_estoque, id_categoria) de um produto por vez.
+    """
+    yield from _iter_query("""
+        SELECT id_produto, preco, quantidade_estoque, id_categoria FROM produtos
+        WHERE id_produto > :after
+        ORDER BY id_produto
+        LIMIT :limit
+    """, 'id_produto', batch_size=batch_size, error_message='Erro ao percorrer catalogo')
+
 def list_products_by_category(category_id):
     """
     Retorna uma lista de produtos de uma categoria específica.
@@ -285,8 +1156,7 @@ def list_products_by_category(category_id):
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT id_produto, nome_produto, preco, quantidade_estoque FROM produtos
@@ -310,7 +1180,7 @@ def update_product_stock(product_id, new_quantity):
         bool: True se a atualização for bem-sucedida, False caso contrário.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 UPDATE produtos
@@ -323,6 +1193,87 @@ def update_product_stock(product_id, new_quantity):
         print(f'Erro ao modificar quantidade_estoque: {e}')
         return False
 
+def receive_stock(stock_deltas):
+    """
+    Aplica entradas de mercadoria (ou ajustes) relativas no estoque de vários produtos
+    em uma única transação. As linhas são carregadas em uma tabela temporária e o estoque
+    é atualizado com um único UPDATE, então o custo cresce só com o tamanho da entrada.
+
+    A entrada é tudo-ou-nada: se alguma linha citar um produto inexistente, ou se algum
+    estoque ficar negativo, nada é aplicado e as linhas com problema são apontadas.
+
+    Args:
+        stock_deltas (iterable): Tuplas (id_produto, quantidade) com a variação de cada linha
+            (positiva para entrada, negativa para baixa). Produtos repetidos são somados.
+
+    Returns:
+        dict or bool: {'applied': bool, 'lines': [...]}, onde cada linha é um dicionário com
+            'id_produto', 'delta', 'status' ('ok', 'produto_inexistente' ou 'estoque_negativo')
+            e 'quantidade_estoque' (o estoque final, ou None se nada foi aplicado).
+            Retorna False em caso de erro no banco.
+    """
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS recebimento
+                (
+                linha INTEGER PRIMARY KEY,
+                id_produto INTEGER NOT NULL,
+                delta INTEGER NOT NULL
+                )
+            """)
+            connection.execute('BEGIN IMMEDIATE')
+            cursor.execute('DELETE FROM temp.recebimento')
+            cursor.executemany("""
+                INSERT INTO temp.recebimento (linha, id_produto, delta) VALUES (?, ?, ?)
+            """, ((line, product_id, delta) for line, (product_id, delta) in enumerate(stock_deltas)))
+
+            cursor.execute("""
+                SELECT r.linha, r.id_produto, r.delta,
+                    CASE
+                        WHEN p.id_produto IS NULL THEN 'produto_inexistente'
+                        WHEN p.quantidade_estoque + t.delta_total < 0 THEN 'estoque_negativo'
+                        ELSE 'ok'
+                    END AS status
+                FROM temp.recebimento AS r
+                JOIN (
+                    SELECT id_produto, SUM(delta) AS delta_total FROM temp.recebimento GROUP BY id_produto
+                ) AS t ON t.id_produto = r.id_produto
+                LEFT JOIN produtos AS p ON p.id_produto = r.id_produto
+                ORDER BY r.linha
+            """)
+            lines = [
+                {'id_produto': row['id_produto'], 'delta': row['delta'], 'status': row['status'], 'quantidade_estoque': None}
+                for row in cursor
+            ]
+            if any(line['status'] != 'ok' for line in lines):
+                connection.rollback()
+                return {'applied': False, 'lines': lines}
+
+            cursor.execute("""
+                WITH totais AS (
+                    SELECT id_produto, SUM(delta) AS delta_total FROM temp.recebimento GROUP BY id_produto
+                )
+                UPDATE produtos
+                SET quantidade_estoque = quantidade_estoque + totais.delta_total
+                FROM totais
+                WHERE produtos.id_produto = totais.id_produto
+            """)
+            cursor.execute("""
+                SELECT p.quantidade_estoque FROM temp.recebimento AS r
+                JOIN produtos AS p ON p.id_produto = r.id_produto
+                ORDER BY r.linha
+            """)
+            for line, row in zip(lines, cursor):
+                line['quantidade_estoque'] = row['quantidade_estoque']
+            cursor.execute('DELETE FROM temp.recebimento')
+            connection.commit()
+        return {'applied': True, 'lines': lines}
+    except sqlite3.Error as e:
+        print(f'Erro ao registrar entrada de estoque: {e}')
+        return False
+
 def update_product(product_id, provided_password, new_name=None, new_price=None):
     """
     Atualiza o nome e/ou o preço de um produto de forma flexível após validar a senha.
@@ -331,15 +1282,18 @@ def update_product(product_id, provided_password, new_name=None, new_price=None)
         product_id (int): O ID do produto a ser atualizado.
         provided_password (str): A senha de administrador.
         new_name (str, optional): O novo nome do produto. Defaults to None.
-        new_price (float, optional): O novo preço do produto. Defaults to None.
+        new_price (int, optional): O novo preço do produto, em centavos. Defaults to None.
 
     Returns:
         bool: True se a atualização for bem-sucedida, False caso contrário.
     """
     if provided_password != ADMIN_PASSWORD:
         return False
+    if new_price is not None and (not _is_cents(new_price) or new_price < 0):
+        print('Erro: o preço deve ser um valor inteiro em centavos, não negativo')
+        return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
+        with get_connection() as connection:
             cursor = connection.cursor()
             set_clausules = []
             values = []
@@ -362,6 +1316,98 @@ def update_product(product_id, provided_password, new_name=None, new_price=None)
         return False
 
 
+def reprice_products(provided_password, category_id=None, product_ids=None, percent=None, delta=None, price_map=None):
+    """
+    Reajusta preços em lote, em uma única transação e com uma única validação de senha.
+
+    Escolha exatamente um tipo de reajuste:
+        - percent: aplica um percentual (ex.: 8 para +8%, -10 para -10%) aos produtos alvo;
+        - delta: soma um valor absoluto (em centavos) ao preço dos produtos alvo;
+        - price_map: define o novo preço de cada produto ({id_produto: novo_preco_em_centavos}).
+    Para percent e delta, informe o alvo com category_id ou product_ids.
+    Com percent, o novo preço é arredondado para o centavo mais próximo.
+    A operação é recusada por inteiro se algum preço ficar negativo.
+
+    Args:
+        provided_password (str): A senha de administrador.
+        category_id (int, optional): Reajusta todos os produtos desta categoria.
+        product_ids (list[int], optional): Reajusta apenas estes produtos.
+        percent (float, optional): O percentual de reajuste.
+        delta (int, optional): O valor em centavos a ser somado ao preço.
+        price_map (dict, optional): Os novos preços em centavos por id_produto.
+
+    Returns:
+        int or bool: A quantidade de produtos cujo preço mudou (pode ser 0), ou False em caso de erro.
+    """
+    if provided_password != ADMIN_PASSWORD:
+        return False
+    if sum(adjustment is not None for adjustment in (percent, delta, price_map)) != 1:
+        print('Erro: informe exatamente um reajuste (percent, delta ou price_map)')
+        return False
+    if price_map is None and (category_id is None) == (product_ids is None):
+        print('Erro: informe o alvo do reajuste (category_id ou product_ids)')
+        return False
+    if (delta is not None and not _is_cents(delta)) or (
+            price_map is not None and not all(_is_cents(new_price) for new_price in price_map.values())):
+        print('Erro: os valores do reajuste devem ser inteiros em centavos')
+        return False
+    if price_map is not None and any(new_price < 0 for new_price in price_map.values()):
+        print('Erro: o reajuste deixaria um preço negativo')
+        return False
+
+    if percent is not None:
+        new_price_sql, adjustment = 'CAST(ROUND(preco * (100 + (?)) / 100.0) AS INTEGER)', percent
+    else:
+        new_price_sql, adjustment = 'preco + (?)', delta
+
+    try:
+        with get_connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            cursor = connection.cursor()
+            changes_before = connection.total_changes
+
+            if price_map is not None:
+                cursor.executemany("""
+                    UPDATE produtos SET preco = (?)
+                    WHERE id_produto = (?) AND preco != (?)
+                """, [(new_price, product_id, new_price) for product_id, new_price in price_map.items()])
+
+            elif category_id is not None:
+                # Usa o índice de id_categoria: só as linhas da categoria são visitadas
+                cursor.execute(f"""
+                    SELECT 1 FROM produtos WHERE id_categoria = (?) AND {new_price_sql} < 0 LIMIT 1
+                """, (category_id, adjustment))
+                if cursor.fetchone():
+                    print('Erro: o reajuste deixaria um preço negativo')
+                    return False
+                cursor.execute(f"""
+                    UPDATE produtos SET preco = {new_price_sql}
+                    WHERE id_categoria = (?) AND preco != {new_price_sql}
+                """, (adjustment, category_id, adjustment))
+
+            else:
+                product_ids = list(product_ids)
+                for chunk in _chunks(product_ids):
+                    placeholders = ', '.join('?' * len(chunk))
+                    cursor.execute(f"""
+                        SELECT 1 FROM produtos WHERE id_produto IN ({placeholders}) AND {new_price_sql} < 0 LIMIT 1
+                    """, (*chunk, adjustment))
+                    if cursor.fetchone():
+                        print('Erro: o reajuste deixaria um preço negativo')
+                        return False
+                cursor.executemany(f"""
+                    UPDATE produtos SET preco = {new_price_sql}
+                    WHERE id_produto = (?) AND preco != {new_price_sql}
+                """, [(adjustment, product_id, adjustment) for product_id in product_ids])
+
+            changed_rows = connection.total_changes - changes_before
+            connection.commit()
+        return changed_rows
+    except sqlite3.Error as e:
+        print(f'Erro ao reajustar precos em lote: {e}')
+        return False
+
+
 def delete_product(product_id, provided_password):
     """
     Deleta um produto do banco de dados após validar a senha.
@@ -376,10 +1422,7 @@ def delete_product(product_id, provided_password):
     if provided_password != ADMIN_PASSWORD:
         return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            # Boa prática: manter o PRAGMA em todas as funções de escrita 
-            connection.execute('PRAGMA foreign_keys = ON;')
-
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 DELETE FROM produtos
@@ -402,8 +1445,7 @@ def find_product_by_id(product_id):
         sqlite3.Row or None: Um objeto Row com os dados do produto se encontrado, senão None.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             sql_query = ("""
                 SELECT p.*, c.nome_categoria FROM produtos AS p JOIN
@@ -417,68 +1459,287 @@ def find_product_by_id(product_id):
         print(f'Nao foi possivel procurar produtos pelo id: {e}')
         return None
 
+def find_product_ids_by_names(product_names):
+    """
+    Busca os IDs de vários produtos pelo nome, em poucas consultas.
+
+    Args:
+        product_names (iterable[str]): Os nomes dos produtos.
+
+    Returns:
+        dict: {nome_produto: id_produto} dos nomes encontrados (vazio em caso de erro).
+    """
+    names = list(set(product_names))
+    ids_by_name = {}
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            for names_chunk in _chunks(names):
+                placeholders = ', '.join('?' * len(names_chunk))
+                cursor.execute(f"""
+                    SELECT id_produto, nome_produto FROM produtos WHERE nome_produto IN ({placeholders})
+                """, names_chunk)
+                ids_by_name.update((row['nome_produto'], row['id_produto']) for row in cursor.fetchall())
+        return ids_by_name
+    except sqlite3.Error as e:
+        print(f'Nao foi possivel procurar produtos pelo nome: {e}')
+        return {}
+
+
+# Quantos produtos search_products retorna por padrão
+SEARCH_LIMIT = 20
+
+# Os resultados saem do índice FTS5 em ordem de rowid, que começa pelo tamanho do nome
+# (veja _PRODUCT_SEARCH_SQL): os primeiros são os produtos em que o texto digitado
+# cobre a maior parte do nome, e a consulta para assim que junta 'limit' produtos
+_SEARCH_SQL = f"""
+    SELECT p.id_produto, p.nome_produto, p.preco, p.quantidade_estoque, c.nome_categoria, c.id_categoria
+    FROM (SELECT rowid FROM produtos_busca WHERE produtos_busca MATCH (?) ORDER BY rowid LIMIT (?)) AS b
+    JOIN produtos AS p ON p.id_produto = b.rowid & {_SEARCH_MAX_PRODUCT_ID}
+    JOIN categorias AS c ON c.id_categoria = p.id_categoria
+    ORDER BY b.rowid
+"""
+
+
+def _search_match_expression(query):
+    # Cada palavra digitada vira um prefixo entre aspas ("col"*), então aspas, hífens e
+    # operadores do FTS5 (AND, OR, NOT, NEAR) digitados pelo usuário nunca viram sintaxe
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search_products(query, limit=SEARCH_LIMIT):
+    """
+    Busca produtos pelo que foi digitado até agora: cada palavra é tratada como início de
+    palavra do nome do produto ou da categoria, sem diferenciar maiúsculas nem acentos
+    ('brin pra' encontra 'Brinco de Prata'). Usa o índice FTS5 produtos_busca, sem
+    percorrer a tabela de produtos.
+
+    Regra de ordenação (não há pontuação de relevância como bm25): produtos com todas as
+    palavras no nome vêm antes dos encontrados só pela categoria e, em cada grupo, os de nome
+    mais curto (em caracteres) vêm primeiro, com empates pela ordem de cadastro. A regra vale
+    entre todos os produtos que casam com o texto, por mais genérico que ele seja.
+
+    Args:
+        query (str): O texto digitado.
+        limit (int, optional): Quantos produtos retornar. Defaults to SEARCH_LIMIT.
+
+    Returns:
+        list: Objetos sqlite3.Row com os mesmos campos de list_products, do mais relevante
+            para o menos relevante. Retorna uma lista vazia se nada for digitado ou em caso de erro.
+    """
+    match_expression = _search_match_expression(query)
+    if not match_expression:
+        return []
+    name_expression = f'{{nome_produto}} : ({match_expression})'
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(_SEARCH_SQL, (name_expression, limit))
+            products = cursor.fetchall()
+            if len(products) < limit:
+                # Completa com os produtos que só foram encontrados pela categoria
+                cursor.execute(_SEARCH_SQL, (f'({match_expression}) NOT {name_expression}',
+                                             limit - len(products)))
+                products += cursor.fetchall()
+        return products
+    except sqlite3.Error as e:
+        print(f'Erro ao buscar produtos: {e}')
+        return []
+
 # Funções de crud para vendas
-def register_sale(items):
+
+# Novas tentativas e espera inicial (segundos) quando o banco estiver ocupado (SQLITE_BUSY)
+SALE_MAX_RETRIES = 5
+SALE_RETRY_BACKOFF = 0.05
+
+
+class _SaleRejected(Exception):
+    """Venda recusada por regra de negócio (produto inexistente ou estoque insuficiente)."""
+
+
+def _is_busy_error(error):
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    error_code = getattr(error, 'sqlite_errorcode', None)
+    if error_code is not None:
+        return error_code & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def _wait_before_retry(attempt):
+    # Backoff exponencial com jitter para os caixas não tentarem todos no mesmo instante
+    time.sleep(SALE_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def _merge_sale_items(items):
+    # itens_da_venda tem chave (id_venda, id_produto): produtos repetidos viram uma única linha
+    quantities = {}
+    for product_id, quantity in items:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    return quantities
+
+
+def _fetch_products_for_sale(cursor, product_ids):
+    products = {}
+    for chunk in _chunks(product_ids):
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f"""
+            SELECT id_produto, preco, quantidade_estoque FROM produtos
+            WHERE id_produto IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            products[row['id_produto']] = row
+    return products
+
+
+def _insert_sale(cursor, quantities, datetime_str, register_id=None, update_summary=True):
+    # Grava uma venda dentro da transação já aberta; recusas de negócio viram _SaleRejected.
+    # Com update_summary=False, quem chama soma a venda nos resumos depois (register_sales)
+    products = _fetch_products_for_sale(cursor, list(quantities))
+    total_price = 0
+    items_to_register = []
+    for product_id, quantity in quantities.items():
+        query_result = products.get(product_id)
+        if not query_result:
+            raise _SaleRejected(f'Produto com ID {product_id} não encontrado')
+
+        if quantity > query_result['quantidade_estoque']:
+            raise _SaleRejected(f'Estoque insuficiente para o produto ID {product_id}')
+
+        unit_price = query_result['preco']
+        total_price += unit_price * quantity
+        items_to_register.append((product_id, quantity, unit_price))
+
+    # Baixa condicional: o próprio UPDATE garante que o estoque nunca fica negativo
+    cursor.executemany("""
+        UPDATE produtos
+        SET quantidade_estoque = quantidade_estoque - (?)
+        WHERE id_produto = (?) AND quantidade_estoque >= (?)
+    """, [(quantity, product_id, quantity) for product_id, quantity in quantities.items()])
+    if quantities and cursor.rowcount != len(quantities):
+        raise _SaleRejected('Estoque insuficiente para um dos produtos da venda')
+
+    if register_id is not None:
+        # Cada caixa tem sua própria linha de totais: somar aqui custa uma atualização pela chave
+        cursor.execute("""
+            UPDATE caixas
+            SET quantidade_vendas = quantidade_vendas + 1, total_vendas = total_vendas + (?)
+            WHERE id_caixa = (?) AND fechamento IS NULL
+        """, (total_price, register_id))
+        if cursor.rowcount != 1:
+            raise _SaleRejected(f'Caixa {register_id} não existe ou já foi fechado')
+
+    cursor.execute("""
+        INSERT INTO vendas (data_hora, valor_total, id_caixa) VALUES (?, ?, ?)
+    """, (datetime_str, total_price, register_id))
+    sale_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO itens_da_venda (id_venda, id_produto, quantidade, preco_unitario) 
+        VALUES (?, ?, ?, ?)
+    """, [(sale_id, product_id, quantity, unit_price) for product_id, quantity, unit_price in items_to_register])
+    if update_summary:
+        _apply_sale_to_summary(cursor, sale_id, 1)
+    return sale_id
+
+
+def register_sale(items, max_retries=SALE_MAX_RETRIES, register_id=None):
     """
     Registra uma venda completa, incluindo itens, e atualiza o estoque dos produtos.
     A operação é uma transação: ou tudo funciona, ou nada é salvo.
 
+    Todos os produtos do carrinho são lidos em uma única consulta, a baixa de estoque é
+    feita com um único executemany condicional e os itens são gravados em lote.
+    A transação reserva o lock de escrita logo no início (BEGIN IMMEDIATE), então dois
+    caixas vendendo a última unidade nunca aprovam as duas vendas; se o banco estiver
+    ocupado, a venda é tentada de novo com espera crescente.
+
     Args:
         items (list): Uma lista de tuplas, onde cada tupla contém (id_produto, quantidade).
+        max_retries (int, optional): Novas tentativas quando o banco estiver ocupado.
+            Defaults to SALE_MAX_RETRIES.
+        register_id (int, optional): O caixa aberto que fez a venda; os totais do caixa
+            são atualizados na mesma transação. Defaults to None (venda sem caixa).
 
     Returns:
         int or bool: O ID da nova venda se for bem-sucedida, senão False.
     """
-    total_price = 0
-    items_to_register = []
+    quantities = _merge_sale_items(items)
     datetime_obj = datetime.now()
     datetime_str = datetime_obj.strftime('%Y-%m-%d %H:%M:%S')
-    try:
-        with sqlite3.connect(DB_FILE) as connection:
-            cursor = connection.cursor()
-            # Validação de estoque e cálculo do preço total
-            for (product_id, quantity) in items:
-                cursor.execute("""
-                    SELECT preco, quantidade_estoque FROM produtos WHERE id_produto = (?)
-                """, (product_id,))
-                query_result = cursor.fetchone()
-                if not query_result:
-                    print(f'Erro: Produto com ID {product_id} não encontrado')
-                    return False
-                
-                stock_quantity = query_result[1]
-                if quantity > stock_quantity:
-                    print(f'Erro: Estoque insuficiente para o produto ID {product_id}')
-                    return False
-                
-                cursor.execute("""
-                    UPDATE produtos
-                    SET quantidade_estoque = quantidade_estoque - (?)
-                    WHERE id_produto = (?)
-                """, (quantity, product_id))
-                unit_price = query_result[0]
-                subtotal = unit_price * quantity
-                total_price += subtotal
-                items_to_register.append((product_id, quantity, unit_price))
+    for attempt in range(max_retries + 1):
+        try:
+            with get_connection() as connection:
+                connection.execute('BEGIN IMMEDIATE')
+                sale_id = _insert_sale(connection.cursor(), quantities, datetime_str, register_id)
+                connection.commit()
+            print(f'ID VENDA: {sale_id}')
+            return sale_id
+        except _SaleRejected as e:
+            print(f'Erro: {e}')
+            return False
+        except sqlite3.Error as e:
+            if _is_busy_error(e) and attempt < max_retries:
+                _wait_before_retry(attempt)
+                continue
+            print(f'Erro ao registrar uma venda: {e}')
+            return False
+
+
+def register_sales(sales, max_retries=SALE_MAX_RETRIES):
+    """
+    Registra várias vendas em uma única transação (group commit): um só BEGIN IMMEDIATE e
+    um só COMMIT (e fsync) para o grupo inteiro, em vez de um por venda.
 
-            cursor.execute("""
-                INSERT INTO vendas (data_hora, valor_total) VALUES (?, ?)
-            """, (datetime_str, total_price))
-            sale_id = cursor.lastrowid
-            #print(f'ID VENDA: {id_venda}')
+    Cada venda roda dentro do seu próprio SAVEPOINT: uma venda recusada (produto inexistente,
+    estoque insuficiente, caixa fechado) é desfeita sozinha e as outras do grupo seguem.
+    As vendas são aplicadas na ordem da lista, então, disputando a última unidade, a primeira
+    leva. Os resumos de vendas são atualizados uma única vez para o grupo inteiro (as vendas
+    aprovadas têm IDs contíguos, já que o grupo segura o lock de escrita). Se o banco estiver
+    ocupado, o grupo inteiro é tentado de novo com espera crescente.
 
-            for item in items_to_register:
-                product_id, quantity, unit_price = item
-                cursor.execute("""
-                    INSERT INTO itens_da_venda (id_venda, id_produto, quantidade, preco_unitario) 
-                    VALUES (?, ?, ?, ?)
-                """, (sale_id, product_id, quantity, unit_price))
-            connection.commit()
-            print(f'ID VENDA: {sale_id}')
-        return sale_id
-    except sqlite3.Error as e:
-        print(f'Erro ao registrar uma venda: {e}')
-        return False
+    Args:
+        sales (list): Uma lista de tuplas (itens, id_caixa), onde itens é a lista de
+            (id_produto, quantidade) da venda e id_caixa pode ser None.
+        max_retries (int, optional): Novas tentativas quando o banco estiver ocupado.
+            Defaults to SALE_MAX_RETRIES.
+
+    Returns:
+        list: Para cada venda, na mesma ordem, o ID da nova venda ou False se ela foi recusada.
+            Se a transação falhar, todas as posições são False.
+    """
+    merged_sales = [(_merge_sale_items(items), register_id) for items, register_id in sales]
+    if not merged_sales:
+        return []
+    datetime_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for attempt in range(max_retries + 1):
+        try:
+            results = []
+            with get_connection() as connection:
+                cursor = connection.cursor()
+                connection.execute('BEGIN IMMEDIATE')
+                for quantities, register_id in merged_sales:
+                    cursor.execute('SAVEPOINT venda')
+                    try:
+                        results.append(_insert_sale(cursor, quantities, datetime_str, register_id,
+                                                    update_summary=False))
+                    except (_SaleRejected, sqlite3.IntegrityError) as e:
+                        # Desfaz só esta venda; as anteriores do grupo continuam na transação
+                        cursor.execute('ROLLBACK TO venda')
+                        print(f'Erro: {e}')
+                        results.append(False)
+                    cursor.execute('RELEASE venda')
+                sale_ids = [sale_id for sale_id in results if sale_id]
+                if sale_ids:
+                    _apply_sales_to_summary(cursor, min(sale_ids), max(sale_ids), 1)
+                connection.commit()
+            return results
+        except sqlite3.Error as e:
+            if _is_busy_error(e) and attempt < max_retries:
+                _wait_before_retry(attempt)
+                continue
+            print(f'Erro ao registrar um grupo de vendas: {e}')
+            return [False] * len(merged_sales)
 
 def list_sales_by_date(date_str):
     """
@@ -492,14 +1753,17 @@ def list_sales_by_date(date_str):
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        day_start, next_day = _day_range(date_str)
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
-                SELECT * FROM vendas WHERE DATE(data_hora) = (?)
-            """, (date_str,))
+                SELECT * FROM vendas WHERE data_hora >= (?) AND data_hora < (?)
+            """, (day_start, next_day))
             found_sales = cursor.fetchall()
         return found_sales
+    except ValueError as e:
+        print(f'Data invalida para listar vendas: {e}')
+        return []
     except sqlite3.Error as e:
         print(f'Erro ao listar vendas por data: {e}')
         return []
@@ -513,8 +1777,7 @@ def list_sales():
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT * FROM vendas
@@ -525,6 +1788,94 @@ def list_sales():
         print(f'Erro ao listar todas as vendas: {e}')
         return []
 
+def iter_sales(batch_size=ITER_BATCH_SIZE):
+    """
+    Percorre o resumo de todas as vendas sem carregar a tabela inteira na memória.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez. Defaults to ITER_BATCH_SIZE.
+
+    Yields:
+        sqlite3.Row: Uma venda por vez.
+    """
+    yield from _iter_query("""
+        SELECT id_venda, data_hora, valor_total FROM vendas
+        WHERE id_venda > :after
+        ORDER BY id_venda
+        LIMIT :limit
+    """, 'id_venda', batch_size=batch_size, error_message='Erro ao percorrer vendas')
+
+def list_sales_between(start_str, end_str):
+    """
+    Retorna o resumo das vendas feitas no intervalo semiaberto [início, fim).
+
+    Args:
+        start_str (str): O início do intervalo ('YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM:SS'), incluído.
+        end_str (str): O fim do intervalo, no mesmo formato, não incluído.
+
+    Returns:
+        list: Uma lista de objetos sqlite3.Row ordenada por data_hora e id_venda.
+            Retorna uma lista vazia em caso de erro.
+    """
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT id_venda, data_hora, valor_total FROM vendas
+                WHERE data_hora >= (?) AND data_hora < (?)
+                ORDER BY data_hora, id_venda
+            """, (start_str, end_str))
+            sales = cursor.fetchall()
+        return sales
+    except sqlite3.Error as e:
+        print(f'Erro ao listar vendas por intervalo: {e}')
+        return []
+
+def list_sales_page(page_size, after=None, start_str=None, end_str=None):
+    """
+    Retorna uma página de vendas usando paginação por cursor (keyset) em (data_hora, id_venda).
+    Cada página começa logo depois da última venda da página anterior, sem OFFSET,
+    então o custo não cresce com o número de páginas já lidas.
+
+    Args:
+        page_size (int): A quantidade máxima de vendas na página.
+        after (tuple, optional): O cursor (data_hora, id_venda) da última venda da página anterior.
+            Defaults to None (primeira página).
+        start_str (str, optional): Filtra vendas a partir desta data/hora (incluída). Defaults to None.
+        end_str (str, optional): Filtra vendas antes desta data/hora (não incluída). Defaults to None.
+
+    Returns:
+        list: Uma lista de objetos sqlite3.Row ordenada por data_hora e id_venda.
+            Retorna uma lista vazia em caso de erro.
+    """
+    where_clausules = []
+    values = []
+    if after is not None:
+        where_clausules.append('(data_hora, id_venda) > (?, ?)')
+        values.extend(after)
+    if start_str is not None:
+        where_clausules.append('data_hora >= ?')
+        values.append(start_str)
+    if end_str is not None:
+        where_clausules.append('data_hora < ?')
+        values.append(end_str)
+    where_statement = f"WHERE {' AND '.join(where_clausules)}" if where_clausules else ''
+    values.append(page_size)
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                SELECT id_venda, data_hora, valor_total FROM vendas
+                {where_statement}
+                ORDER BY data_hora, id_venda
+                LIMIT (?)
+            """, values)
+            sales = cursor.fetchall()
+        return sales
+    except sqlite3.Error as e:
+        print(f'Erro ao listar pagina de vendas: {e}')
+        return []
+
 def list_items_by_sale(sale_id):
     """
     Retorna uma lista com todos os itens de uma venda específica.
@@ -537,8 +1888,7 @@ def list_items_by_sale(sale_id):
             Retorna uma lista vazia em caso de erro.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             cursor.execute("""
                 SELECT iv.id_produto, p.nome_produto, iv.quantidade, iv.preco_unitario FROM itens_da_venda as iv
@@ -564,8 +1914,7 @@ def find_sale_by_id(sale_id):
         sqlite3.Row or None: Um objeto Row com os dados da venda se encontrada, senão None.
     """
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.row_factory = sqlite3.Row
+        with get_connection() as connection:
             cursor = connection.cursor()
             sql_query = ("""
                 SELECT id_venda, data_hora, valor_total FROM vendas
@@ -578,10 +1927,60 @@ def find_sale_by_id(sale_id):
         print(f'Erro ao procurar venda pelo id: {e}')
         return None
 
+def list_sales_with_items(sale_ids):
+    """
+    Busca vendas completas em uma única consulta: cada linha traz a venda, um dos seus itens,
+    o produto desse item e a categoria do produto (JOIN entre as quatro tabelas).
+
+    Args:
+        sale_ids (list[int]): Os IDs das vendas a serem buscadas.
+
+    Returns:
+        list: Uma lista de objetos sqlite3.Row ordenada por id_venda e id_produto. Vendas sem
+            itens aparecem em uma única linha com as colunas do item em None.
+            Retorna uma lista vazia em caso de erro.
+    """
+    rows = []
+    try:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            for chunk in _chunks(list(sale_ids)):
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT v.id_venda, v.data_hora, v.valor_total,
+                        iv.id_produto, iv.quantidade, iv.preco_unitario,
+                        p.nome_produto, p.preco, p.quantidade_estoque,
+                        c.id_categoria, c.nome_categoria
+                    FROM vendas AS v
+                    LEFT JOIN itens_da_venda AS iv ON iv.id_venda = v.id_venda
+                    LEFT JOIN produtos AS p ON p.id_produto = iv.id_produto
+                    LEFT JOIN categorias AS c ON c.id_categoria = p.id_categoria
+                    WHERE v.id_venda IN ({placeholders})
+                    ORDER BY v.id_venda, iv.id_produto
+                """, chunk)
+                rows.extend(cursor.fetchall())
+        return rows
+    except sqlite3.Error as e:
+        print(f'Erro ao buscar vendas com itens: {e}')
+        return []
+
+def find_sale_with_items(sale_id):
+    """
+    Busca uma venda completa (venda, itens, produtos e categorias) em uma única consulta.
+
+    Args:
+        sale_id (int): O ID da venda a ser procurada.
+
+    Returns:
+        list: As linhas de list_sales_with_items para esta venda (lista vazia se não existir).
+    """
+    return list_sales_with_items([sale_id])
+
 def delete_sale(sale_id, provided_password):
     """
     Deleta uma venda e realiza o estorno (devolução) dos itens ao estoque.
     A operação é uma transação: ou tudo funciona, ou nada é alterado.
+    Vendas de um caixa já fechado não podem ser deletadas: o fechamento já foi conferido.
 
     Args:
         sale_id (int): O ID da venda a ser deletada.
@@ -593,16 +1992,36 @@ def delete_sale(sale_id, provided_password):
     if provided_password != ADMIN_PASSWORD:
         return False
     try:
-        with sqlite3.connect(DB_FILE) as connection:
-            connection.execute('PRAGMA foreign_keys = ON;')
-
+        with get_connection() as connection:
             cursor = connection.cursor()
+            connection.execute('BEGIN IMMEDIATE')
+            cursor.execute("""
+                SELECT id_caixa FROM vendas
+                WHERE id_venda = (?)
+            """, (sale_id,))
+            sale = cursor.fetchone()
+            register_id = sale['id_caixa'] if sale else None
+
+            # Estorna a venda dos totais do caixa que a registrou, se ele ainda estiver aberto
+            if register_id is not None:
+                cursor.execute("""
+                    UPDATE caixas
+                    SET quantidade_vendas = quantidade_vendas - 1,
+                        total_vendas = total_vendas - (SELECT valor_total FROM vendas WHERE id_venda = (?))
+                    WHERE id_caixa = (?) AND fechamento IS NULL
+                """, (sale_id, register_id))
+                if cursor.rowcount == 0:
+                    connection.rollback()
+                    print(f'Erro: a venda {sale_id} pertence ao caixa {register_id}, que já foi fechado')
+                    return False
+
             cursor.execute("""
                 SELECT id_produto, quantidade FROM itens_da_venda
                 WHERE id_venda = (?)
             """,(sale_id,))
             sold_products = cursor.fetchall()
-            
+            _apply_sale_to_summary(cursor, sale_id, -1)
+
             for product in sold_products:
                 product_id, quantity = product
                 cursor.execute("""
@@ -628,6 +2047,345 @@ def delete_sale(sale_id, provided_password):
         return False
 
 
+def rebuild_sales_summary():
+    """
+    Recalcula do zero os resumos de vendas (por dia, por produto e por categoria) a partir
+    de vendas e itens_da_venda. Útil depois de importações ou correções feitas direto no banco.
+    As vendas antigas entram na categoria atual de cada produto.
+
+    Returns:
+        bool: True se os resumos forem recalculados, False caso contrário.
+    """
+    try:
+        with get_connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            _rebuild_sales_summary(connection)
+            connection.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f'Erro ao recalcular os resumos de vendas: {e}')
+        return False
+
+
+# Como agrupar os dias do resumo em cada período (a semana começa na segunda-feira)
+_SUMMARY_PERIODS = {
+    'day': 'dia',
+    'week': "date(dia, 'weekday 0', '-6 days')",
+    'month': 'substr(dia, 1, 7)',
+}
+
+
+def summarize_sales(start_day, end_day, period='day'):
+    """
+    Totais de vendas por período, lidos apenas do resumo diário.
+
+    Args:
+        start_day (str): O primeiro dia ('YYYY-MM-DD'), incluído.
+        end_day (str): O dia final ('YYYY-MM-DD'), não incluído.
+        period (str, optional): 'day', 'week' (rótulo = segunda-feira) ou 'month' ('YYYY-MM').
+            Defaults to 'day'.
+
+    Returns:
+        list: Linhas (periodo, quantidade_vendas, unidades, receita) em ordem de período.
+    """
+    if period not in _SUMMARY_PERIODS:
+        print(f'Período desconhecido: {period}')
+        return []
+    period_sql = _SUMMARY_PERIODS[period]
+    try:
+        with get_connection() as connection:
+            return connection.execute(f"""
+                SELECT {period_sql} AS periodo, SUM(quantidade_vendas) AS quantidade_vendas,
+                       SUM(unidades) AS unidades, SUM(receita) AS receita
+                FROM resumo_vendas_diario
+                WHERE dia >= ? AND dia < ?
+                GROUP BY periodo
+                ORDER BY periodo
+            """, (start_day, end_day)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao resumir vendas: {e}')
+        return []
+
+
+def summarize_sales_by_product(start_day, end_day, limit=None):
+    """
+    Totais de vendas por produto no intervalo, lidos apenas do resumo por produto.
+
+    Args:
+        start_day (str): O primeiro dia ('YYYY-MM-DD'), incluído.
+        end_day (str): O dia final ('YYYY-MM-DD'), não incluído.
+        limit (int, optional): Quantos produtos retornar (os de maior receita). Defaults to todos.
+
+    Returns:
+        list: Linhas (id_produto, nome_produto, quantidade_vendas, unidades, receita),
+            da maior receita para a menor.
+    """
+    try:
+        with get_connection() as connection:
+            # Agrega primeiro e só depois busca os nomes, uma vez por produto
+            return connection.execute("""
+                SELECT r.id_produto, p.nome_produto, r.quantidade_vendas, r.unidades, r.receita
+                FROM (
+                    SELECT id_produto, SUM(quantidade_vendas) AS quantidade_vendas,
+                           SUM(unidades) AS unidades, SUM(receita) AS receita
+                    FROM resumo_vendas_produto
+                    WHERE dia >= ? AND dia < ?
+                    GROUP BY id_produto
+                ) r
+                LEFT JOIN produtos p ON p.id_produto = r.id_produto
+                ORDER BY r.receita DESC, r.id_produto
+                LIMIT ?
+            """, (start_day, end_day, -1 if limit is None else limit)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao resumir vendas por produto: {e}')
+        return []
+
+
+def summarize_sales_by_category(start_day, end_day):
+    """
+    Totais de vendas por categoria no intervalo, lidos apenas do resumo por categoria.
+
+    Args:
+        start_day (str): O primeiro dia ('YYYY-MM-DD'), incluído.
+        end_day (str): O dia final ('YYYY-MM-DD'), não incluído.
+
+    Returns:
+        list: Linhas (id_categoria, nome_categoria, quantidade_vendas, unidades, receita),
+            da maior receita para a menor.
+    """
+    try:
+        with get_connection() as connection:
+            return connection.execute("""
+                SELECT r.id_categoria, c.nome_categoria, SUM(r.quantidade_vendas) AS quantidade_vendas,
+                       SUM(r.unidades) AS unidades, SUM(r.receita) AS receita
+                FROM resumo_vendas_categoria r
+                LEFT JOIN categorias c ON c.id_categoria = r.id_categoria
+                WHERE r.dia >= ? AND r.dia < ?
+                GROUP BY r.id_categoria
+                ORDER BY receita DESC, r.id_categoria
+            """, (start_day, end_day)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao resumir vendas por categoria: {e}')
+        return []
+
+
+# valor_esperado = troco inicial + vendas do caixa; diferenca = contado - esperado
+_REGISTER_COLUMNS = """
+    id_caixa, nome_operador, abertura, fechamento, valor_abertura, quantidade_vendas, total_vendas,
+    valor_abertura + total_vendas AS valor_esperado, valor_contado,
+    valor_contado - (valor_abertura + total_vendas) AS diferenca
+"""
+
+
+def open_register(opening_amount, operator_name=None):
+    """
+    Abre uma nova sessão de caixa. Vários caixas podem ficar abertos ao mesmo tempo.
+
+    Args:
+        opening_amount (int): O troco inicial colocado na gaveta, em centavos.
+        operator_name (str, optional): O nome de quem opera o caixa. Defaults to None.
+
+    Returns:
+        int or bool: O ID do caixa aberto, ou False em caso de erro.
+    """
+    if not _is_cents(opening_amount) or opening_amount < 0:
+        print('Erro: o valor de abertura do caixa deve ser um inteiro em centavos, não negativo')
+        return False
+    try:
+        with get_connection() as connection:
+            cursor = connection.execute("""
+                INSERT INTO caixas (nome_operador, abertura, valor_abertura) VALUES (?, ?, ?)
+            """, (operator_name, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), opening_amount))
+            connection.commit()
+            return cursor.lastrowid
+    except sqlite3.Error as e:
+        print(f'Erro ao abrir o caixa: {e}')
+        return False
+
+
+def close_register(register_id, counted_amount):
+    """
+    Fecha um caixa aberto registrando o dinheiro contado na gaveta. Os totais já estão
+    acumulados na linha do caixa, então o fechamento não percorre as vendas.
+
+    Args:
+        register_id (int): O ID do caixa.
+        counted_amount (int): O valor contado na gaveta no fechamento, em centavos.
+
+    Returns:
+        sqlite3.Row or None: O caixa fechado, com valor_esperado, valor_contado e diferenca,
+            ou None se o caixa não existir ou já estiver fechado.
+    """
+    if not _is_cents(counted_amount) or counted_amount < 0:
+        print('Erro: o valor contado deve ser um inteiro em centavos, não negativo')
+        return None
+    try:
+        with get_connection() as connection:
+            cursor = connection.execute("""
+                UPDATE caixas SET fechamento = ?, valor_contado = ?
+                WHERE id_caixa = ? AND fechamento IS NULL
+            """, (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), counted_amount, register_id))
+            if cursor.rowcount != 1:
+                print(f'Erro: caixa {register_id} não existe ou já foi fechado')
+                return None
+            connection.commit()
+            return connection.execute(f'SELECT {_REGISTER_COLUMNS} FROM caixas WHERE id_caixa = ?',
+                                      (register_id,)).fetchone()
+    except sqlite3.Error as e:
+        print(f'Erro ao fechar o caixa: {e}')
+        return None
+
+
+def find_register_by_id(register_id):
+    """
+    Busca um caixa (aberto ou fechado) com seus totais acumulados.
+
+    Args:
+        register_id (int): O ID do caixa.
+
+    Returns:
+        sqlite3.Row or None: O caixa encontrado, ou None.
+    """
+    try:
+        with get_connection() as connection:
+            return connection.execute(f'SELECT {_REGISTER_COLUMNS} FROM caixas WHERE id_caixa = ?',
+                                      (register_id,)).fetchone()
+    except sqlite3.Error as e:
+        print(f'Erro ao buscar o caixa: {e}')
+        return None
+
+
+def list_open_registers():
+    """
+    Lista os caixas que ainda estão abertos.
+
+    Returns:
+        list: Uma lista de linhas de caixas, em ordem de abertura.
+    """
+    try:
+        with get_connection() as connection:
+            return connection.execute(f"""
+                SELECT {_REGISTER_COLUMNS} FROM caixas WHERE fechamento IS NULL ORDER BY id_caixa
+            """).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao listar os caixas abertos: {e}')
+        return []
+
+
+# Chave de agrupamento por tempo em aggregate_sales_by_time (None = total do intervalo)
+_SALES_TIME_GROUPS = {
+    None: 'NULL',
+    'day': 'substr(v.data_hora, 1, 10)',
+    'week': "date(v.data_hora, 'weekday 0', '-6 days')",
+    'month': 'substr(v.data_hora, 1, 7)',
+    'hour': 'CAST(substr(v.data_hora, 12, 2) AS INTEGER)',
+}
+
+
+def aggregate_sales_by_time(start_str, end_str, group='day'):
+    """
+    Soma as vendas do intervalo semiaberto [start_str, end_str) direto em vendas e
+    itens_da_venda, agrupando por dia, semana, mês ou hora do dia.
+
+    Args:
+        start_str (str): O início do intervalo ('YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM:SS'), incluído.
+        end_str (str): O fim do intervalo, não incluído.
+        group (str, optional): 'day', 'week' (chave = segunda-feira), 'month' ('YYYY-MM'),
+            'hour' (0 a 23) ou None para uma única linha com o total. Defaults to 'day'.
+
+    Returns:
+        list: Linhas (chave, quantidade_vendas, unidades, receita) em ordem de chave.
+    """
+    if group not in _SALES_TIME_GROUPS:
+        print(f'Agrupamento desconhecido: {group}')
+        return []
+    try:
+        with get_connection() as connection:
+            # Cada venda cai em um único grupo: conta as vendas sem DISTINCT e busca só as
+            # unidades nos itens (pelo índice de cobertura, sem ler a tabela de itens)
+            return connection.execute(f"""
+                SELECT {_SALES_TIME_GROUPS[group]} AS chave, COUNT(*) AS quantidade_vendas,
+                       COALESCE(SUM((SELECT SUM(iv.quantidade) FROM itens_da_venda iv
+                                     WHERE iv.id_venda = v.id_venda)), 0) AS unidades,
+                       COALESCE(SUM(v.valor_total), 0) AS receita
+                FROM vendas v
+                WHERE v.data_hora >= ? AND v.data_hora < ?
+                {'' if group is None else 'GROUP BY chave ORDER BY chave'}
+            """, (start_str, end_str)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao agregar vendas: {e}')
+        return []
+
+
+def aggregate_sales_by_product(start_str, end_str, limit=None):
+    """
+    Soma as vendas do intervalo semiaberto [start_str, end_str) por produto, direto em
+    vendas e itens_da_venda.
+
+    Args:
+        start_str (str): O início do intervalo ('YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM:SS'), incluído.
+        end_str (str): O fim do intervalo, não incluído.
+        limit (int, optional): Quantos produtos retornar (os de maior receita). Defaults to todos.
+
+    Returns:
+        list: Linhas (id_produto, nome_produto, quantidade_vendas, unidades, receita),
+            da maior receita para a menor.
+    """
+    try:
+        with get_connection() as connection:
+            return connection.execute("""
+                SELECT r.id_produto, p.nome_produto, r.quantidade_vendas, r.unidades, r.receita
+                FROM (
+                    SELECT iv.id_produto, COUNT(*) AS quantidade_vendas, SUM(iv.quantidade) AS unidades,
+                           SUM(iv.quantidade * iv.preco_unitario) AS receita
+                    FROM vendas v
+                    JOIN itens_da_venda iv ON iv.id_venda = v.id_venda
+                    WHERE v.data_hora >= ? AND v.data_hora < ?
+                    GROUP BY iv.id_produto
+                ) r
+                LEFT JOIN produtos p ON p.id_produto = r.id_produto
+                ORDER BY r.receita DESC, r.id_produto
+                LIMIT ?
+            """, (start_str, end_str, -1 if limit is None else limit)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao agregar vendas por produto: {e}')
+        return []
+
+
+def aggregate_sales_by_category(start_str, end_str):
+    """
+    Soma as vendas do intervalo semiaberto [start_str, end_str) pela categoria atual de
+    cada produto, direto em vendas e itens_da_venda.
+
+    Args:
+        start_str (str): O início do intervalo ('YYYY-MM-DD' ou 'YYYY-MM-DD HH:MM:SS'), incluído.
+        end_str (str): O fim do intervalo, não incluído.
+
+    Returns:
+        list: Linhas (id_categoria, nome_categoria, quantidade_vendas, unidades, receita),
+            da maior receita para a menor.
+    """
+    try:
+        with get_connection() as connection:
+            return connection.execute("""
+                SELECT r.id_categoria, c.nome_categoria, r.quantidade_vendas, r.unidades, r.receita
+                FROM (
+                    SELECT p.id_categoria, COUNT(DISTINCT iv.id_venda) AS quantidade_vendas,
+                           SUM(iv.quantidade) AS unidades, SUM(iv.quantidade * iv.preco_unitario) AS receita
+                    FROM vendas v
+                    JOIN itens_da_venda iv ON iv.id_venda = v.id_venda
+                    JOIN produtos p ON p.id_produto = iv.id_produto
+                    WHERE v.data_hora >= ? AND v.data_hora < ?
+                    GROUP BY p.id_categoria
+                ) r
+                LEFT JOIN categorias c ON c.id_categoria = r.id_categoria
+                ORDER BY r.receita DESC, r.id_categoria
+            """, (start_str, end_str)).fetchall()
+    except sqlite3.Error as e:
+        print(f'Erro ao agregar vendas por categoria: {e}')
+        return []
+
+
 if __name__ == '__main__':
     # --- STEP 0: ENSURE A CLEAN DATABASE FOR THE TEST ---
     if os.path.exists(DB_FILE):
@@ -654,18 +2412,20 @@ if __name__ == '__main__':
 
     # --- STEP 3: PRODUCT TESTS ---
     print("\n--- Testing: add_product, list_products, and filters ---")
-    product1 = {'nome_produto': 'Brinco de Prata', 'preco': 35.50, 'quantidade_estoque': 50, 'id_categoria': 1}
-    product2 = {'nome_produto': 'Colar de Perolas', 'preco': 80.00, 'quantidade_estoque': 30, 'id_categoria': 2}
-    product3 = {'nome_produto': 'Tiara de Festa', 'preco': 22.00, 'quantidade_estoque': 15, 'id_categoria': 3}
+    product1 = {'nome_produto': 'Brinco de Prata', 'preco': 3550, 'quantidade_estoque': 50, 'id_categoria': 1}
+    product2 = {'nome_produto': 'Colar de Perolas', 'preco': 8000, 'quantidade_estoque': 30, 'id_categoria': 2}
+    product3 = {'nome_produto': 'Tiara de Festa', 'preco': 2200, 'quantidade_estoque': 15, 'id_categoria': 3}
     add_product(product1)
     add_product(product2)
     add_product(product3)
+    print("Adding a product with a price in reais instead of cents (expected failure):")
+    print(f"  -> Inserted? {add_product({'nome_produto': 'Tiara Float', 'preco': 35.5, 'quantidade_estoque': 10, 'id_categoria': 3})}")
     
     print("\nListing all products (with JOIN):")
     product_list = list_products()
     if product_list:
         for product in product_list:
-            print(f"  - ID: {product['id_produto']}, Name: {product['nome_produto']}, Price: R${product['preco']:.2f}, Stock: {product['quantidade_estoque']}, Category: {product['nome_categoria']}")
+            print(f"  - ID: {product['id_produto']}, Name: {product['nome_produto']}, Price: R${product['preco'] / 100:.2f}, Stock: {product['quantidade_estoque']}, Category: {product['nome_categoria']}")
 
     # --- STEP 4: STOCK UPDATE TEST ---
     print("\n--- Testing: update_product_stock ---")
@@ -683,7 +2443,7 @@ if __name__ == '__main__':
         items = list_items_by_sale(new_sale_id)
         if items:
             for item in items:
-                print(f"  - Product: {item['nome_produto']}, Qty: {item['quantidade']}, Unit Price: R${item['preco_unitario']:.2f}")
+                print(f"  - Product: {item['nome_produto']}, Qty: {item['quantidade']}, Unit Price: R${item['preco_unitario'] / 100:.2f}")
     else:
         print("-> Failed to register sale.")
 
@@ -711,13 +2471,13 @@ if __name__ == '__main__':
 
     # --- STEP 9: 'SUPER-FUNCTION' UPDATE_PRODUCT TEST ---
     print("\n--- Testing: the super-function update_product ---")
-    update_product(1, ADMIN_PASSWORD, new_name="Brinco de Prata Esterlina", new_price=39.99)
+    update_product(1, ADMIN_PASSWORD, new_name="Brinco de Prata Esterlina", new_price=3999)
     
     print("\n--- Final Verification ---")
     print("Final state of products after all updates:")
     final_product_list = list_products()
     if final_product_list:
         for product in final_product_list:
-            print(f"  - ID: {product['id_produto']}, Name: {product['nome_produto']}, Price: R${product['preco']:.2f}, Stock: {product['quantidade_estoque']}, Category: {product['nome_categoria']}")
+            print(f"  - ID: {product['id_produto']}, Name: {product['nome_produto']}, Price: R${product['preco'] / 100:.2f}, Stock: {product['quantidade_estoque']}, Category: {product['nome_categoria']}")
 
     print("\n--- ALL TESTS COMPLETED ---")
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Importação de catálogos de produtos a partir de arquivos CSV, JSONL ou texto
+(uma linha 'nome-preco-categoria-quantidade' por produto, o formato de Product.from_string).
+
+O arquivo é lido em streaming e gravado em lotes, então a memória usada não depende do
+tamanho do arquivo. Uso:
+    python3 importer.py catalogo.csv [update|skip|fail]
+"""
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+import repository
+from models import Product
+
+# Produtos gravados por transação durante a importação
+IMPORT_BATCH_SIZE = 5000
+
+# Quantos exemplos de linhas recusadas o relatório guarda (o total é sempre contado)
+MAX_REJECTED_SAMPLES = 100
+
+
+def _parse_record(record):
+    # Registro com as colunas nome_produto, preco, nome_categoria e quantidade_estoque
+    product = Product(
+        name=record['nome_produto'].strip(),
+        price=Product.parse_currency(record['preco']),
+        category=None,
+        stock_quantity=int(record['quantidade_estoque'])
+    )
+    return product, record['nome_categoria'].strip()
+
+
+def _parse_json_line(line):
+    return _parse_record(json.loads(line))
+
+
+def _parse_text_line(line):
+    product = Product.from_string(line)
+    return product, product.category.name.strip()
+
+
+def _read_csv(file):
+    return enumerate(csv.DictReader(file), start=2)
+
+
+def _read_lines(file):
+    return ((line_number, line) for line_number, line in enumerate(file, start=1) if line.strip())
+
+
+# Para cada extensão: como ler o arquivo em streaming e como transformar cada registro
+_FORMATS = {
+    '.csv': (_read_csv, _parse_record),
+    '.jsonl': (_read_lines, _parse_json_line),
+    '.txt': (_read_lines, _parse_text_line),
+}
+
+
+def import_catalog(path, on_conflict='update', batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa um arquivo de catálogo (CSV, JSONL ou texto) para o banco.
+
+    As categorias são resolvidas pelo nome com um cache em memória (cada nome é buscado uma
+    única vez) e as que não existem são criadas em lote. Cada lote de produtos é gravado em
+    uma única transação via repository.upsert_products.
+
+    Args:
+        path (str): O caminho do arquivo (.csv, .jsonl ou .txt).
+        on_conflict (str, optional): O que fazer com produtos já existentes: 'update', 'skip'
+            ou 'fail' (no modo 'fail', a importação para no primeiro lote com problema, seja
+            conflito, linha inválida ou categoria inválida, sem gravar nada desse lote nem
+            criar as suas categorias; os lotes anteriores continuam gravados). Defaults to 'update'.
+        batch_size (int, optional): Produtos por transação. Defaults to IMPORT_BATCH_SIZE.
+
+    Returns:
+        dict: O relatório com 'rows', 'inserted', 'updated', 'rejected' (totais),
+            'rejected_samples', 'categories_created', 'seconds' e 'rows_per_second'.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS:
+        raise ValueError(f'Formato de arquivo não suportado: {extension}')
+    read, parse = _FORMATS[extension]
+
+    report = {'rows': 0, 'inserted': 0, 'updated': 0, 'rejected': 0,
+              'rejected_samples': [], 'categories_created': 0}
+    categories = {category.name: category for category in repository.get_all_categories()}
+
+    def reject(line_number, reason):
+        report['rejected'] += 1
+        if len(report['rejected_samples']) < MAX_REJECTED_SAMPLES:
+            report['rejected_samples'].append((line_number, reason))
+
+    started = time.perf_counter()
+    with open(path, newline='', encoding='utf-8') as file:
+        records = read(file)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            report['rows'] += len(batch)
+
+            rejected_before = report['rejected']
+            parsed = []
+            for line_number, record in batch:
+                try:
+                    product, category_name = parse(record)
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    reject(line_number, f'linha_invalida: {e}')
+                    continue
+                if not category_name:
+                    reject(line_number, 'categoria_invalida')
+                    continue
+                parsed.append((line_number, product, category_name))
+            # No modo 'fail', um lote com qualquer linha recusada não grava nada (nem categorias)
+            if on_conflict == 'fail' and report['rejected'] > rejected_before:
+                break
+
+            missing_categories = {category_name for _, _, category_name in parsed
+                                  if category_name not in categories}
+            if missing_categories:
+                created = repository.ensure_categories(missing_categories)
+                report['categories_created'] += len(created)
+                categories.update(created)
+
+            products = []
+            line_by_name = {}
+            for line_number, product, category_name in parsed:
+                product.category = categories.get(category_name)
+                if product.category is None:
+                    reject(line_number, 'categoria_invalida')
+                    continue
+                products.append(product)
+                line_by_name[product.name] = line_number
+            if on_conflict == 'fail' and report['rejected'] > rejected_before:
+                break
+
+            result = repository.upsert_products(products, on_conflict=on_conflict, chunk_size=batch_size)
+            if not result:
+                reject(batch[0][0], 'erro_no_banco')
+                break
+            for product_name, reason in result['rejected']:
+                reject(line_by_name.get(product_name), reason)
+            if not result['applied']:
+                break
+            report['inserted'] += len(result['inserted'])
+            report['updated'] += len(result['updated'])
+
+    report['seconds'] = time.perf_counter() - started
+    report['rows_per_second'] = report['rows'] / report['seconds'] if report['seconds'] else 0.0
+    return report
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    repository.db.create_tables()
+    import_report = import_catalog(sys.argv[1], on_conflict=sys.argv[2] if len(sys.argv) > 2 else 'update')
+    print(f"Linhas lidas: {import_report['rows']} ({import_report['rows_per_second']:,.0f} linhas/s)")
+    print(f"Inseridos: {import_report['inserted']}, atualizados: {import_report['updated']}, "
+          f"recusados: {import_report['rejected']}, categorias criadas: {import_report['categories_created']}")
+    for line_number, reason in import_report['rejected_samples'][:10]:
+        print(f"  - linha {line_number}: {reason}")
@@ -1,10 +1,11 @@
 from datetime import datetime
 from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
 class InsufficientStockError(Exception):
     pass
 
-@dataclass
+@dataclass(slots=True)
 class Category:
     name: str
     id: int = None
@@ -17,18 +18,22 @@ class Category:
 
 class Product:
     """ Representa um item específico e vendável do estoque."""
-    def __init__(self,  name: str, price: float, category: Category, stock_quantity: int, id:int = None):
+    # __slots__ evita um dicionário por instância: catálogos grandes ocupam bem menos memória
+    __slots__ = ('name', '_price', '_stock_quantity', 'category', 'id')
+
+    def __init__(self,  name: str, price: int, category: Category, stock_quantity: int, id:int = None):
         """
         Construtor da classe Produto.
 
         Args:
             nome (str): O nome descritivo do produto.
-            preco (float): O preço de venda do produto.
+            preco (int): O preço de venda do produto, em centavos (R$35,50 = 3550).
             categoria (Categoria): O objeto da categoria à qual o produto pertence.
             quantidade_estoque (int): A quantidade inicial de unidades em estoque.
         """
         self.name = name
-        self._price = price
+        # Passa pelo setter: o preço precisa ser um número inteiro de centavos
+        self.price = price
         self._stock_quantity = stock_quantity
         self.category = category
         self.id = id
@@ -41,23 +46,51 @@ class Product:
         
     def __str__(self):
         # Dentro do método __str__
-        return f"{self.name} [Estoque: {self.stock_quantity}] - R$ {self.price:.2f}"
+        return f"{self.name} [Estoque: {self.stock_quantity}] - {self.format_currency(self.price)}"
     
     def __repr__(self):
         return f"Product(name='{self.name}', price={self.price}, category={self.category!r}, stock_quantity={self.stock_quantity})"
     
     @classmethod
     def from_string(cls, text):
-        product_parts = text.split('-')
-        name = product_parts[0]
-        price = float(product_parts[1])
-        category = Category(product_parts[2])
-        quantity = int(product_parts[3])
+        # Separa a partir da direita: nomes com hífen ("Brinco Meia-Lua") continuam inteiros
+        name, price, category_name, quantity = text.strip().rsplit('-', 3)
+        price = cls.parse_currency(price)
+        category = Category(category_name)
+        quantity = int(quantity)
         return cls(name, price, category, quantity)
     
     @staticmethod
     def format_currency(value): #formatar moeda 
-        return f'R${value:.2f}'
+        # Recebe centavos inteiros; a conversão para reais acontece só na exibição
+        sign = '-' if value < 0 else ''
+        reais, cents = divmod(abs(value), 100)
+        return f'{sign}R${reais}.{cents:02d}'
+
+    @staticmethod
+    def parse_currency(value):
+        """
+        Converte um valor em reais digitado ou lido de um arquivo ('35.50', '35,50', 35.5)
+        em centavos inteiros, arredondando meio centavo para cima.
+
+        Args:
+            value (str, int, float or Decimal): O valor em reais.
+
+        Returns:
+            int: O valor em centavos.
+
+        Raises:
+            ValueError: Se o valor não for um número.
+        """
+        if isinstance(value, str):
+            value = value.strip().replace(',', '.')
+        try:
+            amount = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f'Invalid currency value: {value!r}') from None
+        if not amount.is_finite():
+            raise ValueError(f'Invalid currency value: {value!r}')
+        return int((amount * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
     
     @property
     def price(self):
@@ -65,6 +98,8 @@ class Product:
 
     @price.setter
     def price(self, new_price):
+        if not isinstance(new_price, int):
+            raise TypeError('Price must be an integer number of cents!')
         if new_price >= 0:
             self._price = new_price
         else:
@@ -81,15 +116,20 @@ class Product:
         else:
             raise ValueError('Invalid stock quantity!')
 
-@dataclass
+@dataclass(slots=True)
 class SaleItem:
     """Representa uma linha de item dentro de uma Venda completa."""
     product: Product
     quantity: int
-    subtotal: float = field(init=False)
+    unit_price: int = None
+    subtotal: int = field(init=False)
 
     def __post_init__(self):
-        self.subtotal = self.product.price * self.quantity
+        # Itens novos usam o preço atual do produto; itens de vendas já gravadas recebem
+        # o preco_unitario histórico, que não muda quando o preço do produto é alterado
+        if self.unit_price is None:
+            self.unit_price = self.product.price
+        self.subtotal = self.unit_price * self.quantity
 
 
 
@@ -97,7 +137,9 @@ class SaleItem:
 
 class Sale:
     """Representa uma transação completa, contendo um ou mais itens."""
-    def __init__(self, id=None, date_hour=None, total_value=0.0):
+    __slots__ = ('id', 'date_hour', '_items_by_product', 'total_value')
+
+    def __init__(self, id=None, date_hour=None, total_value=0):
         """
         Construtor da classe Venda.
         Pode criar uma venda nova ou representar uma existente do banco.
@@ -105,34 +147,108 @@ class Sale:
         self.id = id
         # Se nenhuma data for passada, usa a data atual. Senão, usa a data do banco.
         self.date_hour = date_hour if date_hour is not None else datetime.now()
-        self.items = []
+        # Itens indexados pelo produto; o dicionário mantém a ordem em que as linhas entraram,
+        # então encontrar, alterar e remover uma linha não percorre os outros itens
+        self._items_by_product = {}
         self.total_value = total_value
 
+    @property
+    def items(self):
+        """
+        Os itens da venda, na ordem em que foram adicionados. É somente leitura: use add_item,
+        attach_item, set_item_quantity e remove_item para alterar a venda (sale.items.append
+        levanta AttributeError em vez de ser ignorado).
+
+        Returns:
+            tuple[SaleItem]: Os itens da venda.
+        """
+        return tuple(self._items_by_product.values())
+
+    @staticmethod
+    def _product_key(product):
+        # Produtos ainda não salvos (sem id) são identificados pelo próprio objeto
+        return product.id if product.id is not None else id(product)
+
     def add_item(self, product: Product, quantity: int):
         """
         Adiciona um novo item (Produto e quantidade) à lista da venda.
+        Se o produto já estiver na venda, a quantidade é somada à linha existente,
+        já que cada produto só pode aparecer uma vez em itens_da_venda.
         
         Args:
             produto (Produto): O objeto do produto a ser adicionado.
             quantidade (int): A quantidade de unidades a ser adicionada.
         """
+        existing_item = self._items_by_product.get(self._product_key(product))
+        if existing_item is not None:
+            self.set_item_quantity(product, existing_item.quantity + quantity)
+            return
+
         # Cria um novo objeto ItemVenda para representar esta linha de transação
         new_item = SaleItem(quantity=quantity, product=product)
+        self.attach_item(new_item)
+
+        # O total é atualizado só com o subtotal do novo item, sem somar a lista inteira de novo
+        self.total_value += new_item.subtotal
+
+    def attach_item(self, sale_item: SaleItem):
+        """
+        Anexa um SaleItem já calculado sem alterar o valor total
+        (usado ao montar vendas vindas do banco, cujo total já está gravado).
+
+        Args:
+            sale_item (SaleItem): O item a ser anexado.
+        """
+        self._items_by_product[self._product_key(sale_item.product)] = sale_item
+
+    def set_item_quantity(self, product: Product, quantity: int):
+        """
+        Altera a quantidade da linha de um produto, ajustando o valor total pela diferença.
+        Uma quantidade menor ou igual a zero remove a linha.
+
+        Args:
+            product (Product): O produto cuja linha será alterada.
+            quantity (int): A nova quantidade total da linha.
+
+        Returns:
+            bool: True se o produto estava na venda, False caso contrário.
+        """
+        item = self._items_by_product.get(self._product_key(product))
+        if item is None:
+            return False
+        if quantity <= 0:
+            return self.remove_item(product)
+
+        old_subtotal = item.subtotal
+        item.quantity = quantity
+        item.subtotal = item.unit_price * quantity
+        self.total_value += item.subtotal - old_subtotal
+        return True
+
+    def remove_item(self, product: Product):
+        """
+        Remove a linha de um produto da venda e desconta seu subtotal do valor total.
 
-        # Adiciona o novo item à lista 'itens' da venda
-        self.items.append(new_item)
+        Args:
+            product (Product): O produto a ser removido.
 
-        # Sempre que um novo item é adicionado, o valor total da venda é recalculado
-        self.update_total_value()
+        Returns:
+            bool: True se o produto estava na venda, False caso contrário.
+        """
+        item = self._items_by_product.pop(self._product_key(product), None)
+        if item is None:
+            return False
+        self.total_value -= item.subtotal
+        return True
 
     def update_total_value(self):
         """
         Soma os subtotais de todos os itens na lista para obter o valor total da venda.
-        Este método é chamado internamente sempre que um item é adicionado.
+        O total já é mantido a cada alteração; este método recalcula tudo do zero.
         """
-        total = 0.0
-        # Itera sobre cada objeto 'ItemVenda' na lista 'self.itens'
-        for item in self.items:
+        total = 0
+        # Itera sobre cada objeto 'ItemVenda' da venda
+        for item in self._items_by_product.values():
             # Soma o subtotal de cada item à variável 'total'
             total += item.subtotal
 
@@ -140,13 +256,42 @@ class Sale:
         self.total_value = total
 
     def finish_sale(self):
-            for item in self.items:
+            for item in self._items_by_product.values():
                 try:
                     item.product.remove_from_stock(item.quantity)
                 except InsufficientStockError:
                     print('Erro de estoque! Estoque insuficiente!')
 
 
+@dataclass(slots=True)
+class CashRegister:
+    """Representa uma sessão de caixa, da abertura ao fechamento (valores em centavos)."""
+    opening_amount: int
+    operator: str = None
+    id: int = None
+    opened_at: str = None
+    closed_at: str = None
+    sales_count: int = 0
+    sales_total: int = 0
+    counted_amount: int = None
+
+    @property
+    def is_open(self):
+        return self.closed_at is None
+
+    @property
+    def expected_amount(self):
+        """O dinheiro que deveria estar na gaveta: troco inicial + vendas do caixa."""
+        return self.opening_amount + self.sales_total
+
+    @property
+    def difference(self):
+        """Contado - esperado (negativo = falta), ou None enquanto o caixa não for fechado."""
+        if self.counted_amount is None:
+            return None
+        return self.counted_amount - self.expected_amount
+
+
 class Stock:
     def __init__(self):
         self.products_by_category = {}
@@ -0,0 +1,252 @@
+"""
+Relatórios de vendas com a agregação feita pelo próprio SQLite (SUM, COUNT e GROUP BY),
+sem carregar vendas em Python.
+
+Intervalos de dias inteiros são lidos dos resumos pré-agregados mantidos por register_sale
+e delete_sale; intervalos com hora (ou o agrupamento por hora do dia) são somados direto
+em vendas e itens_da_venda. Nos resumos, a venda conta na categoria que o produto tinha
+no momento da venda; na soma direta, na categoria atual.
+"""
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+import database as db
+from models import Product
+
+# Uma linha de relatório: chave do grupo (dia, hora, id do produto...), rótulo legível,
+# quantidade de vendas, unidades vendidas e receita (em centavos)
+ReportRow = namedtuple('ReportRow', ['key', 'label', 'tickets', 'units', 'revenue'])
+
+# Agrupamentos por tempo aceitos por sales_by_period
+PERIODS = ('day', 'week', 'month')
+
+# Quantos produtos mais vendidos (por receita) entram nos relatórios de período
+REPORT_TOP_PRODUCTS = 20
+
+
+def _summary_days(start, end):
+    # (dia inicial, dia final) quando os dois limites caem à meia-noite, senão None
+    days = []
+    for value in (start, end):
+        if isinstance(value, datetime):
+            if value.time() != time(0):
+                return None
+            value = value.date()
+        value = db.to_db_datetime(value)
+        if len(value) == 19 and value.endswith(' 00:00:00'):
+            value = value[:10]
+        if len(value) != 10:
+            return None
+        days.append(value)
+    return tuple(days)
+
+
+def _time_rows(raw_rows):
+    return [ReportRow(raw_row[0], str(raw_row[0]), raw_row[1], raw_row[2], raw_row[3]) for raw_row in raw_rows]
+
+
+def _named_rows(raw_rows):
+    return [ReportRow(*raw_row) for raw_row in raw_rows]
+
+
+def sales_totals(start, end):
+    """
+    Totais de vendas do intervalo semiaberto [start, end).
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+
+    Returns:
+        ReportRow: Uma linha com key e label None e os totais do intervalo.
+    """
+    days = _summary_days(start, end)
+    if days:
+        rows = db.summarize_sales(*days, period='day')
+        return ReportRow(None, None, sum(row['quantidade_vendas'] for row in rows),
+                         sum(row['unidades'] for row in rows), sum(row['receita'] for row in rows))
+    rows = db.aggregate_sales_by_time(db.to_db_datetime(start), db.to_db_datetime(end), group=None)
+    if not rows:
+        return ReportRow(None, None, 0, 0, 0)
+    _, tickets, units, revenue = rows[0]
+    return ReportRow(None, None, tickets, units, revenue)
+
+
+def sales_by_period(start, end, period='day'):
+    """
+    Vendas do intervalo semiaberto [start, end) agrupadas por dia, semana ou mês.
+    Períodos sem vendas não aparecem.
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+        period (str, optional): 'day' ('YYYY-MM-DD'), 'week' (a segunda-feira da semana)
+            ou 'month' ('YYYY-MM'). Defaults to 'day'.
+
+    Returns:
+        list[ReportRow]: Uma linha por período, em ordem cronológica.
+    """
+    if period not in PERIODS:
+        raise ValueError(f'Período desconhecido: {period}')
+    days = _summary_days(start, end)
+    if days:
+        return _time_rows(db.summarize_sales(*days, period=period))
+    return _time_rows(db.aggregate_sales_by_time(db.to_db_datetime(start), db.to_db_datetime(end), group=period))
+
+
+def sales_by_hour(start, end):
+    """
+    Vendas do intervalo semiaberto [start, end) agrupadas pela hora do dia (0 a 23),
+    somando todos os dias do intervalo. Horas sem vendas não aparecem.
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+
+    Returns:
+        list[ReportRow]: Uma linha por hora (key = hora, label = 'HHh'), em ordem de hora.
+    """
+    raw_rows = db.aggregate_sales_by_time(db.to_db_datetime(start), db.to_db_datetime(end), group='hour')
+    return [ReportRow(hour, f'{hour:02d}h', tickets, units, revenue) for hour, tickets, units, revenue in raw_rows]
+
+
+def sales_by_product(start, end, limit=None):
+    """
+    Vendas do intervalo semiaberto [start, end) por produto.
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+        limit (int, optional): Quantos produtos retornar (os de maior receita). Defaults to todos.
+
+    Returns:
+        list[ReportRow]: Uma linha por produto (key = id_produto, label = nome),
+            da maior receita para a menor.
+    """
+    days = _summary_days(start, end)
+    if days:
+        return _named_rows(db.summarize_sales_by_product(*days, limit=limit))
+    return _named_rows(db.aggregate_sales_by_product(db.to_db_datetime(start), db.to_db_datetime(end), limit=limit))
+
+
+def sales_by_category(start, end):
+    """
+    Vendas do intervalo semiaberto [start, end) por categoria.
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+
+    Returns:
+        list[ReportRow]: Uma linha por categoria (key = id_categoria, label = nome),
+            da maior receita para a menor.
+    """
+    days = _summary_days(start, end)
+    if days:
+        return _named_rows(db.summarize_sales_by_category(*days))
+    return _named_rows(db.aggregate_sales_by_category(db.to_db_datetime(start), db.to_db_datetime(end)))
+
+
+def _to_db_day(value):
+    # Os resumos são indexados pelo dia 'YYYY-MM-DD'
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value[:10]
+
+
+def period_report(start, end, period='day', product_limit=REPORT_TOP_PRODUCTS):
+    """
+    Monta um relatório de vendas para os dias do intervalo semiaberto [start, end), lendo
+    apenas os resumos pré-agregados (o custo não depende do tamanho do histórico de vendas).
+
+    Args:
+        start (date, datetime or str): O primeiro dia (incluído).
+        end (date, datetime or str): O dia final (não incluído).
+        period (str, optional): Como agrupar 'periodos': 'day', 'week' ou 'month'. Defaults to 'day'.
+        product_limit (int, optional): Quantos produtos (os de maior receita) entram em 'produtos';
+            None para todos. Defaults to REPORT_TOP_PRODUCTS.
+
+    Returns:
+        dict: 'inicio', 'fim', 'totais' (quantidade_vendas, unidades, receita em centavos) e as listas
+            'periodos', 'produtos' e 'categorias', com uma linha (dict) por grupo.
+    """
+    start_day, end_day = _to_db_day(start), _to_db_day(end)
+    periods = [dict(row) for row in db.summarize_sales(start_day, end_day, period)]
+    return {
+        'inicio': start_day,
+        'fim': end_day,
+        'totais': {
+            'quantidade_vendas': sum(row['quantidade_vendas'] for row in periods),
+            'unidades': sum(row['unidades'] for row in periods),
+            'receita': sum(row['receita'] for row in periods),
+        },
+        'periodos': periods,
+        'produtos': [dict(row) for row in db.summarize_sales_by_product(start_day, end_day, product_limit)],
+        'categorias': [dict(row) for row in db.summarize_sales_by_category(start_day, end_day)],
+    }
+
+
+def daily_report(day=None):
+    """
+    Relatório de vendas de um dia.
+
+    Args:
+        day (date, datetime or str, optional): O dia do relatório. Defaults to hoje.
+
+    Returns:
+        dict: O relatório, no formato de period_report.
+    """
+    day = date.fromisoformat(_to_db_day(day or date.today()))
+    return period_report(day, day + timedelta(days=1), period='day')
+
+
+def weekly_report(day=None):
+    """
+    Relatório de vendas da semana (segunda a domingo) que contém o dia informado,
+    com 'periodos' dia a dia.
+
+    Args:
+        day (date, datetime or str, optional): Um dia qualquer da semana. Defaults to hoje.
+
+    Returns:
+        dict: O relatório, no formato de period_report.
+    """
+    day = date.fromisoformat(_to_db_day(day or date.today()))
+    monday = day - timedelta(days=day.weekday())
+    return period_report(monday, monday + timedelta(days=7), period='day')
+
+
+def monthly_report(year=None, month=None):
+    """
+    Relatório de vendas de um mês, com 'periodos' dia a dia.
+
+    Args:
+        year (int, optional): O ano. Defaults to o ano atual.
+        month (int, optional): O mês (1 a 12). Defaults to o mês atual.
+
+    Returns:
+        dict: O relatório, no formato de period_report.
+    """
+    today = date.today()
+    first_day = date(year or today.year, month or today.month, 1)
+    next_month = date(first_day.year + first_day.month // 12, first_day.month % 12 + 1, 1)
+    return period_report(first_day, next_month, period='day')
+
+
+if __name__ == '__main__':
+    # Relatório de hoje no banco atual (rode antes o repository.py para ter dados de exemplo)
+    today = date.today()
+    tomorrow = date.fromordinal(today.toordinal() + 1)
+    db.create_tables()
+    print(f'--- Vendas de {today.isoformat()} ---')
+    print(f'Totais: {sales_totals(today, tomorrow)}')
+    for row in sales_by_category(today, tomorrow):
+        print(f'  - {row.label}: {row.tickets} venda(s), {row.units} unidade(s), {Product.format_currency(row.revenue)}')
+    print('Por hora:')
+    for row in sales_by_hour(today, tomorrow):
+        print(f'  - {row.label}: {row.tickets} venda(s), {Product.format_currency(row.revenue)}')
+    print('Produtos mais vendidos:')
+    for row in sales_by_product(today, tomorrow, limit=5):
+        print(f'  - {row.label}: {row.units} unidade(s), {Product.format_currency(row.revenue)}')
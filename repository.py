@@ -1,8 +1,172 @@
-from models import Category, Product, Sale, SaleItem
+from models import CashRegister, Category, Product, Sale, SaleItem
 import database as db 
+import reports
+from catalog import CatalogSnapshot
 from database import ADMIN_PASSWORD
 import os
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+# Configuração do cache de leitura de produtos e categorias
+CACHE_MAX_SIZE = 4096
+CACHE_TTL_SECONDS = 60.0
+
+
+class LRUCache:
+    """
+    Cache em memória com tamanho máximo, descarte do item menos usado (LRU) e tempo de vida (TTL).
+    Guarda as linhas brutas do banco (imutáveis); os objetos de modelo são montados a cada leitura.
+    """
+    def __init__(self, max_size=CACHE_MAX_SIZE, ttl=CACHE_TTL_SECONDS):
+        """
+        Construtor do cache.
+
+        Args:
+            max_size (int): A quantidade máxima de entradas guardadas.
+            ttl (float): Segundos que uma entrada continua válida depois de gravada.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Retorna o valor guardado para a chave, ou None se não existir ou tiver expirado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Remove todas as entradas cujo valor satisfaz predicate(valor).
+        """
+        with self._lock:
+            stale_keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in stale_keys:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Os contadores 'hits' e 'misses', o tamanho atual e o tamanho máximo.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'max_size': self.max_size}
+
+
+_product_cache = LRUCache()
+_category_cache = LRUCache()
+
+
+def _find_product_row(product_id):
+    # Leitura com cache: só vai ao banco se o produto não estiver no cache (ou tiver expirado)
+    raw_product = _product_cache.get(product_id)
+    if raw_product is None:
+        raw_product = db.find_product_by_id(product_id)
+        if raw_product is not None:
+            _product_cache.set(product_id, raw_product)
+    return raw_product
+
+def _find_category_row(category_id):
+    raw_category = _category_cache.get(category_id)
+    if raw_category is None:
+        raw_category = db.find_category_by_id(category_id)
+        if raw_category is not None:
+            _category_cache.set(category_id, raw_category)
+    return raw_category
+
+def _invalidate_products(product_ids):
+    for product_id in product_ids:
+        _product_cache.invalidate(product_id)
+
+def _invalidate_category(category_id):
+    # Os produtos em cache também guardam o nome da categoria
+    _category_cache.invalidate(category_id)
+    _product_cache.invalidate_where(lambda raw_product: raw_product['id_categoria'] == category_id)
+
+def cache_stats():
+    """
+    Retorna os contadores de acertos e falhas dos caches de produtos e categorias.
+
+    Returns:
+        dict: {'products': {...}, 'categories': {...}} com hits, misses, size e max_size.
+    """
+    return {'products': _product_cache.stats(), 'categories': _category_cache.stats()}
+
+def clear_caches():
+    """
+    Esvazia os caches de produtos e categorias (por exemplo, depois de alterar o banco por fora do repositório).
+    """
+    _product_cache.clear()
+    _category_cache.clear()
+
+# Funções avisadas depois que o repositório adiciona, renomeia, altera ou remove produtos
+_product_listeners = []
+
+def add_product_listener(listener):
+    """
+    Registra uma função chamada como listener(id_produto) depois de cada produto adicionado,
+    alterado ou removido pelo repositório (por exemplo, para manter um índice em memória).
+    O listener relê o produto com get_product_by_id, que retorna None se ele foi removido.
+    As gravações em lote (add_multiples_products, upsert_products e, por elas, a importação
+    de catálogos) avisam uma vez cada produto afetado, ao final da gravação.
+    Mudanças só de estoque (vendas, entradas de mercadoria, update_product_stock) e os
+    reajustes de preço não são avisados.
+
+    Args:
+        listener (callable): A função a ser chamada com o ID do produto.
+    """
+    _product_listeners.append(listener)
+
+def remove_product_listener(listener):
+    """
+    Remove uma função registrada com add_product_listener (não faz nada se ela não estiver registrada).
+    """
+    if listener in _product_listeners:
+        _product_listeners.remove(listener)
+
+def _notify_product_changed(product_id):
+    for listener in list(_product_listeners):
+        try:
+            listener(product_id)
+        except Exception as e:
+            print(f'Erro ao avisar a alteração do produto {product_id}: {e}')
+
+def _notify_products_changed_by_name(product_names):
+    # Gravações em lote conhecem só os nomes: os IDs são buscados apenas se houver listeners
+    if not _product_listeners:
+        return
+    for product_id in db.find_product_ids_by_names(product_names).values():
+        _notify_product_changed(product_id)
 
 def add_category(category_object):
     """
@@ -18,6 +182,25 @@ def add_category(category_object):
     success = db.add_category(category_name)
     return success
 
+def ensure_categories(category_names):
+    """
+    Busca as categorias pelo nome, criando de uma só vez as que ainda não existem.
+
+    Args:
+        category_names (iterable[str]): Os nomes das categorias.
+
+    Returns:
+        dict[str, Category]: Um objeto Category (com id) para cada nome, ou um dicionário
+            vazio em caso de erro.
+    """
+    category_ids = db.add_categories(category_names)
+    if not category_ids:
+        return {}
+    return {
+        category_name: Category(id=category_id, name=category_name)
+        for category_name, category_id in category_ids.items()
+    }
+
 def get_all_categories():
     """
     Busca todos os dados brutos de categorias no banco e os transforma em uma lista de objetos Category.
@@ -36,6 +219,22 @@ def get_all_categories():
         category_objects.append(new_category)
     return category_objects
 
+def iter_categories(batch_size=db.ITER_BATCH_SIZE):
+    """
+    Percorre todas as categorias, entregando um objeto Category por vez.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez no banco. Defaults to db.ITER_BATCH_SIZE.
+
+    Yields:
+        Category: Uma categoria por vez.
+    """
+    for raw_category in db.iter_categories(batch_size):
+        yield Category(
+            id=raw_category['id_categoria'],
+            name=raw_category['nome_categoria']
+        )
+
 def get_category_by_id(category_id):
     """
     Busca uma única categoria pelo ID e a transforma em um objeto Category.
@@ -46,7 +245,7 @@ def get_category_by_id(category_id):
     Returns:
         Category or None: O objeto Category correspondente se encontrado, senão None.
     """
-    raw_category = db.find_category_by_id(category_id)
+    raw_category = _find_category_row(category_id)
 
     if raw_category is None:
         return None
@@ -69,7 +268,9 @@ def update_category_name(category_id, new_name, provided_password):
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.update_category_name(category_id, new_name, provided_password)
+    success = db.update_category_name(category_id, new_name, provided_password)
+    _invalidate_category(category_id)
+    return success
 
 def delete_category(category_id, provided_password):
     """
@@ -82,7 +283,19 @@ def delete_category(category_id, provided_password):
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.delete_category(category_id, provided_password)
+    success = db.delete_category(category_id, provided_password)
+    _invalidate_category(category_id)
+    return success
+
+def _shared_category(categories, raw_row):
+    # Produtos da mesma categoria compartilham um único objeto Category durante a montagem
+    category_obj = categories.get(raw_row['id_categoria'])
+    if category_obj is None:
+        category_obj = categories[raw_row['id_categoria']] = Category(
+            id=raw_row['id_categoria'],
+            name=raw_row['nome_categoria']
+        )
+    return category_obj
 
 def get_all_products():
     """
@@ -90,15 +303,14 @@ def get_all_products():
 
     Returns:
         list[Product]: Uma lista de objetos Product, cada um contendo um objeto Category aninhado.
+            Produtos da mesma categoria compartilham o mesmo objeto Category.
     """
     raw_products = db.list_products()
     products_object = []
+    categories = {}
 
     for raw_product in raw_products:
-        category_obj = Category(
-            id=raw_product['id_categoria'],
-            name=raw_product['nome_categoria']
-            )
+        category_obj = _shared_category(categories, raw_product)
         product_object = Product(
             id=raw_product['id_produto'],
             name = raw_product['nome_produto'],
@@ -109,6 +321,67 @@ def get_all_products():
         products_object.append(product_object)
     return products_object
 
+def iter_products(batch_size=db.ITER_BATCH_SIZE):
+    """
+    Percorre todos os produtos, entregando um objeto Product por vez, em memória constante.
+    Ideal para exportações e relatórios sobre catálogos grandes.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez no banco. Defaults to db.ITER_BATCH_SIZE.
+
+    Yields:
+        Product: Um produto por vez, com o objeto Category aninhado.
+    """
+    categories = {}
+    for raw_product in db.iter_products(batch_size):
+        category_obj = _shared_category(categories, raw_product)
+        yield Product(
+            id=raw_product['id_produto'],
+            name = raw_product['nome_produto'],
+            price = raw_product['preco'],
+            stock_quantity = raw_product['quantidade_estoque'],
+            category = category_obj
+        )
+
+def search_products(query, limit=db.SEARCH_LIMIT):
+    """
+    Busca produtos pelo início das palavras do nome ou da categoria, sem diferenciar
+    maiúsculas nem acentos, para a busca do caixa enquanto o nome é digitado.
+    Ordenação: quem tem todas as palavras no nome vem antes de quem foi encontrado só pela
+    categoria e, em cada grupo, o nome mais curto primeiro (empates pela ordem de cadastro).
+
+    Args:
+        query (str): O texto digitado (ex: 'brin pra' encontra 'Brinco de Prata').
+        limit (int, optional): Quantos produtos retornar. Defaults to db.SEARCH_LIMIT.
+
+    Returns:
+        list[Product]: Os produtos encontrados, na ordem acima.
+    """
+    categories = {}
+    products_object = []
+    for raw_product in db.search_products(query, limit):
+        products_object.append(Product(
+            id=raw_product['id_produto'],
+            name = raw_product['nome_produto'],
+            price = raw_product['preco'],
+            stock_quantity = raw_product['quantidade_estoque'],
+            category = _shared_category(categories, raw_product)
+        ))
+    return products_object
+
+def get_catalog_snapshot(batch_size=db.ITER_BATCH_SIZE):
+    """
+    Monta uma fotografia colunar do catálogo (ids, preços, estoques e categorias em arrays)
+    a partir de uma única consulta lida em streaming.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez no banco. Defaults to db.ITER_BATCH_SIZE.
+
+    Returns:
+        CatalogSnapshot: A fotografia do catálogo, pronta para análises vetorizadas.
+    """
+    return CatalogSnapshot.from_rows(db.iter_catalog_rows(batch_size))
+
 def get_products_by_category(category_id):
     """
     Busca os produtos de uma categoria específica e os retorna como uma lista de objetos Product.
@@ -148,7 +421,7 @@ def add_product(product_object):
         product_object (Product): O objeto Product a ser adicionado.
 
     Returns:
-        bool: True se a operação for bem-sucedida, False caso contrário.
+        int or bool: O ID do novo produto se a operação for bem-sucedida, False caso contrário.
     """
     product_data_dict = {
         'nome_produto' : product_object.name,
@@ -157,8 +430,10 @@ def add_product(product_object):
         'id_categoria' : product_object.category.id
     }
     
-    success = db.add_product(product_data_dict)
-    return success
+    new_product_id = db.add_product(product_data_dict)
+    if new_product_id:
+        _notify_product_changed(new_product_id)
+    return new_product_id
 
 def get_product_by_id(product_id):
     """
@@ -170,7 +445,7 @@ def get_product_by_id(product_id):
     Returns:
         Product or None: O objeto Product correspondente se encontrado, senão None.
     """
-    raw_product = db.find_product_by_id(product_id)
+    raw_product = _find_product_row(product_id)
 
     if raw_product is None:
         return None
@@ -214,11 +489,48 @@ def add_multiples_products(product_object_list):
         success = db.add_multiple_products(product_data_list)
         #print('n\[DEPURACAO] Lista de dicionarios sendo enviada para o DB: ')
         #print(product_data_list)
+        if success:
+            _notify_products_changed_by_name(product_data['nome_produto'] for product_data in product_data_list)
         return success
     except Exception as e:
         print(f'Um erro ocorreu ao adicionar multiplos produtos: {e}')
         return False
 
+def _product_to_row(product_object):
+    return {
+        'nome_produto' : product_object.name,
+        'preco' : product_object.price,
+        'quantidade_estoque' : product_object.stock_quantity,
+        'id_categoria' : product_object.category.id
+    }
+
+def upsert_products(product_objects, on_conflict='update', chunk_size=db.UPSERT_CHUNK_SIZE):
+    """
+    Sincroniza um catálogo de objetos Product com o banco: produtos novos são inseridos e
+    nomes já existentes são atualizados, ignorados ou cancelam a importação, conforme o modo.
+    Aceita geradores: os objetos são convertidos e gravados lote a lote.
+
+    Args:
+        product_objects (iterable[Product]): Os produtos a serem importados.
+        on_conflict (str, optional): 'update', 'skip' ou 'fail'. Defaults to 'update'.
+        chunk_size (int, optional): Produtos por lote. Defaults to db.UPSERT_CHUNK_SIZE.
+
+    Returns:
+        dict or bool: {'applied', 'inserted', 'updated', 'rejected'} (veja db.upsert_products),
+            ou False em caso de erro no banco.
+    """
+    result = db.upsert_products(
+        (_product_to_row(product_object) for product_object in product_objects),
+        on_conflict=on_conflict,
+        chunk_size=chunk_size
+    )
+    if result and result['updated']:
+        updated_names = set(result['updated'])
+        _product_cache.invalidate_where(lambda raw_product: raw_product['nome_produto'] in updated_names)
+    if result and result['applied']:
+        _notify_products_changed_by_name(result['inserted'] + result['updated'])
+    return result
+
 def update_product_stock(product_id, new_quantity):
     """
     Repassa a solicitação para atualizar o estoque de um produto.
@@ -230,7 +542,26 @@ def update_product_stock(product_id, new_quantity):
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.update_product_stock(product_id, new_quantity)
+    success = db.update_product_stock(product_id, new_quantity)
+    _invalidate_products([product_id])
+    return success
+
+def receive_goods(stock_deltas):
+    """
+    Registra o recebimento de mercadorias de um fornecedor: soma (ou subtrai) a quantidade
+    de cada linha ao estoque atual, para muitos produtos de uma só vez.
+
+    Args:
+        stock_deltas (iterable): Tuplas (id_produto, quantidade) com a variação de cada linha.
+
+    Returns:
+        dict or bool: O resultado de db.receive_stock ({'applied': bool, 'lines': [...]}),
+            ou False em caso de erro no banco.
+    """
+    result = db.receive_stock(stock_deltas)
+    if result and result['applied']:
+        _invalidate_products({line['id_produto'] for line in result['lines']})
+    return result
 
 def update_product(product_id, provided_password, new_name=None, new_price=None):
     """
@@ -240,12 +571,43 @@ def update_product(product_id, provided_password, new_name=None, new_price=None)
         product_id (int): O ID do produto.
         provided_password (str): A senha de administrador.
         new_name (str, optional): O novo nome. Defaults to None.
-        new_price (float, optional): O novo preço. Defaults to None.
+        new_price (int, optional): O novo preço, em centavos. Defaults to None.
 
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.update_product(product_id, provided_password, new_name, new_price)
+    success = db.update_product(product_id, provided_password, new_name, new_price)
+    _invalidate_products([product_id])
+    if success:
+        _notify_product_changed(product_id)
+    return success
+
+def reprice_products(provided_password, category_id=None, product_ids=None, percent=None, delta=None, price_map=None):
+    """
+    Repassa um reajuste de preços em lote (percentual, valor absoluto ou mapa de preços)
+    para a camada de banco de dados e invalida o cache apenas dos produtos afetados.
+
+    Args:
+        provided_password (str): A senha de administrador.
+        category_id (int, optional): Reajusta todos os produtos desta categoria.
+        product_ids (list[int], optional): Reajusta apenas estes produtos.
+        percent (float, optional): O percentual de reajuste (ex.: 8 para +8%).
+        delta (int, optional): O valor em centavos a ser somado ao preço.
+        price_map (dict, optional): Os novos preços em centavos por ID de produto.
+
+    Returns:
+        int or bool: A quantidade de produtos cujo preço mudou, ou False em caso de erro.
+    """
+    if product_ids is not None:
+        product_ids = list(product_ids)
+    changed_rows = db.reprice_products(provided_password, category_id, product_ids, percent, delta, price_map)
+    if price_map is not None:
+        _invalidate_products(price_map)
+    elif product_ids is not None:
+        _invalidate_products(product_ids)
+    elif category_id is not None:
+        _product_cache.invalidate_where(lambda raw_product: raw_product['id_categoria'] == category_id)
+    return changed_rows
 
 def delete_product(product_id, provided_password):
     """
@@ -258,15 +620,20 @@ def delete_product(product_id, provided_password):
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.delete_product(product_id, provided_password)
+    success = db.delete_product(product_id, provided_password)
+    _invalidate_products([product_id])
+    if success:
+        _notify_product_changed(product_id)
+    return success
 
-def register_sale(sale_object):
+def register_sale(sale_object, register_id=None):
     """
     Recebe um objeto Sale, o 'desmonta' no formato esperado pela camada de banco de dados
     e repassa a solicitação para registrar a venda.
 
     Args:
         sale_object (Sale): O objeto Sale completo a ser registrado.
+        register_id (int, optional): O caixa aberto que fez a venda. Defaults to None.
 
     Returns:
         int or bool: O ID da nova venda em caso de sucesso, senão False.
@@ -278,12 +645,43 @@ def register_sale(sale_object):
             quantity_product = item_obj.quantity
             tuple_items = (id_product, quantity_product)
             items_for_db.append(tuple_items)
-        new_sale_id = db.register_sale(items_for_db)
+        new_sale_id = db.register_sale(items_for_db, register_id=register_id)
+        _invalidate_products(id_product for id_product, _ in items_for_db)
         return new_sale_id
     except Exception as e:
         print(f'Erro ao resgistrar vendas: {e}')
         return False
 
+def register_sales(sales):
+    """
+    Registra várias vendas em uma única transação (veja db.register_sales); uma venda
+    recusada não impede as outras.
+
+    Args:
+        sales (list): Uma lista de tuplas (Sale, id_caixa), onde id_caixa pode ser None.
+
+    Returns:
+        list: Para cada venda, na mesma ordem, o ID da nova venda ou False.
+    """
+    sales_for_db = []
+    try:
+        for sale_object, register_id in sales:
+            items_for_db = [(item_obj.product.id, item_obj.quantity) for item_obj in sale_object.items]
+            sales_for_db.append((items_for_db, register_id))
+    except Exception as e:
+        print(f'Erro ao resgistrar vendas: {e}')
+        return [False] * len(sales)
+    results = db.register_sales(sales_for_db)
+    _invalidate_products({id_product for items_for_db, _ in sales_for_db for id_product, _ in items_for_db})
+    return results
+
+def _build_sale(raw_sale):
+    return Sale(
+        id = raw_sale['id_venda'],
+        date_hour = raw_sale['data_hora'],
+        total_value = raw_sale['valor_total']
+    )
+
 def get_all_sales():
     """
     Busca um resumo de todas as vendas e retorna uma lista de objetos Sale (sem os itens).
@@ -292,16 +690,20 @@ def get_all_sales():
         list[Sale]: Uma lista de objetos Sale simplificados.
     """
     raw_sales = db.list_sales()
-    sales = []
+    return [_build_sale(raw_sale) for raw_sale in raw_sales]
 
-    for raw_sale in raw_sales:
-        sale_obj = Sale(
-            id = raw_sale['id_venda'],
-            date_hour = raw_sale['data_hora'],
-            total_value = raw_sale['valor_total']
-        )
-        sales.append(sale_obj)
-    return sales
+def iter_sales(batch_size=db.ITER_BATCH_SIZE):
+    """
+    Percorre o resumo de todas as vendas, entregando um objeto Sale (sem os itens) por vez.
+
+    Args:
+        batch_size (int, optional): Linhas buscadas por vez no banco. Defaults to db.ITER_BATCH_SIZE.
+
+    Yields:
+        Sale: Uma venda simplificada por vez.
+    """
+    for raw_sale in db.iter_sales(batch_size):
+        yield _build_sale(raw_sale)
 
 def get_sales_by_date(date):
     """
@@ -315,22 +717,86 @@ def get_sales_by_date(date):
         list[Sale]: Uma lista de objetos Sale simplificados da data especificada.
     """
     raw_sales_date = db.list_sales_by_date(date)
-    sales_date = []
+    return [_build_sale(raw_sale) for raw_sale in raw_sales_date]
+
+def get_sales_between(start, end):
+    """
+    Busca o resumo das vendas feitas no intervalo semiaberto [start, end).
+
+    Args:
+        start (datetime, date or str): O início do intervalo (incluído).
+        end (datetime, date or str): O fim do intervalo (não incluído).
+
+    Returns:
+        list[Sale]: Uma lista de objetos Sale simplificados, em ordem cronológica.
+    """
+    raw_sales = db.list_sales_between(db.to_db_datetime(start), db.to_db_datetime(end))
+    return [_build_sale(raw_sale) for raw_sale in raw_sales]
+
+def get_sales_page(page_size=50, cursor=None, start=None, end=None):
+    """
+    Busca uma página de vendas em ordem cronológica, sem carregar a tabela inteira.
+    Para ler a página seguinte, passe de volta o cursor retornado pela chamada anterior.
+
+    Args:
+        page_size (int, optional): A quantidade máxima de vendas na página. Defaults to 50.
+        cursor (tuple, optional): O cursor devolvido pela página anterior. Defaults to None.
+        start (datetime, date or str, optional): Início do intervalo (incluído). Defaults to None.
+        end (datetime, date or str, optional): Fim do intervalo (não incluído). Defaults to None.
 
-    for raw_sale in raw_sales_date:
-        sale_obj = Sale(
-            id = raw_sale['id_venda'],
-            date_hour = raw_sale['data_hora'],
-            total_value = raw_sale['valor_total']
+    Returns:
+        tuple[list[Sale], tuple or None]: As vendas da página e o cursor da próxima página
+            (None quando não há mais vendas).
+    """
+    raw_sales = db.list_sales_page(
+        page_size,
+        after=cursor,
+        start_str=db.to_db_datetime(start) if start is not None else None,
+        end_str=db.to_db_datetime(end) if end is not None else None
+    )
+    sales = [_build_sale(raw_sale) for raw_sale in raw_sales]
+    next_cursor = None
+    if len(raw_sales) == page_size:
+        last_sale = raw_sales[-1]
+        next_cursor = (last_sale['data_hora'], last_sale['id_venda'])
+    return sales, next_cursor
+
+def _build_sales_with_items(raw_rows):
+    # Monta as vendas a partir das linhas do JOIN; produtos e categorias repetidos são
+    # compartilhados entre os itens em vez de recriados a cada linha
+    sales = {}
+    categories = {}
+    products = {}
+    for raw_row in raw_rows:
+        sale_obj = sales.get(raw_row['id_venda'])
+        if sale_obj is None:
+            sale_obj = sales[raw_row['id_venda']] = _build_sale(raw_row)
+        if raw_row['id_produto'] is None:
+            continue
+
+        product_obj = products.get(raw_row['id_produto'])
+        if product_obj is None:
+            category_obj = _shared_category(categories, raw_row)
+            product_obj = products[raw_row['id_produto']] = Product(
+                id=raw_row['id_produto'],
+                name = raw_row['nome_produto'],
+                price = raw_row['preco'],
+                stock_quantity = raw_row['quantidade_estoque'],
+                category = category_obj
+            )
+        sale_item_obj = SaleItem(
+            product = product_obj,
+            quantity = raw_row['quantidade'],
+            unit_price = raw_row['preco_unitario']
         )
-        sales_date.append(sale_obj)
-    return sales_date
+        sale_obj.attach_item(sale_item_obj)
+    return sales
 
 def get_sales_by_id(sale_id):
     """
 
     Busca uma venda completa pelo ID, incluindo todos os seus itens, e a retorna
-    como um único e complexo objeto Sale.
+    como um único e complexo objeto Sale. Tudo é lido em uma única consulta.
 
     Args:
         sale_id (int): O ID da venda a ser buscada.
@@ -338,26 +804,24 @@ def get_sales_by_id(sale_id):
     Returns:
         Sale or None: O objeto Sale completo se encontrado, senão None.
     """
-    raw_sale = db.find_sale_by_id(sale_id)
-    if raw_sale is None:
+    raw_rows = db.find_sale_with_items(sale_id)
+    if not raw_rows:
         return None
-    
-    sale_obj = Sale(
-        id = raw_sale['id_venda'],
-        date_hour = raw_sale['data_hora'],
-        total_value = raw_sale['valor_total']
-    )
+    return _build_sales_with_items(raw_rows)[raw_rows[0]['id_venda']]
 
-    raw_items = db.list_items_by_sale(sale_id)
+def get_sales_by_ids(sale_ids):
+    """
+    Busca várias vendas completas de uma vez (por exemplo, para reimprimir comprovantes em lote).
 
-    for raw_item in raw_items:
-        product_obj = get_product_by_id(raw_item['id_produto'])
-        sale_item_obj = SaleItem(
-            product = product_obj,
-            quantity = raw_item['quantidade']
-        )
-        sale_obj.items.append(sale_item_obj)
-    return sale_obj
+    Args:
+        sale_ids (list[int]): Os IDs das vendas a serem buscadas.
+
+    Returns:
+        list[Sale]: Os objetos Sale completos, na mesma ordem dos IDs informados.
+            IDs inexistentes são ignorados.
+    """
+    sales = _build_sales_with_items(db.list_sales_with_items(sale_ids))
+    return [sales[sale_id] for sale_id in sale_ids if sale_id in sales]
 
 def delete_sale(sale_id, provided_password):
     """
@@ -370,8 +834,136 @@ def delete_sale(sale_id, provided_password):
     Returns:
         bool: True se a operação for bem-sucedida, False caso contrário.
     """
-    return db.delete_sale(sale_id, provided_password)
-    
+    sold_product_ids = [raw_row['id_produto'] for raw_row in db.find_sale_with_items(sale_id)]
+    success = db.delete_sale(sale_id, provided_password)
+    _invalidate_products(product_id for product_id in sold_product_ids if product_id is not None)
+    return success
+
+def rebuild_sales_summary():
+    """
+    Repassa a solicitação para recalcular do zero os resumos de vendas pré-agregados.
+
+    Returns:
+        bool: True se os resumos forem recalculados, False caso contrário.
+    """
+    return db.rebuild_sales_summary()
+
+def get_sales_report(start, end, period='day', product_limit=reports.REPORT_TOP_PRODUCTS):
+    """
+    Repassa a solicitação de relatório de vendas de um intervalo de dias para reports.period_report.
+
+    Args:
+        start (date, datetime or str): O primeiro dia (incluído).
+        end (date, datetime or str): O dia final (não incluído).
+        period (str, optional): Como agrupar 'periodos': 'day', 'week' ou 'month'. Defaults to 'day'.
+        product_limit (int, optional): Quantos produtos entram em 'produtos'; None para todos.
+            Defaults to reports.REPORT_TOP_PRODUCTS.
+
+    Returns:
+        dict: O relatório (veja reports.period_report).
+    """
+    return reports.period_report(start, end, period, product_limit)
+
+def get_daily_report(day=None):
+    """
+    Repassa a solicitação de relatório de um dia para reports.daily_report.
+
+    Args:
+        day (date, datetime or str, optional): O dia do relatório. Defaults to hoje.
+
+    Returns:
+        dict: O relatório, no formato de get_sales_report.
+    """
+    return reports.daily_report(day)
+
+def get_weekly_report(day=None):
+    """
+    Repassa a solicitação de relatório semanal para reports.weekly_report.
+
+    Args:
+        day (date, datetime or str, optional): Um dia qualquer da semana. Defaults to hoje.
+
+    Returns:
+        dict: O relatório, no formato de get_sales_report.
+    """
+    return reports.weekly_report(day)
+
+def get_monthly_report(year=None, month=None):
+    """
+    Repassa a solicitação de relatório mensal para reports.monthly_report.
+
+    Args:
+        year (int, optional): O ano. Defaults to o ano atual.
+        month (int, optional): O mês (1 a 12). Defaults to o mês atual.
+
+    Returns:
+        dict: O relatório, no formato de get_sales_report.
+    """
+    return reports.monthly_report(year, month)
+
+def _build_register(raw_register):
+    return CashRegister(
+        id = raw_register['id_caixa'],
+        operator = raw_register['nome_operador'],
+        opened_at = raw_register['abertura'],
+        closed_at = raw_register['fechamento'],
+        opening_amount = raw_register['valor_abertura'],
+        sales_count = raw_register['quantidade_vendas'],
+        sales_total = raw_register['total_vendas'],
+        counted_amount = raw_register['valor_contado']
+    )
+
+def open_register(opening_amount, operator=None):
+    """
+    Abre uma nova sessão de caixa.
+
+    Args:
+        opening_amount (int): O troco inicial colocado na gaveta, em centavos.
+        operator (str, optional): O nome de quem opera o caixa. Defaults to None.
+
+    Returns:
+        CashRegister or None: O caixa aberto, ou None em caso de erro.
+    """
+    register_id = db.open_register(opening_amount, operator)
+    if not register_id:
+        return None
+    return get_register_by_id(register_id)
+
+def close_register(register_id, counted_amount):
+    """
+    Fecha um caixa com o valor contado na gaveta.
+
+    Args:
+        register_id (int): O ID do caixa.
+        counted_amount (int): O valor contado no fechamento, em centavos.
+
+    Returns:
+        CashRegister or None: O caixa fechado (com expected_amount e difference),
+            ou None se o caixa não existir ou já estiver fechado.
+    """
+    raw_register = db.close_register(register_id, counted_amount)
+    return _build_register(raw_register) if raw_register else None
+
+def get_register_by_id(register_id):
+    """
+    Busca um caixa com os totais acumulados até agora.
+
+    Args:
+        register_id (int): O ID do caixa.
+
+    Returns:
+        CashRegister or None: O caixa encontrado, ou None.
+    """
+    raw_register = db.find_register_by_id(register_id)
+    return _build_register(raw_register) if raw_register else None
+
+def get_open_registers():
+    """
+    Returns:
+        list[CashRegister]: Os caixas abertos, em ordem de abertura.
+    """
+    return [_build_register(raw_register) for raw_register in db.list_open_registers()]
+
 
 if __name__ == '__main__':
     # --- Bloco de Setup do Teste ---
@@ -385,8 +977,8 @@ if __name__ == '__main__':
     db.add_category('Brincos')
     db.add_category('Colares')
     db.add_category('Tiaras')
-    db.add_product({'nome_produto': 'Brinco de Prata Esterlina', 'preco': 39.99, 'quantidade_estoque': 50, 'id_categoria': 1})
-    db.add_product({'nome_produto': 'Tiara de Festa', 'preco': 22.00, 'quantidade_estoque': 15, 'id_categoria': 3})
+    db.add_product({'nome_produto': 'Brinco de Prata Esterlina', 'preco': 3999, 'quantidade_estoque': 50, 'id_categoria': 1})
+    db.add_product({'nome_produto': 'Tiara de Festa', 'preco': 2200, 'quantidade_estoque': 15, 'id_categoria': 3})
     print("--- Ambiente de teste pronto. Iniciando testes do repositório... ---")
     
     # --- Teste get_all_categories ---
@@ -426,10 +1018,15 @@ if __name__ == '__main__':
     # --- Teste add_product ---
     print("\n--- Testando: add_product ---")
     cat_colares = get_category_by_id(2)
-    novo_produto_obj = Product(name='Colar de Diamante', price=999.99, stock_quantity=10, category=cat_colares)
+    novo_produto_obj = Product(name='Colar de Diamante', price=99999, stock_quantity=10, category=cat_colares)
     print(f"Tentando adicionar o produto: '{novo_produto_obj.name}'")
     sucesso_add_prod = add_product(novo_produto_obj)
-    print(f"--> Operação bem-sucedida? {sucesso_add_prod}")
+    print(f"--> Operação bem-sucedida? {bool(sucesso_add_prod)} (ID do novo produto: {sucesso_add_prod})")
+    try:
+        Product(name='Colar Float', price=35.5, stock_quantity=10, category=cat_colares)
+        print("--> FALHA! Produto criado com preço em reais.")
+    except TypeError as e:
+        print(f"--> Preço em reais recusado: {e}")
 
     print("\n" + "="*30)
 
@@ -484,17 +1081,17 @@ if __name__ == '__main__':
     # --- Teste update_product ---
     print("\n--- Testando: update_product ---")
     print("Atualizando nome e preço do produto ID 1...")
-    update_product(1, ADMIN_PASSWORD, new_name="Brinco de Ouro", new_price=150.0)
+    update_product(1, ADMIN_PASSWORD, new_name="Brinco de Ouro", new_price=15000)
     produto_super_atualizado = get_product_by_id(1)
-    print(f"--> Novo Nome: {produto_super_atualizado.name}, Novo Preço: {produto_super_atualizado.price}")
+    print(f"--> Novo Nome: {produto_super_atualizado.name}, Novo Preço: {Product.format_currency(produto_super_atualizado.price)}")
 
     print("\n" + "="*30)
 
     # --- Teste add_multiple_products ---
     print("\n--- Testando: add_multiple_products ---")
     novos_produtos_lote = [
-        Product(name='Brinco de Pena', price=55.0, stock_quantity=100, category=get_category_by_id(1)),
-        Product(name='Colar Branco', price= 110.0, stock_quantity=55, category=get_category_by_id(2))
+        Product(name='Brinco de Pena', price=5500, stock_quantity=100, category=get_category_by_id(1)),
+        Product(name='Colar Branco', price= 11000, stock_quantity=55, category=get_category_by_id(2))
     ]
     print(f"Tentando adicionar {len(novos_produtos_lote)} novos produtos em lote...")
     sucesso_lote = add_multiples_products(novos_produtos_lote)
@@ -543,7 +1140,7 @@ if __name__ == '__main__':
         vendas_no_banco = get_all_sales()
         if vendas_no_banco and len(vendas_no_banco) == 1:
             print(f"--> SUCESSO! A função encontrou {len(vendas_no_banco)} venda.")
-            print(f"    Inspecionando a venda: ID={vendas_no_banco[0].id}, Total=R${vendas_no_banco[0].total_value:.2f}")
+            print(f"    Inspecionando a venda: ID={vendas_no_banco[0].id}, Total={Product.format_currency(vendas_no_banco[0].total_value)}")
         else:
             print("--> FALHA! A lista de vendas está incorreta.")
 
@@ -593,7 +1190,7 @@ if __name__ == '__main__':
             if vendas_encontradas:
                 print(f"--> Sucesso! {len(vendas_encontradas)} venda(s) encontrada(s) para hoje.")
                 for venda in vendas_encontradas:
-                    print(f"    - Venda ID: {venda.id}, Total: R${venda.total_value:.2f}")
+                    print(f"    - Venda ID: {venda.id}, Total: {Product.format_currency(venda.total_value)}")
             else:
                 print("--> FALHA! Nenhuma venda encontrada para a data de hoje.")
     else:
@@ -630,7 +1227,7 @@ if __name__ == '__main__':
         if sale_obj_completo and isinstance(sale_obj_completo, Sale):
             print("--> SUCESSO! Objeto Sale completo foi retornado.")
             print(f"    - ID da Venda: {sale_obj_completo.id}")
-            print(f"    - Valor Total: R${sale_obj_completo.total_value:.2f}")
+            print(f"    - Valor Total: {Product.format_currency(sale_obj_completo.total_value)}")
 
             # Verificamos se os itens foram montados
             if sale_obj_completo.items and len(sale_obj_completo.items) == 2:
@@ -649,4 +1246,211 @@ if __name__ == '__main__':
         else:
             print("--> FALHA! A função não retornou um objeto Sale válido.")
     else:
-        print("--> FALHA no setup do teste.")
\ No newline at end of file
+        print("--> FALHA no setup do teste.")
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando get_sales_between e get_sales_page (paginação por cursor)...")
+    hoje = datetime.now().date()
+    vendas_intervalo = get_sales_between(hoje, hoje + timedelta(days=1))
+    print(f"--> {len(vendas_intervalo)} venda(s) entre {hoje} e {hoje + timedelta(days=1)} (intervalo semiaberto).")
+
+    pagina, cursor = get_sales_page(page_size=1)
+    ids_paginados = []
+    while pagina:
+        ids_paginados.extend(venda.id for venda in pagina)
+        print(f"    Página {len(ids_paginados)}: vendas {[venda.id for venda in pagina]}")
+        if cursor is None:
+            break
+        pagina, cursor = get_sales_page(page_size=1, cursor=cursor)
+    todas_as_vendas = [venda.id for venda in get_all_sales()]
+    if [venda.id for venda in vendas_intervalo] == todas_as_vendas and sorted(ids_paginados) == sorted(todas_as_vendas):
+        print("--> SUCESSO! Intervalo e paginação cobrem todas as vendas.")
+    else:
+        print("--> FALHA! Intervalo ou paginação não encontraram todas as vendas.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando iter_products, iter_sales e iter_categories (leitura em streaming)...")
+    produtos_stream = iter_products(batch_size=2)
+    primeiro_produto_stream = next(produtos_stream)
+    print(f"--> Primeiro produto recebido antes do fim da consulta: {primeiro_produto_stream.name}")
+    restantes = sum(1 for _ in produtos_stream)
+    if 1 + restantes == len(get_all_products()):
+        print(f"--> SUCESSO! {1 + restantes} produtos percorridos em lotes de 2.")
+    else:
+        print("--> FALHA! A quantidade de produtos percorridos está incorreta.")
+    print(f"    Vendas percorridas: {sum(1 for _ in iter_sales())}, categorias: {sum(1 for _ in iter_categories())}")
+    gravacoes_ok = True
+    for produto_stream in iter_products(batch_size=2):
+        # Gravar e reler no meio da iteração, na mesma thread
+        gravacoes_ok &= bool(update_product_stock(produto_stream.id, produto_stream.stock_quantity + 1))
+        gravacoes_ok &= get_product_by_id(produto_stream.id).stock_quantity == produto_stream.stock_quantity + 1
+        update_product_stock(produto_stream.id, produto_stream.stock_quantity)
+    pares = list(zip(iter_products(batch_size=1), iter_categories(batch_size=1)))
+    print(f"--> Gravações durante a iteração visíveis? {gravacoes_ok} (Esperado: True); iteradores intercalados: {len(pares)} pares")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando get_sales_by_ids (reimpressão de comprovantes em lote)...")
+    ids_para_reimprimir = [venda.id for venda in get_all_sales()] + [999]
+    vendas_completas = get_sales_by_ids(ids_para_reimprimir)
+    for venda in vendas_completas:
+        print(f"    - Venda {venda.id}: {len(venda.items)} item(ns), Total: {Product.format_currency(venda.total_value)}")
+    if len(vendas_completas) == len(ids_para_reimprimir) - 1:
+        print("--> SUCESSO! Todas as vendas existentes foram montadas (o ID 999 foi ignorado).")
+    else:
+        print("--> FALHA! A quantidade de vendas montadas está incorreta.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando preço histórico dos itens (alterando o preço depois da venda)...")
+    if id_venda_alvo:
+        update_product(3, ADMIN_PASSWORD, new_price=9900)
+        venda_historica = get_sales_by_id(id_venda_alvo)
+        soma_itens = sum(item.subtotal for item in venda_historica.items)
+        print(f"    Total gravado: {Product.format_currency(venda_historica.total_value)}, soma dos itens: {Product.format_currency(soma_itens)}")
+        if soma_itens == venda_historica.total_value:
+            print("--> SUCESSO! Os itens usam o preço unitário da época da venda.")
+        else:
+            print("--> FALHA! Os itens foram recalculados com o preço atual.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando o cache de leitura de produtos e categorias...")
+    clear_caches()
+    estatisticas_antes = cache_stats()['products']
+    for _ in range(3):
+        get_product_by_id(1)
+    estatisticas_depois = cache_stats()['products']
+    print(f"    3 leituras do produto 1: {estatisticas_depois['misses'] - estatisticas_antes['misses']} falha(s), {estatisticas_depois['hits'] - estatisticas_antes['hits']} acerto(s)")
+    update_product_stock(1, 77)
+    print(f"    Estoque depois da atualização (cache invalidado): {get_product_by_id(1).stock_quantity} (Esperado: 77)")
+    update_category_name(1, "Brincos Finos", ADMIN_PASSWORD)
+    print(f"    Categoria do produto 1 depois de renomear: {get_product_by_id(1).category.name} (Esperado: Brincos Finos)")
+    print(f"--> Estatísticas: {cache_stats()}")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando get_catalog_snapshot (catálogo colunar)...")
+    fotografia = get_catalog_snapshot()
+    valor_objetos = sum(produto.price * produto.stock_quantity for produto in get_all_products())
+    print(f"    {len(fotografia)} produtos, valor em estoque: {Product.format_currency(fotografia.total_inventory_value())}")
+    print(f"    Estoque baixo (<= 15): {list(fotografia.low_stock(15))}")
+    print(f"    Faixas de preço [R$0, R$50, R$200, R$1000]: {fotografia.price_histogram([0, 5000, 20000, 100000])}")
+    print(f"    Valor por categoria: {fotografia.sum_by_category()}")
+    if fotografia.total_inventory_value() == valor_objetos:
+        print("--> SUCESSO! O valor do estoque confere com a soma dos objetos Product.")
+    else:
+        print("--> FALHA! O valor do estoque da fotografia não confere.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando reprice_products (reajuste de preços em lote)...")
+    precos_antes = {produto.id: produto.price for produto in get_products_by_category(2)}
+    alterados = reprice_products(ADMIN_PASSWORD, category_id=2, percent=8)
+    precos_depois = {produto.id: produto.price for produto in get_products_by_category(2)}
+    print(f"--> {alterados} produto(s) da categoria 2 reajustado(s) em +8%: {precos_antes} -> {precos_depois}")
+    alterados_mapa = reprice_products(ADMIN_PASSWORD, price_map={1: 15000, 3: 12000})
+    print(f"--> Mapa de preços: {alterados_mapa} produto(s) alterado(s); produto 1 já custava R$150.00, produto 3 agora custa {Product.format_currency(get_product_by_id(3).price)}")
+    print(f"--> Reajuste sem senha: {reprice_products('senha errada', category_id=2, percent=8)} (Esperado: False)")
+    print(f"--> Reajuste que deixaria preço negativo: {reprice_products(ADMIN_PASSWORD, product_ids=[1], delta=-100000)} (Esperado: False)")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando receive_goods (entrada de mercadorias em lote)...")
+    estoque_antes = get_product_by_id(1).stock_quantity
+    resultado = receive_goods([(1, 10), (3, 5), (1, 2)])
+    print(f"--> Aplicado? {resultado['applied']}")
+    for linha in resultado['lines']:
+        print(f"    - Produto {linha['id_produto']}: {linha['delta']:+d} -> {linha['status']}, estoque final: {linha['quantidade_estoque']}")
+    print(f"    Estoque do produto 1: {estoque_antes} -> {get_product_by_id(1).stock_quantity} (Esperado: +12)")
+    resultado_invalido = receive_goods([(1, 5), (999, 3)])
+    print(f"--> Entrada com produto inexistente aplicada? {resultado_invalido['applied']} (Esperado: False)")
+    print(f"    Linhas: {[linha['status'] for linha in resultado_invalido['lines']]}")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando upsert_products (sincronização de catálogo)...")
+    categoria_brincos = get_category_by_id(1)
+    feed = (
+        Product(name=nome, price=preco, stock_quantity=estoque, category=categoria_brincos)
+        for nome, preco, estoque in [('Brinco de Pena', 6000, 80), ('Brinco de Argola', 4500, 30), ('Brinco de Pena', 6500, 70)]
+    )
+    resultado_upsert = upsert_products(feed, on_conflict='update')
+    print(f"--> Modo 'update': inseridos {resultado_upsert['inserted']}, atualizados {resultado_upsert['updated']}, recusados {resultado_upsert['rejected']}")
+    resultado_repetido = upsert_products([
+        Product(name='Brinco Gota', price=3000, stock_quantity=5, category=categoria_brincos),
+        Product(name='Brinco Gota', price=3200, stock_quantity=6, category=categoria_brincos)
+    ], on_conflict='update')
+    id_gota = db.find_product_ids_by_names(['Brinco Gota'])['Brinco Gota']
+    print(f"--> Nome repetido no feed: inseridos {resultado_repetido['inserted']}, atualizados {resultado_repetido['updated']} (Esperado: ['Brinco Gota'], [])")
+    print(f"    Preço final: {get_product_by_id(id_gota).price} (Esperado: 3200, a última linha vence)")
+    delete_product(id_gota, ADMIN_PASSWORD)
+    resultado_skip = upsert_products([Product(name='Brinco de Argola', price=100, stock_quantity=1, category=categoria_brincos)], on_conflict='skip')
+    print(f"--> Modo 'skip': inseridos {resultado_skip['inserted']}, recusados {resultado_skip['rejected']}")
+    resultado_fail = upsert_products([
+        Product(name='Brinco Novo', price=1000, stock_quantity=1, category=categoria_brincos),
+        Product(name='Brinco de Argola', price=100, stock_quantity=1, category=categoria_brincos)
+    ], on_conflict='fail')
+    print(f"--> Modo 'fail': aplicado? {resultado_fail['applied']} (Esperado: False), recusados {resultado_fail['rejected']}")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando os relatórios pré-agregados (diário, semanal e mensal)...")
+    relatorio_dia = get_daily_report()
+    vendas_do_dia = get_sales_by_date(date.today().isoformat())
+    receita_vendas = sum(venda.total_value for venda in vendas_do_dia)
+    print(f"--> Hoje: {relatorio_dia['totais']} (vendas pela tabela: {len(vendas_do_dia)}, receita {Product.format_currency(receita_vendas)})")
+    for linha in relatorio_dia['categorias']:
+        print(f"    - {linha['nome_categoria']}: {linha['unidades']} unidade(s), {Product.format_currency(linha['receita'])}")
+    print(f"--> Semana: {get_weekly_report()['totais']}")
+    print(f"--> Mês: {get_monthly_report()['totais']}")
+    totais_antes = relatorio_dia['totais']
+    rebuild_sales_summary()
+    if (get_daily_report()['totais']['quantidade_vendas'] == totais_antes['quantidade_vendas'] == len(vendas_do_dia)
+            and get_daily_report()['totais']['receita'] == receita_vendas):
+        print("--> SUCESSO! O resumo incremental confere com a reconstrução e com as vendas.")
+    else:
+        print("--> FALHA! O resumo pré-agregado não confere com as vendas.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando a abertura e o fechamento de caixa...")
+    caixa_1 = open_register(10000, 'Ana')
+    caixa_2 = open_register(5000, 'Bruno')
+    print(f"--> Caixas abertos: {[caixa.id for caixa in get_open_registers()]}")
+    venda_caixa = Sale()
+    venda_caixa.add_item(get_product_by_id(3), 1)
+    id_venda_caixa = register_sale(venda_caixa, register_id=caixa_1.id)
+    venda_caixa_2 = Sale()
+    venda_caixa_2.add_item(get_product_by_id(3), 2)
+    id_venda_caixa_2 = register_sale(venda_caixa_2, register_id=caixa_2.id)
+    print(f"    Caixa {caixa_1.id} esperado: {Product.format_currency(get_register_by_id(caixa_1.id).expected_amount)}")
+    delete_sale(id_venda_caixa, ADMIN_PASSWORD)
+    print(f"    Depois de cancelar a venda {id_venda_caixa}: {Product.format_currency(get_register_by_id(caixa_1.id).expected_amount)} (Esperado: R$100.00)")
+    fechado = close_register(caixa_2.id, 5000 + venda_caixa_2.total_value - 500)
+    print(f"--> Caixa {fechado.id} fechado: esperado {Product.format_currency(fechado.expected_amount)}, contado {Product.format_currency(fechado.counted_amount)}, diferença {Product.format_currency(fechado.difference)}")
+    print(f"--> Venda em caixa fechado: {register_sale(venda_caixa_2, register_id=caixa_2.id)} (Esperado: False)")
+    print(f"--> Fechar de novo: {close_register(caixa_2.id, 0)} (Esperado: None)")
+    print(f"--> Cancelar venda de caixa fechado: {delete_sale(id_venda_caixa_2, ADMIN_PASSWORD)} (Esperado: False)")
+    fechado_depois = get_register_by_id(caixa_2.id)
+    print(f"    Caixa {fechado_depois.id} continua com {fechado_depois.sales_count} venda(s), diferença {Product.format_currency(fechado_depois.difference)} (Esperado: 1, -R$5.00)")
+    if fechado.sales_count == 1 and fechado.difference == -500:
+        print("--> SUCESSO! O fechamento confere com as vendas do caixa.")
+    else:
+        print("--> FALHA! Os totais do caixa não conferem.")
+
+    print("\n" + "="*30) # Separador
+
+    print("\nTestando a busca de produtos pelo nome digitado...")
+    print(f"--> 'brin': {[produto.name for produto in search_products('brin')]}")
+    print(f"--> 'BRINCO arg': {[produto.name for produto in search_products('BRINCO arg')]} (Esperado: ['Brinco de Argola'])")
+    print(f"--> 'finos' (categoria): {len(search_products('finos'))} produto(s)")
+    update_product(7, ADMIN_PASSWORD, new_name="Brinco de Argola Pérola")
+    print(f"--> 'perola' depois de renomear: {[produto.name for produto in search_products('perola')]} (Esperado: ['Brinco de Argola Pérola'])")
+    modelos = [Product(name=f'Brinco Prata Modelo {i}', price=1000, stock_quantity=1, category=get_category_by_id(1))
+               for i in range(300)]
+    upsert_products(modelos + [Product(name='Brinco', price=1000, stock_quantity=1, category=get_category_by_id(1))])
+    print(f"--> 'brinco' com 300 modelos cadastrados antes: {[produto.name for produto in search_products('brinco', 2)]} (Esperado: 'Brinco' primeiro)")
+    for id_modelo in db.find_product_ids_by_names([produto.name for produto in modelos] + ['Brinco']).values():
+        delete_product(id_modelo, ADMIN_PASSWORD)